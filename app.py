@@ -131,6 +131,30 @@ def create_app():
     transaction_model = None
     bank_account_model = None
     task_model = None
+    listing_search_available = False
+    listing_facet_model = None
+    listing_facets_available = False
+    price_sketch_model = None
+    price_sketches_available = False
+    table_version_model = None
+    import_job_model = None
+    background_writes = False
+    validators_available = False
+    view_counter = None
+    listing_cache = None
+    media_store = None
+    media_pipeline = None
+    upload_session_model = None
+    chunked_uploads = None
+    saved_search_model = None
+    search_notification_model = None
+    search_matcher = None
+    similar_listings = None
+    worker_tag_model = None
+    worker_booking_model = None
+    worker_matcher = None
+    search_suggester = None
+    dashboard_stats = None
     
     try:
         from sqlalchemy import create_engine, func
@@ -142,7 +166,17 @@ def create_app():
             Message as MessageModel,
             Contract as ContractModel,
             Listing as ListingModel,
+            ListingFacetCount as ListingFacetCountModel,
+            ListingPriceSketch as ListingPriceSketchModel,
+            TableVersion as TableVersionModel,
+            ImportJob as ImportJobModel,
+            MediaBlob as MediaBlobModel,
+            UploadSession as UploadSessionModel,
+            SavedSearch as SavedSearchModel,
+            SearchNotification as SearchNotificationModel,
             WorkerProfile as WorkerProfileModel,
+            WorkerTag as WorkerTagModel,
+            WorkerBooking as WorkerBookingModel,
             ProduceCalculation as ProduceCalculationModel,
             ShelfLifePrediction as ShelfLifePredictionModel,
             CropRecommendation as CropRecommendationModel,
@@ -166,6 +200,22 @@ def create_app():
         # Create tables if they don't exist
         Base.metadata.create_all(bind=engine)
 
+        # Full-text index for marketplace search (SQLite FTS5, falls back to LIKE)
+        from search_index import ensure_listing_fts
+        listing_search_available = ensure_listing_fts(engine)
+
+        # Incrementally maintained counts for /listings/facets
+        from facets import ensure_listing_facets
+        listing_facets_available = ensure_listing_facets(engine)
+
+        # Incrementally maintained price sketches for /listings/price-stats
+        from price_stats import ensure_price_sketches
+        price_sketches_available = ensure_price_sketches(engine)
+
+        # Table version counters for ETag/Last-Modified on read endpoints
+        from conditional import ensure_table_versions
+        validators_available = ensure_table_versions(engine)
+
         user_model = ModelUser
         verification_doc_model = VerificationDocModel
         job_model = JobModel
@@ -174,7 +224,16 @@ def create_app():
         message_model = MessageModel
         contract_model = ContractModel
         listing_model = ListingModel
+        listing_facet_model = ListingFacetCountModel
+        price_sketch_model = ListingPriceSketchModel
+        table_version_model = TableVersionModel
+        import_job_model = ImportJobModel
+        upload_session_model = UploadSessionModel
+        saved_search_model = SavedSearchModel
+        search_notification_model = SearchNotificationModel
         worker_profile_model = WorkerProfileModel
+        worker_tag_model = WorkerTagModel
+        worker_booking_model = WorkerBookingModel
         produce_calculation_model = ProduceCalculationModel
         shelf_life_prediction_model = ShelfLifePredictionModel
         crop_recommendation_model = CropRecommendationModel
@@ -195,6 +254,81 @@ def create_app():
         forum_post_model = ForumPostModel
         forum_comment_model = ForumCommentModel
         forum_vote_model = ForumVoteModel
+
+        # In-memory SQLite databases are per-thread, so background writers can't see them
+        background_writes = engine.url.database not in (None, '', ':memory:')
+
+        # Listing and forum views are buffered and written behind in batches
+        from view_counter import ViewCounter
+        view_counter = ViewCounter(engine, flush_interval=config.VIEW_COUNT_FLUSH_SECONDS if background_writes else 0)
+        view_counter.register('listing', ListingModel.__table__, 'views')
+        view_counter.register('forum_post', ForumPostModel.__table__, 'view_count')
+        app.view_counter = view_counter
+
+        # Pre-serialized listing card payloads keyed by (id, updated_at)
+        from payload_cache import PayloadCache
+        listing_cache = PayloadCache(max_bytes=config.LISTING_CACHE_MAX_BYTES)
+        app.listing_cache = listing_cache
+
+        # Worker dashboard payloads, dropped on wallet/application/rating writes
+        from stats_cache import TTLCache
+        dashboard_stats = TTLCache(config.WORKER_DASHBOARD_CACHE_SECONDS,
+                                   max_entries=config.WORKER_DASHBOARD_CACHE_MAX_ENTRIES)
+        app.dashboard_stats = dashboard_stats
+
+        # Uploaded media is stored by content hash; derivatives render in the background
+        from media_store import MediaStore, DerivativePipeline
+        media_store = MediaStore(config.MEDIA_ROOT, MediaBlobModel)
+        media_pipeline = DerivativePipeline(media_store, session_local, async_=background_writes)
+        media_pipeline.enqueue_pending()
+        app.media_store = media_store
+        app.media_pipeline = media_pipeline
+
+        # Resumable chunked uploads for large videos and verification scans
+        from chunked_upload import ChunkedUploads
+        chunked_uploads = ChunkedUploads(config.CHUNKED_UPLOAD_DIR, UploadSessionModel,
+                                         chunk_size=config.CHUNKED_UPLOAD_CHUNK_BYTES,
+                                         max_sizes=config.MAX_UPLOAD_BYTES,
+                                         ttl_seconds=config.CHUNKED_UPLOAD_TTL_SECONDS)
+        app.chunked_uploads = chunked_uploads
+
+        # Saved searches are matched against listings as they are written
+        from saved_searches import SearchMatcher
+        search_matcher = SearchMatcher(SavedSearchModel, SearchNotificationModel)
+
+        # Expired boosts are cleared in bulk in the background
+        from boost_sweeper import BoostSweeper
+        boost_sweeper = BoostSweeper(engine, interval=config.BOOST_SWEEP_SECONDS if background_writes else 0)
+        boost_sweeper.register(ListingModel.__table__, 'featured')
+        boost_sweeper.register(WorkerProfileModel.__table__, 'is_boosted')
+        boost_sweeper.register(JobModel.__table__, 'is_boosted')
+        boost_sweeper.start()
+        app.boost_sweeper = boost_sweeper
+
+        # Precomputed "similar listings", refreshed from listing changes in the background
+        from similar_listings import SimilarListings
+        similar_listings = SimilarListings(
+            engine, ListingModel.__table__,
+            interval=config.SIMILAR_LISTINGS_REFRESH_SECONDS if background_writes else 0)
+        similar_listings.start()
+        app.similar_listings = similar_listings
+
+        # In-memory worker features for ranking workers against a job
+        from worker_matching import WorkerMatcher
+        worker_matcher = WorkerMatcher(
+            engine, WorkerProfileModel.__table__, WorkerTagModel.__table__,
+            interval=config.WORKER_MATCH_REFRESH_SECONDS if background_writes else 0)
+        worker_matcher.start()
+        app.worker_matcher = worker_matcher
+
+        # Prefix tries behind /search/suggest, built in the background and updated by the write endpoints
+        from search_suggest import SearchSuggester
+        search_suggester = SearchSuggester(
+            engine, ModelUser.__table__, WorkerProfileModel.__table__, ListingModel.__table__, JobModel.__table__,
+            max_bytes=config.SEARCH_SUGGEST_MAX_BYTES,
+            interval=config.SEARCH_SUGGEST_REBUILD_SECONDS if background_writes else 0)
+        search_suggester.start()
+        app.search_suggester = search_suggester
         db_available = True
     except Exception:
         # SQLAlchemy or model initialization failed
@@ -577,8 +711,66 @@ def create_app():
     @app.route('/static/openapi.yaml')
     def serve_openapi_spec():
         return send_from_directory(config.BASE_DIR, 'openapi.yaml')
+
+    # Uploaded media: Range/206 and sendfile via send_file, with a cap on concurrent large transfers
+    from media_delivery import TransferLimiter
+    app.config['USE_X_SENDFILE'] = config.MEDIA_USE_X_SENDFILE
+    transfer_limiter = TransferLimiter(config.MEDIA_MAX_LARGE_TRANSFERS, config.MEDIA_LARGE_TRANSFER_BYTES)
+    app.transfer_limiter = transfer_limiter
+
+    def send_media(directory, filename, max_age, immutable=False):
+        response = send_from_directory(directory, filename, max_age=max_age)
+        response.cache_control.public = True
+        if immutable:
+            response.cache_control.immutable = True
+        # The front-end server streams X-Sendfile responses, so no worker is held
+        if app.config['USE_X_SENDFILE']:
+            return response
+        admitted = transfer_limiter.admit(response, request.method)
+        if admitted is None:
+            response.close()
+            busy = jsonify({'error': 'too many concurrent media transfers, retry shortly'})
+            busy.headers['Retry-After'] = '2'
+            return busy, 503
+        return admitted
+
+    @app.route('/static/uploads/media/<path:filename>')
+    @limiter.exempt
+    def serve_media(filename):
+        # Content-addressed: a URL's bytes never change
+        return send_media(config.MEDIA_ROOT, filename, max_age=365 * 24 * 3600, immutable=True)
+
+    @app.route('/static/uploads/<path:filename>')
+    @limiter.exempt
+    def serve_upload(filename):
+        # Legacy uuid-named uploads and verification files can be replaced, so they are revalidated
+        return send_media(os.path.join(app.static_folder, 'uploads'), filename, max_age=config.MEDIA_CACHE_SECONDS)
     
     # ---------------- Job application endpoints ----------------
+    def count_applications(session, job_id, applications=0, pending=0):
+        """Adjust a job's applications_count/pending_count within the caller's transaction"""
+        session.query(job_model).filter(job_model.id == job_id).update({
+            job_model.applications_count: func.coalesce(job_model.applications_count, 0) + applications,
+            job_model.pending_count: func.coalesce(job_model.pending_count, 0) + pending,
+        }, synchronize_session=False)
+
+    def set_application_status(session, appn, status):
+        """
+        Move an application to a new status, keeping its job's pending_count in
+        step. The status only changes from the value read, so two requests
+        racing on one pending application count it once.
+        """
+        from sqlalchemy.orm.attributes import set_committed_value
+        previous = appn.status
+        if previous == status:
+            return
+        moved = session.query(job_application_model).filter(
+            job_application_model.id == appn.id, job_application_model.status == previous
+        ).update({job_application_model.status: status}, synchronize_session=False)
+        set_committed_value(appn, 'status', status)
+        if moved:
+            count_applications(session, appn.job_id, pending=(status == 'pending') - (previous == 'pending'))
+
     @app.route('/api/jobs/<int:job_id>/apply', methods=['POST'])
     def apply_to_job(job_id):
         if not db_available or session_local is None or job_model is None or job_application_model is None or user_model is None:
@@ -607,7 +799,9 @@ def create_app():
 
             application = job_application_model(job_id=job_id, applicant_id=user_id, cover_letter=cover_letter)
             session.add(application)
+            count_applications(session, job_id, applications=1, pending=1)
             session.commit()
+            invalidate_dashboard(user_id)
             session.refresh(application)
 
             return jsonify({'message': 'Application submitted', 'application': application.to_dict()}), 201
@@ -619,7 +813,14 @@ def create_app():
 
     @app.route('/api/jobs/<int:job_id>/applications', methods=['GET'])
     def list_job_applications(job_id):
-        """List applications for a job. Requires employer_id query param to verify access."""
+        """
+        List applications for a job, newest first. Requires employer_id query
+        param to verify access.
+
+        Optional ?status= (pending/accepted/rejected), ?limit= and ?cursor=
+        (next page in X-Next-Cursor). The job's applications_count and
+        pending_count give the totals without counting rows.
+        """
         if not db_available or session_local is None or job_model is None or job_application_model is None:
             return jsonify({'error': 'database not available'}), 503
 
@@ -636,8 +837,24 @@ def create_app():
             if int(employer_id) != job.employer_id:
                 return jsonify({'error': 'Access denied'}), 403
 
-            applications = session.query(job_application_model).filter_by(job_id=job_id).all()
-            return jsonify([a.to_dict() for a in applications])
+            # Applicant name/email come from the same query rather than one lazy load per row
+            query = session.query(job_application_model).options(
+                joinedload(job_application_model.applicant)
+            ).filter(job_application_model.job_id == job_id)
+            status = request.args.get('status')
+            if status:
+                query = query.filter(job_application_model.status == status)
+
+            from pagination import InvalidCursor, paginate, parse_limit
+            try:
+                applications, next_cursor = paginate(
+                    query, job_application_model.created_at, job_application_model.id, True, 'recent',
+                    cursor=request.args.get('cursor'), limit=parse_limit(request.args.get('limit'))
+                )
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+            return next_page_headers(jsonify([a.to_dict() for a in applications]), 'list_job_applications',
+                                     next_cursor)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
@@ -666,7 +883,12 @@ def create_app():
 
     @app.route('/api/job-applications/<int:application_id>/accept', methods=['POST'])
     def accept_application(application_id):
-        """Accept an application. Requires employer_id in JSON body."""
+        """
+        Accept an application. Requires employer_id in JSON body.
+
+        Optional start_date/end_date (ISO) book the applicant's worker profile
+        for that period; it defaults to WORKER_BOOKING_DEFAULT_DAYS from now.
+        """
         if not db_available or session_local is None or job_application_model is None or job_model is None:
             return jsonify({'error': 'database not available'}), 503
 
@@ -675,6 +897,17 @@ def create_app():
         if not employer_id:
             return jsonify({'error': 'employer_id required'}), 400
 
+        from worker_calendar import book, parse_time, utc_naive
+        try:
+            starts_at = (parse_time(data['start_date']) if data.get('start_date')
+                         else utc_naive(datetime.datetime.now(datetime.timezone.utc)))
+            ends_at = (parse_time(data['end_date'], end=True) if data.get('end_date')
+                       else starts_at + datetime.timedelta(days=config.WORKER_BOOKING_DEFAULT_DAYS))
+        except ValueError:
+            return jsonify({'error': 'start_date and end_date must be ISO dates or datetimes'}), 400
+        if ends_at <= starts_at:
+            return jsonify({'error': 'end_date must be after start_date'}), 400
+
         session = session_local()
         try:
             appn = session.query(job_application_model).filter_by(id=application_id).first()
@@ -685,8 +918,12 @@ def create_app():
             if not job or job.employer_id != int(employer_id):
                 return jsonify({'error': 'Access denied'}), 403
 
-            appn.status = 'accepted'
+            set_application_status(session, appn, 'accepted')
+            worker = session.query(worker_profile_model).filter_by(user_id=appn.applicant_id).first()
+            if worker is not None:
+                book(session, worker_booking_model, worker.id, starts_at, ends_at, 'application', appn.id)
             session.commit()
+            invalidate_dashboard(appn.applicant_id)
             return jsonify({'message': 'Application accepted', 'application': appn.to_dict()}), 200
         except Exception as e:
             session.rollback()
@@ -715,8 +952,12 @@ def create_app():
             if not job or job.employer_id != int(employer_id):
                 return jsonify({'error': 'Access denied'}), 403
 
-            appn.status = 'rejected'
+            set_application_status(session, appn, 'rejected')
+            # Declining a previously accepted application frees the worker again
+            from worker_calendar import release
+            release(session, worker_booking_model, 'application', appn.id)
             session.commit()
+            invalidate_dashboard(appn.applicant_id)
             return jsonify({'message': 'Application declined', 'application': appn.to_dict()}), 200
         except Exception as e:
             session.rollback()
@@ -724,6 +965,136 @@ def create_app():
         finally:
             session.close()
 
+    @app.route('/api/jobs/<int:job_id>/applications/bulk', methods=['POST'])
+    def bulk_update_applications(job_id):
+        """
+        Accept and decline many of a job's applications in one transaction.
+
+        JSON body: employer_id, accept and/or decline (lists of application
+        ids). Optional start_date/end_date book the accepted applicants as in
+        accept_application. Optional accept_message/decline_message are sent to
+        each applicant whose status changes; {name} and {job_title} in them
+        are filled in.
+        """
+        if not db_available or session_local is None or job_application_model is None or job_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        data = request.get_json() or {}
+        employer_id = data.get('employer_id')
+        if not employer_id:
+            return jsonify({'error': 'employer_id required'}), 400
+
+        targets = {}
+        for key, status in (('accept', 'accepted'), ('decline', 'rejected')):
+            ids = data.get(key) or []
+            if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+                return jsonify({'error': f'{key} must be a list of application ids'}), 400
+            targets[status] = set(ids)
+        if not targets['accepted'] and not targets['rejected']:
+            return jsonify({'error': 'accept or decline required'}), 400
+        if targets['accepted'] & targets['rejected']:
+            return jsonify({'error': 'an application cannot be both accepted and declined'}), 400
+        if len(targets['accepted']) + len(targets['rejected']) > config.JOB_APPLICATION_BULK_MAX:
+            return jsonify({'error': f'at most {config.JOB_APPLICATION_BULK_MAX} applications per request'}), 400
+
+        templates = {'accepted': data.get('accept_message'), 'rejected': data.get('decline_message')}
+        if any(t is not None and not isinstance(t, str) for t in templates.values()):
+            return jsonify({'error': 'accept_message and decline_message must be strings'}), 400
+
+        from worker_calendar import book_many, parse_time, release_many, utc_naive
+        try:
+            starts_at = (parse_time(data['start_date']) if data.get('start_date')
+                         else utc_naive(datetime.datetime.now(datetime.timezone.utc)))
+            ends_at = (parse_time(data['end_date'], end=True) if data.get('end_date')
+                       else starts_at + datetime.timedelta(days=config.WORKER_BOOKING_DEFAULT_DAYS))
+        except ValueError:
+            return jsonify({'error': 'start_date and end_date must be ISO dates or datetimes'}), 400
+        if ends_at <= starts_at:
+            return jsonify({'error': 'end_date must be after start_date'}), 400
+
+        from sqlalchemy import insert, select
+        model = job_application_model
+        session = session_local()
+        try:
+            # Ownership is checked once for the whole batch
+            job = session.query(job_model).filter_by(id=job_id).first()
+            if not job:
+                return jsonify({'error': 'Job not found'}), 404
+            if job.employer_id != int(employer_id):
+                return jsonify({'error': 'Access denied'}), 403
+
+            requested = targets['accepted'] | targets['rejected']
+            rows = session.execute(
+                select(model.id, model.applicant_id, model.status, user_model.full_name)
+                .outerjoin(user_model, user_model.id == model.applicant_id)
+                .where(model.job_id == job_id, model.id.in_(requested))
+            ).all()
+            missing = sorted(requested - {row.id for row in rows})
+            if missing:
+                return jsonify({'error': 'Applications not found for this job', 'missing': missing}), 404
+
+            changed = {'accepted': [], 'rejected': []}
+            for row in rows:
+                status = 'accepted' if row.id in targets['accepted'] else 'rejected'
+                if row.status != status:
+                    changed[status].append(row)
+
+            # Each status takes two UPDATEs: the rows leaving 'pending' are counted
+            # off the job, the rest only change status
+            pending_left = 0
+            for status, ids in targets.items():
+                if not ids:
+                    continue
+                in_batch = (model.job_id == job_id, model.id.in_(ids))
+                pending_left += session.query(model).filter(*in_batch, model.status == 'pending').update(
+                    {model.status: status}, synchronize_session=False)
+                session.query(model).filter(*in_batch, model.status != status).update(
+                    {model.status: status}, synchronize_session=False)
+            if pending_left:
+                count_applications(session, job_id, pending=-pending_left)
+
+            # Accepted applicants with a worker profile are booked; declined ones are freed
+            if changed['accepted'] and worker_profile_model is not None:
+                workers = dict(session.execute(
+                    select(worker_profile_model.user_id, worker_profile_model.id)
+                    .where(worker_profile_model.user_id.in_({row.applicant_id for row in changed['accepted']}))
+                ).all())
+                book_many(session, worker_booking_model,
+                          [(workers[row.applicant_id], row.id) for row in changed['accepted']
+                           if row.applicant_id in workers],
+                          starts_at, ends_at, 'application')
+            release_many(session, worker_booking_model, 'application', [row.id for row in changed['rejected']])
+
+            messages = []
+            if message_model is not None:
+                for status, template in templates.items():
+                    if not template:
+                        continue
+                    for row in changed[status]:
+                        values = {'name': row.full_name or '', 'job_title': job.title or ''}
+                        content = re.sub(r'\{(name|job_title)\}', lambda m: values[m.group(1)], template)
+                        messages.append({'sender_id': job.employer_id, 'recipient_id': row.applicant_id,
+                                         'subject': f'Your application for {job.title}'[:200],
+                                         'content': content})
+                if messages:
+                    session.execute(insert(message_model), messages)
+
+            session.commit()
+            invalidate_dashboard(*{row.applicant_id for row in changed['accepted'] + changed['rejected']})
+            return jsonify({
+                'accepted': sorted(row.id for row in changed['accepted']),
+                'declined': sorted(row.id for row in changed['rejected']),
+                'unchanged': sorted(requested - {row.id for row in changed['accepted'] + changed['rejected']}),
+                'messages_sent': len(messages),
+                'applications_count': job.applications_count or 0,
+                'pending_count': job.pending_count or 0,
+            }), 200
+        except Exception as e:
+            session.rollback()
+            return jsonify({'error': str(e)}), 500
+        finally:
+            session.close()
+
     @app.route('/api/job-applications/<int:application_id>/message', methods=['POST'])
     def message_applicant(application_id):
         """Send a message from the job poster to the applicant (or vice-versa).
@@ -1166,6 +1537,8 @@ def create_app():
             session.add(worker_profile)
             session.commit()
             session.refresh(user)  # Refresh user after adding worker profile
+            from search_suggest import worker_entry
+            index_suggestions('workers', worker_profile.id, worker_entry(worker_profile, user.full_name))
         
         # Get user dict before closing session
         user_dict = user.to_dict()
@@ -1384,6 +1757,9 @@ def create_app():
                     user.verified = True
 
             session.commit()
+            if data['status'] == 'approved':
+                # Listing cards embed owner_verified
+                listing_cache.invalidate_owner(doc.user_id)
             session.refresh(doc)
             result = doc.to_dict()
             session.close()
@@ -1424,6 +1800,8 @@ def create_app():
                 user.verified = True
 
             session.commit()
+            # Listing cards embed owner_verified
+            listing_cache.invalidate_owner(user_id)
 
             # Log admin action
             try:
@@ -1622,6 +2000,11 @@ def create_app():
         if not all(k in data for k in required):
             return jsonify({'error': 'missing required fields: title, party_a_id, party_b_id, terms'}), 400
 
+        try:
+            work_starts_at, work_ends_at = contract_work_window(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         session = session_local()
 
         # Verify both parties exist
@@ -1650,7 +2033,9 @@ def create_app():
             party_b_id=data['party_b_id'],
             terms=data['terms'],
             amount=data.get('amount'),
-            expires_at=data.get('expires_at')
+            expires_at=data.get('expires_at'),
+            work_starts_at=work_starts_at,
+            work_ends_at=work_ends_at
         )
         session.add(contract)
         session.commit()
@@ -1659,9 +2044,57 @@ def create_app():
 
         return jsonify(contract.to_dict()), 201
 
+    def contract_work_window(data):
+        """
+        The optional (start, end) work period of a contract body's start_date/end_date.
+
+        Raises:
+            ValueError: If a date doesn't parse or the period is empty
+        """
+        from worker_calendar import parse_time
+        try:
+            starts_at = parse_time(data['start_date']) if data.get('start_date') else None
+            ends_at = parse_time(data['end_date'], end=True) if data.get('end_date') else None
+        except ValueError:
+            raise ValueError('start_date and end_date must be ISO dates or datetimes')
+        if starts_at is not None and ends_at is not None and ends_at <= starts_at:
+            raise ValueError('end_date must be after start_date')
+        return starts_at, ends_at
+
+    def set_contract_status(session, contract, status):
+        """
+        Move a contract to a new status. Signing books whichever parties are
+        workers for the contract's work period (from now for
+        WORKER_BOOKING_DEFAULT_DAYS when it has none); leaving 'signed' frees
+        them again.
+        """
+        from worker_calendar import book, release, utc_naive
+        if contract.status == status:
+            return
+        if contract.status == 'signed':
+            release(session, worker_booking_model, 'contract', contract.id)
+        contract.status = status
+        if status != 'signed':
+            return
+        starts_at = (utc_naive(contract.work_starts_at) if contract.work_starts_at is not None
+                     else utc_naive(datetime.datetime.now(datetime.timezone.utc)))
+        ends_at = (utc_naive(contract.work_ends_at) if contract.work_ends_at is not None
+                   else starts_at + datetime.timedelta(days=config.WORKER_BOOKING_DEFAULT_DAYS))
+        if ends_at > starts_at:
+            workers = session.query(worker_profile_model).filter(
+                worker_profile_model.user_id.in_((contract.party_a_id, contract.party_b_id)))
+            for worker in workers:
+                book(session, worker_booking_model, worker.id, starts_at, ends_at, 'contract', contract.id)
+
     @app.route('/contracts/<int:contract_id>/sign', methods=['POST'])
     def sign_contract(contract_id):
-        """Sign a contract (party must be one of the contract parties)"""
+        """
+        Sign a contract (party must be one of the contract parties).
+
+        Optional start_date/end_date (ISO) fill in work period bounds the
+        contract was created without; the second signature books its workers
+        for that period.
+        """
         if not db_available or session_local is None or contract_model is None:
             return jsonify({'error': 'database not available'}), 503
 
@@ -1673,6 +2106,11 @@ def create_app():
         if not data or 'user_id' not in data:
             return jsonify({'error': 'missing required field: user_id'}), 400
 
+        try:
+            work_starts_at, work_ends_at = contract_work_window(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         session = session_local()
         contract = session.query(contract_model).filter_by(id=contract_id).first()
         
@@ -1680,6 +2118,11 @@ def create_app():
             session.close()
             return jsonify({'error': 'contract not found'}), 404
 
+        if contract.status in ('cancelled', 'breached'):
+            status = contract.status
+            session.close()
+            return jsonify({'error': f'contract is {status}'}), 400
+
         user_id = data['user_id']
         
         # Check if user is banned
@@ -1711,9 +2154,17 @@ def create_app():
             session.close()
             return jsonify({'error': 'user is not a party to this contract'}), 403
 
+        # Work period bounds the contract was created without may be given when signing
+        work_starts_at = contract.work_starts_at or work_starts_at
+        work_ends_at = contract.work_ends_at or work_ends_at
+        if work_starts_at is not None and work_ends_at is not None and work_ends_at <= work_starts_at:
+            session.close()
+            return jsonify({'error': 'end_date must be after start_date'}), 400
+        contract.work_starts_at, contract.work_ends_at = work_starts_at, work_ends_at
+
         # If both parties signed, update status
         if contract.party_a_signed and contract.party_b_signed:
-            contract.status = 'signed'
+            set_contract_status(session, contract, 'signed')
 
         session.commit()
         session.refresh(contract)
@@ -1721,6 +2172,42 @@ def create_app():
 
         return jsonify(contract.to_dict()), 200
 
+    @app.route('/contracts/<int:contract_id>/status', methods=['POST'])
+    def update_contract_status(contract_id):
+        """
+        End a contract: either party may mark it cancelled, or a signed one breached.
+
+        Body: user_id, status. The workers a signed contract booked are freed.
+        """
+        if not db_available or session_local is None or contract_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        data = request.get_json(silent=True)
+        if not data or 'user_id' not in data or 'status' not in data:
+            return jsonify({'error': 'missing required fields: user_id, status'}), 400
+        status = data['status']
+        if status not in ('cancelled', 'breached'):
+            return jsonify({'error': 'status must be cancelled or breached'}), 400
+
+        session = session_local()
+        try:
+            contract = session.query(contract_model).filter_by(id=contract_id).first()
+            if not contract:
+                return jsonify({'error': 'contract not found'}), 404
+            if data['user_id'] not in (contract.party_a_id, contract.party_b_id):
+                return jsonify({'error': 'user is not a party to this contract'}), 403
+            if contract.status in ('cancelled', 'breached'):
+                return jsonify({'error': f'contract is already {contract.status}'}), 400
+            if status == 'breached' and contract.status != 'signed':
+                return jsonify({'error': 'only a signed contract can be breached'}), 400
+
+            set_contract_status(session, contract, status)
+            session.commit()
+            session.refresh(contract)
+            return jsonify(contract.to_dict()), 200
+        finally:
+            session.close()
+
     @app.route('/contracts/<int:user_id>', methods=['GET'])
     def get_user_contracts(user_id):
         """Get all contracts for a user (as party_a or party_b)"""
@@ -1780,50 +2267,48 @@ def create_app():
             session.close()
             return jsonify({'error': f'user is banned: {reason}'}), 403
 
-        # Handle file uploads
+        # Optional coordinates for "near me" search (validated before any files are saved)
+        latitude = data.get('latitude')
+        longitude = data.get('longitude')
+        if latitude in (None, '') or longitude in (None, ''):
+            latitude = longitude = None
+        else:
+            try:
+                from geo import validate_coordinates
+                latitude, longitude = float(latitude), float(longitude)
+                validate_coordinates(latitude, longitude)
+            except (TypeError, ValueError) as e:
+                session.close()
+                return jsonify({'error': f'invalid coordinates: {e}'}), 400
+
+        # Store uploads by content hash (identical files are kept once)
         import json
-        import csv
-        import io
-        import os
-        from werkzeug.utils import secure_filename
-        
+
         images_list = []
         videos_list = []
-        
-        # Base upload directory
-        UPLOAD_FOLDER = os.path.join('static', 'uploads', 'listings')
-        IMAGES_FOLDER = os.path.join(UPLOAD_FOLDER, 'images')
-        VIDEOS_FOLDER = os.path.join(UPLOAD_FOLDER, 'videos')
-        
-        os.makedirs(IMAGES_FOLDER, exist_ok=True)
-        os.makedirs(VIDEOS_FOLDER, exist_ok=True)
+        new_media = []
 
         # Handle images
         if 'images' in request.files:
             files = request.files.getlist('images')
             for file in files:
                 if file and file.filename:
-                    filename = secure_filename(file.filename)
-                    unique_filename = f"{uuid.uuid4()}_{filename}"
-                    file_path = os.path.join(IMAGES_FOLDER, unique_filename)
-                    file.save(file_path)
-                    # Store relative path for URL access
-                    images_list.append(f"/static/uploads/listings/images/{unique_filename}")
+                    ref = media_store.save(session, file, 'image')
+                    images_list.append(ref.url)
+                    new_media.append(ref)
         elif 'images' in data and isinstance(data['images'], list):
              # Handle JSON payload images (if any legacy support needed)
              images_list = data['images']
+             media_store.retain(session, images_list)
 
         # Handle videos
         if 'videos' in request.files:
             files = request.files.getlist('videos')
             for file in files:
                 if file and file.filename:
-                    filename = secure_filename(file.filename)
-                    unique_filename = f"{uuid.uuid4()}_{filename}"
-                    file_path = os.path.join(VIDEOS_FOLDER, unique_filename)
-                    file.save(file_path)
-                    # Store relative path for URL access
-                    videos_list.append(f"/static/uploads/listings/videos/{unique_filename}")
+                    ref = media_store.save(session, file, 'video')
+                    videos_list.append(ref.url)
+                    new_media.append(ref)
 
         listing = listing_model(
             owner_id=data['owner_id'],
@@ -1841,13 +2326,289 @@ def create_app():
             videos=json.dumps(videos_list),
             status='active'
         )
+        listing.set_coordinates(latitude, longitude)
 
         session.add(listing)
         session.commit()
         session.refresh(listing)
+        # Serialize before closing session (to_dict reads the owner relationship)
+        result = listing.to_dict()
+        notify_saved_searches(session, listing)
+        from search_suggest import listing_entry
+        index_suggestions('listings', listing.id, listing_entry(listing))
         session.close()
 
-        return jsonify(listing.to_dict()), 201
+        # Thumbnails and medium sizes are rendered in the background
+        for ref in new_media:
+            if ref.created:
+                media_pipeline.enqueue(ref.sha256)
+
+        return jsonify(result), 201
+
+    @app.route('/listings/bulk-import', methods=['POST'])
+    @limiter.limit("10 per hour")
+    def bulk_import_listings():
+        """
+        Import many listings from a CSV or NDJSON upload.
+
+        The file comes as multipart field 'file' or as the raw request body;
+        owner_id as a form field or query parameter. Rows are processed in
+        the background; poll /listings/bulk-import/<job_id> for progress and
+        the per-row error report.
+        """
+        if not db_available or session_local is None or listing_model is None or import_job_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        from bulk_import import ImportRunner, detect_format, spool_upload
+
+        upload = request.files.get('file')
+        try:
+            fmt = detect_format(upload.filename if upload else None,
+                                upload.mimetype if upload else request.mimetype,
+                                request.args.get('format'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        owner_id = request.form.get('owner_id') or request.args.get('owner_id')
+        if not owner_id:
+            return jsonify({'error': 'missing required field: owner_id'}), 400
+
+        session = session_local()
+        try:
+            owner = session.query(user_model).filter_by(id=owner_id).first()
+            if not owner:
+                return jsonify({'error': 'owner not found'}), 404
+            if owner.is_banned:
+                reason = owner.ban_reason if owner.ban_reason else "No reason provided"
+                return jsonify({'error': f'user is banned: {reason}'}), 403
+
+            # Spool to disk in chunks; the upload is never held in memory
+            path = spool_upload(upload.stream if upload else request.stream)
+            job = import_job_model(id=str(uuid.uuid4()), owner_id=owner.id, format=fmt, status='pending')
+            session.add(job)
+            session.commit()
+            job_id = job.id
+            owner_id = owner.id
+        finally:
+            session.close()
+
+        def imported(session, listings):
+            from search_suggest import listing_entry
+            for listing in listings:
+                index_suggestions('listings', listing.id, listing_entry(listing))
+            # Each committed batch is matched against saved searches in one pass
+            if search_matcher.notify_many(session, listings):
+                session.commit()
+
+        runner = ImportRunner(session_local, listing_model, import_job_model,
+                              batch_size=config.BULK_IMPORT_BATCH_SIZE, media_store=media_store,
+                              on_saved=imported)
+        if background_writes:
+            import threading
+            threading.Thread(target=runner.run, args=(job_id, path, fmt, owner_id),
+                             name=f'listing-import-{job_id}', daemon=True).start()
+        else:
+            runner.run(job_id, path, fmt, owner_id)
+
+        session = session_local()
+        result = session.query(import_job_model).filter_by(id=job_id).first().to_dict()
+        session.close()
+        result['status_url'] = url_for('get_bulk_import', job_id=job_id)
+        return jsonify(result), 202
+
+    @app.route('/listings/bulk-import/<job_id>', methods=['GET'])
+    def get_bulk_import(job_id):
+        """Get progress and the error report of a bulk listing import"""
+        if not db_available or session_local is None or import_job_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        session = session_local()
+        job = session.query(import_job_model).filter_by(id=job_id).first()
+        if not job:
+            session.close()
+            return jsonify({'error': 'import job not found'}), 404
+        result = job.to_dict()
+        session.close()
+        result['status_url'] = url_for('get_bulk_import', job_id=job_id)
+        return jsonify(result), 200
+
+    # ---------------- Resumable chunked uploads ----------------
+    def upload_error(e):
+        body = {'error': str(e)}
+        if e.expected_chunk is not None:
+            body['next_chunk'] = e.expected_chunk
+        return jsonify(body), e.status
+
+    def upload_payload(upload):
+        result = upload.to_dict()
+        result['chunk_url'] = f'/uploads/{upload.id}/chunks/{{index}}'
+        result['complete_url'] = f'/uploads/{upload.id}/complete'
+        return result
+
+    @app.route('/uploads', methods=['POST'])
+    @limiter.limit("30 per hour")
+    def init_upload():
+        """
+        Start a resumable upload.
+
+        Body: owner_id, purpose (listing_video, listing_image, verification_document),
+        filename, size (bytes) and optional content_type. Chunks of chunk_size bytes
+        are then PUT to chunk_url in order.
+        """
+        if not db_available or session_local is None or upload_session_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        from chunked_upload import UploadError
+
+        data = request.get_json(silent=True)
+        if not data or not all(k in data for k in ('owner_id', 'purpose', 'size')):
+            return jsonify({'error': 'missing required fields: owner_id, purpose, size'}), 400
+
+        session = session_local()
+        try:
+            owner = session.query(user_model).filter_by(id=data['owner_id']).first()
+            if not owner:
+                return jsonify({'error': 'owner not found'}), 404
+            if owner.is_banned:
+                reason = owner.ban_reason if owner.ban_reason else "No reason provided"
+                return jsonify({'error': f'account is banned\nReason: {reason}'}), 403
+
+            chunked_uploads.expire(session)
+            upload = chunked_uploads.create(session, str(uuid.uuid4()), owner.id, data['purpose'],
+                                            data.get('filename'), data['size'], data.get('content_type'))
+            session.commit()
+            return jsonify(upload_payload(upload)), 201
+        except UploadError as e:
+            session.rollback()
+            return upload_error(e)
+        finally:
+            session.close()
+
+    @app.route('/uploads/<upload_id>', methods=['GET'])
+    def get_upload(upload_id):
+        """Progress of an upload; next_chunk tells a reconnecting client where to resume"""
+        if not db_available or session_local is None or upload_session_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        session = session_local()
+        upload = session.query(upload_session_model).filter_by(id=upload_id).first()
+        result = upload_payload(upload) if upload else None
+        session.close()
+        if result is None:
+            return jsonify({'error': 'upload not found'}), 404
+        return jsonify(result), 200
+
+    @app.route('/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+    def upload_chunk(upload_id, index):
+        """Write one chunk; the raw request body is streamed to disk"""
+        if not db_available or session_local is None or upload_session_model is None:
+            return jsonify({'error': 'database not available'}), 503
+        if request.content_length is None:
+            return jsonify({'error': 'Content-Length is required'}), 411
+
+        from chunked_upload import UploadError
+
+        session = session_local()
+        try:
+            upload = session.query(upload_session_model).filter_by(id=upload_id).first()
+            if not upload:
+                return jsonify({'error': 'upload not found'}), 404
+            chunked_uploads.write_chunk(session, upload, index, request.stream, request.content_length)
+            return jsonify(upload_payload(upload)), 200
+        except UploadError as e:
+            session.rollback()
+            return upload_error(e)
+        finally:
+            session.close()
+
+    @app.route('/uploads/<upload_id>/complete', methods=['POST'])
+    def complete_upload(upload_id):
+        """
+        Attach a fully received upload.
+
+        Body: listing_id for listing_video/listing_image uploads (appended to
+        the listing's videos/images), document_id for verification_document
+        uploads (stored as the document's file).
+        """
+        if not db_available or session_local is None or upload_session_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        from chunked_upload import UploadError
+
+        data = request.get_json(silent=True) or {}
+        session = session_local()
+        try:
+            upload = session.query(upload_session_model).filter_by(id=upload_id).first()
+            if not upload:
+                return jsonify({'error': 'upload not found'}), 404
+            path = chunked_uploads.assembled_path(upload)
+
+            new_media = None
+            if upload.purpose == 'verification_document':
+                if 'document_id' not in data:
+                    return jsonify({'error': 'missing required field: document_id'}), 400
+                target = session.query(verification_doc_model).filter_by(id=data['document_id']).first()
+                if not target:
+                    return jsonify({'error': 'document not found'}), 404
+                if target.user_id != upload.owner_id:
+                    return jsonify({'error': 'unauthorized: document belongs to another user'}), 403
+                filename = f"{int(time.time())}_{upload.filename}"
+                upload_dir = os.path.join(config.BASE_DIR, 'static', 'uploads', 'verifications')
+                os.makedirs(upload_dir, exist_ok=True)
+                shutil.move(path, os.path.join(upload_dir, filename))
+                target.document_path = f'/static/uploads/verifications/{filename}'
+                upload.result_url = target.document_path
+            else:
+                if 'listing_id' not in data:
+                    return jsonify({'error': 'missing required field: listing_id'}), 400
+                target = session.query(listing_model).filter_by(id=data['listing_id']).first()
+                if not target:
+                    return jsonify({'error': 'listing not found'}), 404
+                if target.owner_id != upload.owner_id:
+                    return jsonify({'error': 'unauthorized: only owner can add media to listing'}), 403
+                kind = 'video' if upload.purpose == 'listing_video' else 'image'
+                new_media = media_store.store_file(session, path, kind, upload.filename, upload.content_type)
+                column = 'videos' if kind == 'video' else 'images'
+                items = json.loads(getattr(target, column) or '[]')
+                items.append(new_media.url)
+                setattr(target, column, json.dumps(items))
+                upload.result_url = new_media.url
+
+            upload.status = 'completed'
+            upload.updated_at = datetime.datetime.now(datetime.timezone.utc)
+            session.commit()
+            result = {'upload': upload_payload(upload),
+                      'document' if upload.purpose == 'verification_document' else 'listing': target.to_dict()}
+            if upload.purpose != 'verification_document':
+                notify_saved_searches(session, target)
+        except UploadError as e:
+            session.rollback()
+            return upload_error(e)
+        finally:
+            session.close()
+
+        if new_media is not None and new_media.created:
+            media_pipeline.enqueue(new_media.sha256)
+        return jsonify(result), 200
+
+    @app.route('/uploads/<upload_id>', methods=['DELETE'])
+    def abort_upload(upload_id):
+        """Abandon an upload and delete its partial file"""
+        if not db_available or session_local is None or upload_session_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        session = session_local()
+        upload = session.query(upload_session_model).filter_by(id=upload_id).first()
+        if not upload:
+            session.close()
+            return jsonify({'error': 'upload not found'}), 404
+        if upload.status == 'uploading':
+            upload.status = 'aborted'
+            chunked_uploads.discard(upload)
+            session.commit()
+        result = upload_payload(upload)
+        session.close()
+        return jsonify(result), 200
 
     @app.route('/listings/<int:listing_id>/update', methods=['POST', 'PUT'])
     def update_listing(listing_id):
@@ -1894,173 +2655,560 @@ def create_app():
             listing.location_area = data['location_area']
         if 'listing_type' in data:
             listing.listing_type = data['listing_type']
+        if 'latitude' in data or 'longitude' in data:
+            latitude = data.get('latitude')
+            longitude = data.get('longitude')
+            cleared = [value in (None, '') for value in (latitude, longitude)]
+            # Both values set the location and both empty clear it; half a point is rejected
+            if 'latitude' not in data or 'longitude' not in data or cleared[0] != cleared[1]:
+                session.close()
+                return jsonify({'error': 'invalid coordinates: send latitude and longitude together '
+                                         '(both null to clear the location)'}), 400
+            try:
+                listing.set_coordinates(None if cleared[0] else latitude, None if cleared[1] else longitude)
+            except (TypeError, ValueError) as e:
+                session.close()
+                return jsonify({'error': f'invalid coordinates: {e}'}), 400
 
         # Handle file uploads for images and videos
         import json
-        import os
-        from werkzeug.utils import secure_filename
 
-        # Base upload directory
-        UPLOAD_FOLDER = os.path.join('static', 'uploads', 'listings')
-        IMAGES_FOLDER = os.path.join(UPLOAD_FOLDER, 'images')
-        VIDEOS_FOLDER = os.path.join(UPLOAD_FOLDER, 'videos')
+        def stored_list(value):
+            if not value:
+                return []
+            try:
+                return json.loads(value)
+            except ValueError:
+                return []
+
+        def removal_list(value):
+            return value.split(',') if isinstance(value, str) else value
 
-        os.makedirs(IMAGES_FOLDER, exist_ok=True)
-        os.makedirs(VIDEOS_FOLDER, exist_ok=True)
+        new_media = []
+        released = False
 
         # Handle image removal (if specified)
         if 'remove_images' in data:
-            # Parse existing images
-            existing_images = []
-            if listing.images:
-                try:
-                    existing_images = json.loads(listing.images)
-                except:
-                    existing_images = []
-            
-            # Remove specified images
-            remove_list = data['remove_images'].split(',') if isinstance(data['remove_images'], str) else data['remove_images']
-            existing_images = [img for img in existing_images if img not in remove_list]
-            listing.images = json.dumps(existing_images)
+            existing_images = stored_list(listing.images)
+            remove_list = removal_list(data['remove_images'])
+            media_store.release(session, [img for img in existing_images if img in remove_list])
+            released = True
+            listing.images = json.dumps([img for img in existing_images if img not in remove_list])
 
         # Handle new images (if provided)
         if 'images' in request.files:
-            # Parse existing images
-            existing_images = []
-            if listing.images:
-                try:
-                    existing_images = json.loads(listing.images)
-                except:
-                    existing_images = []
+            existing_images = stored_list(listing.images)
+            for file in request.files.getlist('images'):
+                if file and file.filename:
+                    ref = media_store.save(session, file, 'image')
+                    existing_images.append(ref.url)
+                    new_media.append(ref)
+            listing.images = json.dumps(existing_images)
+
+        # Handle video removal (if specified)
+        if 'remove_videos' in data:
+            existing_videos = stored_list(listing.videos)
+            remove_list = removal_list(data['remove_videos'])
+            media_store.release(session, [vid for vid in existing_videos if vid in remove_list])
+            released = True
+            listing.videos = json.dumps([vid for vid in existing_videos if vid not in remove_list])
+
+        # Handle new videos (if provided)
+        if 'videos' in request.files:
+            existing_videos = stored_list(listing.videos)
+            for file in request.files.getlist('videos'):
+                if file and file.filename:
+                    ref = media_store.save(session, file, 'video')
+                    existing_videos.append(ref.url)
+                    new_media.append(ref)
+            listing.videos = json.dumps(existing_videos)
+
+        session.commit()
+        session.refresh(listing)
+        # Serialize before closing session (to_dict reads the owner relationship)
+        result = listing.to_dict()
+        notify_saved_searches(session, listing)
+        from search_suggest import listing_entry
+        index_suggestions('listings', listing.id, listing_entry(listing))
+        if released:
+            media_store.collect(session)
+        session.close()
+
+        for ref in new_media:
+            if ref.created:
+                media_pipeline.enqueue(ref.sha256)
+
+        return jsonify(result), 200
+
+
+    def serialize_listing_cards(session, listings, extra_views=None):
+        """
+        JSON text for each listing, reusing cached fragments for unchanged listings.
+
+        Owners of cache misses are loaded in one query so to_dict() resolves
+        listing.owner from the identity map instead of lazy loading per row.
+        """
+        from payload_cache import listing_fragment, complete_fragment
+
+        fragments = {}
+        missed = []
+        for listing in listings:
+            fragment = listing_cache.get(listing.id, listing.updated_at)
+            if fragment is None:
+                missed.append(listing)
+            else:
+                fragments[listing.id] = fragment
+
+        if missed:
+            owner_ids = {listing.owner_id for listing in missed}
+            session.query(user_model).filter(user_model.id.in_(owner_ids)).all()
+            for listing in missed:
+                fragment = listing_fragment(listing)
+                listing_cache.put(listing.id, listing.updated_at, fragment, owner_id=listing.owner_id)
+                fragments[listing.id] = fragment
+
+        extra_views = extra_views or {}
+        return [complete_fragment(fragments[listing.id], (listing.views or 0) + extra_views.get(listing.id, 0))
+                for listing in listings]
+
+    def json_array_response(items):
+        """Response for a JSON array assembled from already-serialized items"""
+        return Response('[' + ','.join(items) + ']', mimetype='application/json')
+
+    def notify_saved_searches(session, listing):
+        """Notify the saved searches a just-committed listing matches; never fails the write itself"""
+        try:
+            if search_matcher.notify(session, listing):
+                session.commit()
+        except Exception:
+            session.rollback()
+            logging.exception('Saved search matching failed for listing %s', listing.id)
+
+    def index_suggestions(scope, record_id, entry):
+        """Apply a just-committed record to the search-box suggestions; never fails the write itself"""
+        try:
+            search_suggester.update(scope, record_id, entry)
+        except Exception:
+            logging.exception('Search suggestion update failed for %s %s', scope, record_id)
+
+    def release_listing_media(session, listing):
+        """Drop the listing's references to its stored images and videos"""
+        import json
+        for value in (listing.images, listing.videos):
+            try:
+                media_store.release(session, json.loads(value) if value else [])
+            except ValueError:
+                pass
+
+    def read_validators(session, tables, row=None):
+        """ETag/Last-Modified for the current request, or None when versions aren't tracked"""
+        if not validators_available:
+            return None
+        from conditional import table_validators
+        return table_validators(session, table_version_model, tables, request, row=row)
+
+    def with_validators(response, validators):
+        """Attach validators (if any) to a Response"""
+        return validators.apply(response) if validators is not None else response
+
+    def filter_listings(query, args):
+        """
+        Apply the shared /listings filters (type, status, state, price, featured, q).
+
+        Returns:
+            tuple: (query, matches) where matches is the FTS5 match subquery when
+            ?q= was answered from the full-text index, otherwise None
+        """
+        listing_type = args.get('listing_type')
+        if listing_type:
+            query = query.filter(listing_model.listing_type == listing_type)
+
+        status = args.get('status')
+        if status:
+            query = query.filter(listing_model.status == status)
+        else:
+            # Default to active listings only
+            query = query.filter(listing_model.status == 'active')
+
+        location_state = args.get('location_state')
+        if location_state:
+            query = query.filter(listing_model.location_state == location_state)
+
+        # Price range filters
+        min_price = args.get('min_price')
+        if min_price:
+            try:
+                query = query.filter(listing_model.price >= int(min_price))
+            except ValueError:
+                pass
+
+        max_price = args.get('max_price')
+        if max_price:
+            try:
+                query = query.filter(listing_model.price <= int(max_price))
+            except ValueError:
+                pass
+
+        # Only listings with a boost that has not expired yet
+        featured = args.get('featured')
+        if featured and featured.lower() == 'true':
+            from boost_sweeper import boost_active
+            query = query.filter(boost_active(listing_model))
+
+        # Search
+        search_query = (args.get('q') or '').strip()
+        matches = None
+        if search_query and listing_search_available:
+            from search_index import build_match_query, listing_match_subquery
+            match = build_match_query(search_query)
+            if match:
+                # Answer from the FTS5 index; rank is the bm25 relevance score
+                matches = listing_match_subquery(match)
+                query = query.join(matches, matches.c.listing_id == listing_model.id)
+            else:
+                # Only punctuation (e.g. ?q=%%%): nothing can match, rather than everything
+                from sqlalchemy import false
+                query = query.filter(false())
+        elif search_query:
+            from sqlalchemy import or_
+            search_term = f"%{search_query}%"
+            query = query.filter(or_(
+                listing_model.title.ilike(search_term),
+                listing_model.description.ilike(search_term),
+                listing_model.location_state.ilike(search_term),
+                listing_model.location_area.ilike(search_term)
+            ))
+
+        return query, matches
+
+    def listings_near(session, args):
+        """
+        Listings within radius_km of ?near=lat,lon, nearest first.
+
+        Candidates come from an indexed range scan over the geohash cells
+        covering the circle; exact haversine distances are computed only for
+        those (id, lat, lon) rows, and full rows are loaded for the page.
+
+        Returns:
+            tuple: (response, status)
+        """
+        from sqlalchemy import and_, or_
+        from geo import parse_point, covering_cells, bounding_box, haversine_km
+        from pagination import parse_limit
+
+        try:
+            latitude, longitude = parse_point(args.get('near'))
+            radius_km = float(args.get('radius_km', 25))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        radius_km = max(0.1, min(radius_km, 1000.0))
+        limit = parse_limit(args.get('limit'))
+
+        cells = covering_cells(latitude, longitude, radius_km)
+        min_lat, min_lon, max_lat, max_lon = bounding_box(latitude, longitude, radius_km)
+        query = session.query(listing_model.id, listing_model.latitude, listing_model.longitude)
+        query, _ = filter_listings(query, args)
+        query = query.filter(
+            or_(*[and_(listing_model.geohash >= cell, listing_model.geohash < cell + '~') for cell in cells]),
+            listing_model.latitude.between(min_lat, max_lat),
+            listing_model.longitude.between(min_lon, max_lon),
+        )
+
+        distances = {}
+        for listing_id, lat, lon in query:
+            distance = haversine_km(latitude, longitude, lat, lon)
+            if distance <= radius_km:
+                distances[listing_id] = distance
+        nearest = sorted(distances, key=lambda i: (distances[i], i))[:limit]
+
+        listings = session.query(listing_model).filter(listing_model.id.in_(nearest)).all() if nearest else []
+        listings.sort(key=lambda l: (distances[l.id], l.id))
+        cards = serialize_listing_cards(session, listings)
+        # Cards end with '}', so the distance can be spliced in without re-serializing
+        cards = [card[:-1] + ',"distance_km":%s}' % round(distances[l.id], 3) for card, l in zip(cards, listings)]
+        return json_array_response(cards), 200
+
+    @app.route('/listings', methods=['GET'])
+    def get_listings():
+        """Get all marketplace listings with filtering"""
+        if not db_available or session_local is None or listing_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        session = session_local()
+        validators = read_validators(session, ('listings', 'users'))
+        if validators is not None and validators.matches(request):
+            session.close()
+            return validators.not_modified()
+
+        if request.args.get('near'):
+            try:
+                response, status = listings_near(session, request.args)
+                return with_validators(response, validators) if status == 200 else response, status
+            finally:
+                session.close()
+
+        # Sparse fieldsets: ?fields=card or ?fields=id,title,price
+        from projections import LISTING_FIELDS
+        try:
+            fields = LISTING_FIELDS.parse(request.args.get('fields'))
+        except ValueError as e:
+            session.close()
+            return jsonify({'error': str(e)}), 400
+
+        query = session.query(listing_model)
+
+        # Apply filters from query parameters
+        query, matches = filter_listings(query, request.args)
+
+        # Sorting (keyset pagination: each sort order maps to a (key, id) index)
+        sort_by = request.args.get('sort_by', 'relevance' if matches is not None else 'recent')
+        row_key = None
+        if sort_by == 'relevance' and matches is not None:
+            key_column, descending = matches.c.rank, False
+            row_key = lambda row: (row.rank, row.id if fields else row[0].id)
+        elif sort_by == 'price_low':
+            key_column, descending = listing_model.price, False
+        elif sort_by == 'price_high':
+            key_column, descending = listing_model.price, True
+        elif sort_by == 'oldest':
+            key_column, descending = listing_model.created_at, False
+        else: # recent
+            sort_by = 'recent'
+            key_column, descending = listing_model.created_at, True
+
+        if fields:
+            # Select only the requested columns (plus the sort key), joining the owner only if needed
+            required = (key_column.key,) if row_key is None else ()
+            query = LISTING_FIELDS.select(query, listing_model, fields, required=required)
+        if matches is not None:
+            query = query.add_columns(matches.c.rank)
+
+        from pagination import paginate_featured_first, parse_limit, InvalidCursor
+        from boost_sweeper import boost_active, boost_inactive
+        limit = parse_limit(request.args.get('limit'))
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            # Listings with a live boost come first, each segment in sort order
+            listings, next_cursor = paginate_featured_first(
+                query.filter(boost_active(listing_model, now)), query.filter(boost_inactive(listing_model, now)),
+                key_column, listing_model.id, descending, sort_by,
+                cursor=request.args.get('cursor'), limit=limit, row_key=row_key)
+        except InvalidCursor as e:
+            session.close()
+            return jsonify({'error': str(e)}), 400
+        if fields:
+            items = LISTING_FIELDS.render(fields, listings)
+            if 'cover_image' in fields:
+                # Cards show the cover at thumbnail size once it has been rendered
+                for item in items:
+                    item['cover_image'] = media_store.variant_url(item['cover_image'], 'thumb')
+            response = jsonify(items)
+            session.close()
+        else:
+            if matches is not None:
+                # Search rows are (listing, rank) pairs
+                listings = [row[0] for row in listings]
+
+            # Serialize before closing session
+            cards = serialize_listing_cards(session, listings)
+            session.close()
+            response = json_array_response(cards)
+        if next_cursor:
+            # Body stays a plain array; the next page is advertised in headers
+            response.headers['X-Next-Cursor'] = next_cursor
+            next_args = request.args.to_dict()
+            next_args['cursor'] = next_cursor
+            response.headers['Link'] = f'<{url_for("get_listings", **next_args)}>; rel="next"'
+        return with_validators(response, validators), 200
+
+    # ---------------- Saved searches ----------------
+    @app.route('/saved-searches', methods=['POST'])
+    def create_saved_search():
+        """
+        Save a listing search to be notified about matching new or edited listings.
+
+        Body: user_id and any of name, listing_type, location_state, min_price,
+        max_price, q (keywords; like /listings?q=, each must start a word of the listing).
+        """
+        if not db_available or session_local is None or saved_search_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        data = request.get_json(silent=True)
+        if not data or 'user_id' not in data:
+            return jsonify({'error': 'missing required field: user_id'}), 400
+
+        try:
+            min_price = float(data['min_price']) if data.get('min_price') not in (None, '') else None
+            max_price = float(data['max_price']) if data.get('max_price') not in (None, '') else None
+        except (TypeError, ValueError):
+            return jsonify({'error': 'min_price and max_price must be numbers'}), 400
+        if min_price is not None and max_price is not None and min_price > max_price:
+            return jsonify({'error': 'min_price must not exceed max_price'}), 400
+        keywords = (data.get('q') or data.get('keywords') or '').strip() or None
+        if keywords and len(keywords) > 200:
+            return jsonify({'error': 'keywords must be at most 200 characters'}), 400
+
+        session = session_local()
+        user = session.query(user_model).filter_by(id=data['user_id']).first()
+        if not user:
+            session.close()
+            return jsonify({'error': 'user not found'}), 404
 
-            # Add new images
-            files = request.files.getlist('images')
-            for file in files:
-                if file and file.filename:
-                    filename = secure_filename(file.filename)
-                    unique_filename = f"{uuid.uuid4()}_{filename}"
-                    file_path = os.path.join(IMAGES_FOLDER, unique_filename)
-                    file.save(file_path)
-                    existing_images.append(f"/static/uploads/listings/images/{unique_filename}")
+        search = saved_search_model(
+            user_id=user.id,
+            name=data.get('name'),
+            listing_type=data.get('listing_type') or None,
+            location_state=data.get('location_state') or None,
+            min_price=min_price,
+            max_price=max_price,
+            keywords=keywords
+        )
+        search_matcher.index(session, search)
+        session.add(search)
+        session.commit()
+        result = search.to_dict()
+        session.close()
+        return jsonify(result), 201
 
-            listing.images = json.dumps(existing_images)
+    @app.route('/saved-searches/user/<int:user_id>', methods=['GET'])
+    def get_saved_searches(user_id):
+        """List a user's saved searches"""
+        if not db_available or session_local is None or saved_search_model is None:
+            return jsonify({'error': 'database not available'}), 503
 
-        # Handle video removal (if specified)
-        if 'remove_videos' in data:
-            # Parse existing videos
-            existing_videos = []
-            if listing.videos:
-                try:
-                    existing_videos = json.loads(listing.videos)
-                except:
-                    existing_videos = []
-            
-            # Remove specified videos
-            remove_list = data['remove_videos'].split(',') if isinstance(data['remove_videos'], str) else data['remove_videos']
-            existing_videos = [vid for vid in existing_videos if vid not in remove_list]
-            listing.videos = json.dumps(existing_videos)
+        session = session_local()
+        searches = (session.query(saved_search_model).filter_by(user_id=user_id)
+                    .order_by(saved_search_model.id.desc()).all())
+        result = [search.to_dict() for search in searches]
+        session.close()
+        return jsonify(result), 200
 
-        # Handle new videos (if provided)
-        if 'videos' in request.files:
-            # Parse existing videos
-            existing_videos = []
-            if listing.videos:
-                try:
-                    existing_videos = json.loads(listing.videos)
-                except:
-                    existing_videos = []
+    @app.route('/saved-searches/<int:search_id>', methods=['DELETE'])
+    def delete_saved_search(search_id):
+        """Delete a saved search (owner only) with its index entries and notifications"""
+        if not db_available or session_local is None or saved_search_model is None:
+            return jsonify({'error': 'database not available'}), 503
 
-            # Add new videos
-            files = request.files.getlist('videos')
-            for file in files:
-                if file and file.filename:
-                    filename = secure_filename(file.filename)
-                    unique_filename = f"{uuid.uuid4()}_{filename}"
-                    file_path = os.path.join(VIDEOS_FOLDER, unique_filename)
-                    file.save(file_path)
-                    existing_videos.append(f"/static/uploads/listings/videos/{unique_filename}")
+        data = request.get_json(silent=True)
+        if not data or 'user_id' not in data:
+            return jsonify({'error': 'missing required field: user_id'}), 400
 
-            listing.videos = json.dumps(existing_videos)
+        session = session_local()
+        search = session.query(saved_search_model).filter_by(id=search_id).first()
+        if not search:
+            session.close()
+            return jsonify({'error': 'saved search not found'}), 404
+        if search.user_id != data['user_id']:
+            session.close()
+            return jsonify({'error': 'unauthorized: only owner can delete saved search'}), 403
 
+        search_matcher.remove(session, search)
         session.commit()
-        session.refresh(listing)
         session.close()
+        return jsonify({'message': 'saved search deleted successfully'}), 200
 
-        return jsonify(listing.to_dict()), 200
-
+    @app.route('/saved-searches/notifications/<int:user_id>', methods=['GET'])
+    def get_search_notifications(user_id):
+        """
+        Listings that matched a user's saved searches, newest first.
 
-    @app.route('/listings', methods=['GET'])
-    def get_listings():
-        """Get all marketplace listings with filtering"""
-        if not db_available or session_local is None or listing_model is None:
+        Optional: ?unread=1, ?limit= and ?cursor= (next page in X-Next-Cursor).
+        """
+        if not db_available or session_local is None or search_notification_model is None:
             return jsonify({'error': 'database not available'}), 503
 
+        from pagination import paginate, parse_limit, InvalidCursor
+
         session = session_local()
-        query = session.query(listing_model).options(joinedload(listing_model.owner))
+        notification = search_notification_model
+        query = (session.query(notification, listing_model)
+                 .join(listing_model, listing_model.id == notification.listing_id)
+                 .options(joinedload(listing_model.owner))
+                 .filter(notification.user_id == user_id))
+        if request.args.get('unread') in ('1', 'true'):
+            query = query.filter(notification.read == False)  # noqa: E712
+        try:
+            rows, next_cursor = paginate(query, notification.id, notification.id, True, 'newest',
+                                         cursor=request.args.get('cursor'), limit=parse_limit(request.args.get('limit')),
+                                         row_key=lambda row: (row[0].id, row[0].id))
+        except InvalidCursor as e:
+            session.close()
+            return jsonify({'error': str(e)}), 400
+        result = [dict(match.to_dict(), listing=listing.to_dict()) for match, listing in rows]
+        session.close()
 
-        # Apply filters from query parameters
-        listing_type = request.args.get('listing_type')
-        if listing_type:
-            query = query.filter_by(listing_type=listing_type)
+        response = jsonify(result)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response, 200
 
-        status = request.args.get('status')
-        if status:
-            query = query.filter_by(status=status)
-        else:
-            # Default to active listings only
-            query = query.filter_by(status='active')
+    @app.route('/saved-searches/notifications/<int:user_id>/read', methods=['POST'])
+    def mark_search_notifications_read(user_id):
+        """Mark notifications read: body {"ids": [...]}, or all of the user's when ids is omitted"""
+        if not db_available or session_local is None or search_notification_model is None:
+            return jsonify({'error': 'database not available'}), 503
 
-        location_state = request.args.get('location_state')
-        if location_state:
-            query = query.filter_by(location_state=location_state)
+        data = request.get_json(silent=True) or {}
+        session = session_local()
+        query = session.query(search_notification_model).filter(search_notification_model.user_id == user_id,
+                                                                 search_notification_model.read == False)  # noqa: E712
+        if data.get('ids') is not None:
+            query = query.filter(search_notification_model.id.in_(data['ids']))
+        updated = query.update({search_notification_model.read: True}, synchronize_session=False)
+        session.commit()
+        session.close()
+        return jsonify({'updated': updated}), 200
 
-        # Price range filters
-        min_price = request.args.get('min_price')
-        if min_price:
-            try:
-                query = query.filter(listing_model.price >= int(min_price))
-            except ValueError:
-                pass
+    @app.route('/listings/facets', methods=['GET'])
+    def get_listing_facets():
+        """Get listing counts by type, state, price type and price bucket for the marketplace sidebar"""
+        if not db_available or session_local is None or listing_model is None:
+            return jsonify({'error': 'database not available'}), 503
 
-        max_price = request.args.get('max_price')
-        if max_price:
-            try:
-                query = query.filter(listing_model.price <= int(max_price))
-            except ValueError:
-                pass
+        from facets import (FACET_DIMENSIONS, can_use_aggregate, aggregate_facet_counts,
+                            format_facets, price_bucket_expression)
 
-        # Featured listings first
-        featured = request.args.get('featured')
-        if featured and featured.lower() == 'true':
-            query = query.filter_by(featured=True)
-            
-        # Search
-        search_query = request.args.get('q')
-        if search_query:
-            from sqlalchemy import or_
-            search_term = f"%{search_query}%"
-            query = query.filter(or_(
-                listing_model.title.ilike(search_term),
-                listing_model.description.ilike(search_term),
-                listing_model.location_state.ilike(search_term),
-                listing_model.location_area.ilike(search_term)
-            ))
+        session = session_local()
+        try:
+            if listing_facets_available and can_use_aggregate(request.args):
+                counts = aggregate_facet_counts(session, listing_facet_model, request.args)
+            else:
+                # Search and price-range filters can't be answered from the aggregates
+                counts = {}
+                columns = [(d, getattr(listing_model, d)) for d in FACET_DIMENSIONS]
+                columns.append(('price_bucket', price_bucket_expression(listing_model.price)))
+                for dimension, column in columns:
+                    query = session.query(column, func.count(listing_model.id))
+                    query, _ = filter_listings(query, request.args)
+                    counts[dimension] = query.group_by(column).all()
+            result = format_facets(counts)
+        finally:
+            session.close()
 
-        # Sorting
-        sort_by = request.args.get('sort_by', 'recent')
-        if sort_by == 'price_low':
-            query = query.order_by(listing_model.price.asc())
-        elif sort_by == 'price_high':
-            query = query.order_by(listing_model.price.desc())
-        elif sort_by == 'oldest':
-            query = query.order_by(listing_model.created_at.asc())
-        else: # recent
-            query = query.order_by(listing_model.created_at.desc())
+        return jsonify(result), 200
 
-        listings = query.all()
-        # Serialize before closing session
-        result = [listing.to_dict() for listing in listings]
-        session.close()
+    @app.route('/listings/price-stats', methods=['GET'])
+    def get_listing_price_stats():
+        """Get price distribution (min/max/mean/p10/p50/p90, price per size unit) of active listings"""
+        if not db_available or session_local is None or listing_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        from price_stats import sketch_bins, bins_from_values, format_price_stats
+
+        session = session_local()
+        try:
+            if price_sketches_available:
+                bins = sketch_bins(session, price_sketch_model, request.args)
+            else:
+                query = session.query(listing_model.price, listing_model.size_value, listing_model.size_unit)
+                query = query.filter(listing_model.status == 'active')
+                for name in ('listing_type', 'location_state', 'price_type'):
+                    if request.args.get(name):
+                        query = query.filter(getattr(listing_model, name) == request.args.get(name))
+                bins = bins_from_values(query.all())
+            result = format_price_stats(bins, request.args)
+        finally:
+            session.close()
 
         return jsonify(result), 200
 
@@ -2071,19 +3219,98 @@ def create_app():
             return jsonify({'error': 'database not available'}), 503
 
         session = session_local()
-        listing = session.query(listing_model).options(joinedload(listing_model.owner)).filter_by(id=listing_id).first()
+        listing = session.query(listing_model).filter_by(id=listing_id).first()
 
         if not listing:
             session.close()
             return jsonify({'error': 'listing not found'}), 404
 
-        # Increment view count
-        listing.views += 1
-        session.commit()
-        session.refresh(listing)
+        # Count the view without a write transaction; include unflushed views in the response
+        view_counter.record('listing', listing_id)
+        validators = read_validators(session, ('users',), row=(listing.id, listing.updated_at))
+        if validators is not None and validators.matches(request):
+            session.close()
+            return validators.not_modified()
+
+        # ?image_variant=thumb|medium returns derivative image URLs (bypasses the payload cache)
+        variant = request.args.get('image_variant')
+        if variant and variant != 'original':
+            from media_store import VARIANTS
+            if variant not in VARIANTS:
+                session.close()
+                return jsonify({'error': f'image_variant must be one of: original, {", ".join(VARIANTS)}'}), 400
+            result = listing.to_dict(image_url=lambda url: media_store.variant_url(url, variant))
+            result['views'] = (listing.views or 0) + view_counter.pending('listing', listing_id)
+            session.close()
+            return with_validators(jsonify(result), validators), 200
+
+        card = serialize_listing_cards(session, [listing],
+                                       extra_views={listing_id: view_counter.pending('listing', listing_id)})[0]
         session.close()
 
-        return jsonify(listing.to_dict()), 200
+        return with_validators(Response(card, mimetype='application/json'), validators), 200
+
+
+    @app.route('/listings/<int:listing_id>/similar', methods=['GET'])
+    def get_similar_listings(listing_id):
+        """
+        Listings most similar to this one (same type; title, description, state and price).
+
+        Served from the precomputed similarity index without querying the
+        listings table, so it can lag a listing change by one refresh interval.
+        ?limit= caps the number of results (at most the index's neighbour count).
+        """
+        if not db_available or similar_listings is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        if similar_listings.interval <= 0:
+            similar_listings.refresh()
+        elif not similar_listings.built:
+            return jsonify({'error': 'similar listings are still being indexed'}), 503
+
+        from pagination import parse_limit
+        limit = parse_limit(request.args.get('limit'), default=similar_listings.k, maximum=similar_listings.k)
+        results = similar_listings.similar(listing_id, limit)
+        if results is None:
+            return jsonify({'error': 'listing not found'}), 404
+        for item in results:
+            if item['cover_image']:
+                item['cover_image'] = media_store.variant_url(item['cover_image'], 'thumb')
+
+        return jsonify({'listing_id': listing_id, 'similar': results}), 200
+
+
+    @app.route('/search/suggest', methods=['GET'])
+    @limiter.limit("300 per minute")
+    def search_suggest():
+        """
+        Keystroke autocomplete for the search boxes.
+
+        ?q= is the typed prefix, ?scope= workers, listings (default) or jobs,
+        ?limit= at most 10. Answered from in-memory prefix tries without a
+        database query; suggestions come most popular first, each with the
+        kind of phrase it is (name, specialization, state, area, title, location).
+        """
+        if not db_available or search_suggester is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        from search_suggest import SCOPES
+        scope = request.args.get('scope') or 'listings'
+        if scope not in SCOPES:
+            return jsonify({'error': f"scope must be one of {', '.join(SCOPES)}"}), 400
+
+        if not search_suggester.built:
+            if search_suggester.interval > 0:
+                return jsonify({'error': 'suggestions are still being indexed'}), 503
+            search_suggester.rebuild()
+
+        from pagination import parse_limit
+        q = request.args.get('q', '')
+        limit = parse_limit(request.args.get('limit'), default=search_suggester.k, maximum=search_suggester.k)
+        response = jsonify({'q': q, 'scope': scope, 'suggestions': search_suggester.suggest(scope, q, limit)})
+        response.cache_control.public = True
+        response.cache_control.max_age = 60
+        return response
 
 
     @app.route('/listings/<int:listing_id>', methods=['DELETE'])
@@ -2119,9 +3346,13 @@ def create_app():
             session.close()
             return jsonify({'error': f'account is banned\nReason: {reason}'}), 403
 
+        release_listing_media(session, listing)
         session.delete(listing)
         session.commit()
+        media_store.collect(session)
         session.close()
+        listing_cache.invalidate(listing_id)
+        index_suggestions('listings', listing_id, None)
 
         return jsonify({'message': 'listing deleted successfully'}), 200
 
@@ -2133,9 +3364,10 @@ def create_app():
 
         session = session_local()
         listings = session.query(listing_model).filter_by(owner_id=user_id).order_by(listing_model.created_at.desc()).all()
+        cards = serialize_listing_cards(session, listings)
         session.close()
 
-        return jsonify([listing.to_dict() for listing in listings]), 200
+        return json_array_response(cards), 200
 
     # ========== WORKER MARKETPLACE ENDPOINTS ==========
     
@@ -2215,94 +3447,177 @@ def create_app():
             portfolio_images=portfolio_json
         )
         session.add(profile)
+        session.flush()
+        # Index skills and certifications for the directory filters
+        from worker_tags import sync_tags
+        sync_tags(session, worker_tag_model, profile)
         session.commit()
         session.refresh(profile)
         # Eager load user for to_dict
         _ = profile.user
+        from search_suggest import worker_entry
+        index_suggestions('workers', profile.id, worker_entry(profile, profile.user.full_name))
         session.close()
 
         return jsonify(profile.to_dict()), 201
 
-    @app.route('/workers', methods=['GET'])
-    def get_workers():
-        """Get all worker profiles with optional filters"""
-        if not db_available or session_local is None or worker_profile_model is None:
-            return jsonify({'error': 'database not available'}), 503
-
-        session = session_local()
-        query = session.query(worker_profile_model).options(joinedload(worker_profile_model.user))
+    def worker_directory(session, args, fields=None, default_sort='recommended', default_rate='hourly'):
+        """
+        Filtered, keyset-paginated worker directory behind /workers and /api/workers/list.
+
+        Filters: specialization, available, available_from/available_to (no booking
+        in that window, see worker_calendar), location_state, min/max_hourly_rate,
+        min/max_daily_rate, min_experience, skills, certifications (comma-separated;
+        all must match unless ?skills_match= / ?certifications_match=any), q. Sorts: recommended (rating, then
+        jobs completed), experience, rate_low and rate_high (on ?rate=hourly|daily).
+        Profiles with a live boost come first in every order. Each sort walks
+        one of the worker_profiles indexes, so a page costs the same however
+        many workers there are.
+
+        Returns:
+            tuple: (rows, next_cursor)
+
+        Raises:
+            ValueError: For an unknown ?rate= or *_match= or a bad availability window
+                (InvalidCursor for a bad cursor)
+        """
+        model = worker_profile_model
+        query = session.query(model)
+        if not fields:
+            query = query.options(joinedload(model.user))
 
-        # Apply filters from query parameters
-        specialization = request.args.get('specialization')
+        specialization = args.get('specialization')
         if specialization:
-            query = query.filter_by(specialization=specialization)
-
-        available = request.args.get('available')
-        if available and available.lower() == 'true':
-            query = query.filter_by(available=True)
+            query = query.filter(model.specialization == specialization)
 
-        location_state = request.args.get('location_state')
-        if location_state:
-            query = query.filter_by(location_state=location_state)
-
-        # Rate range filters
-        min_rate = request.args.get('min_hourly_rate')
-        if min_rate:
-            try:
-                query = query.filter(worker_profile_model.hourly_rate >= int(min_rate))
-            except ValueError:
-                pass
+        available = (args.get('available') or '').lower()
+        if available in ('true', 'false'):
+            query = query.filter(model.available == (available == 'true'))
 
-        max_rate = request.args.get('max_hourly_rate')
-        if max_rate:
-            try:
-                query = query.filter(worker_profile_model.hourly_rate <= int(max_rate))
-            except ValueError:
-                pass
+        # Free for the whole window: available and not booked in it
+        from worker_calendar import booked_filter, parse_window
+        window = parse_window(args.get('available_from'), args.get('available_to'))
+        if window is not None:
+            query = query.filter(model.available == True, booked_filter(model, worker_booking_model, *window))  # noqa: E712
 
-        # Minimum experience filter
-        min_experience = request.args.get('min_experience')
-        if min_experience:
+        location_state = args.get('location_state')
+        if location_state:
+            query = query.filter(model.location_state == location_state)
+
+        # Numeric filters ignore values that don't parse
+        for param, column, compare in (('min_hourly_rate', model.hourly_rate, 'ge'),
+                                       ('max_hourly_rate', model.hourly_rate, 'le'),
+                                       ('min_daily_rate', model.daily_rate, 'ge'),
+                                       ('max_daily_rate', model.daily_rate, 'le'),
+                                       ('min_experience', model.experience_years, 'ge')):
             try:
-                query = query.filter(worker_profile_model.experience_years >= int(min_experience))
+                value = float(args.get(param) or '')
             except ValueError:
-                pass
-                
-        # Search
-        search_query = request.args.get('q')
+                continue
+            query = query.filter(column >= value if compare == 'ge' else column <= value)
+
+        # Skills/certifications are answered from the worker_tags index
+        from worker_tags import FIELDS, parse_tags, tag_filter
+        for param, kind in FIELDS.items():
+            tags = parse_tags(args.get(param))
+            match = args.get(f'{param}_match') or 'all'
+            if match not in ('all', 'any'):
+                raise ValueError(f'{param}_match must be all or any')
+            if tags:
+                query = query.filter(tag_filter(model, worker_tag_model, kind, tags, match_all=match == 'all'))
+
+        search_query = args.get('q')
         if search_query:
             from sqlalchemy import or_
             search_term = f"%{search_query}%"
-            # Join with user model to search by name
-            query = query.join(worker_profile_model.user).filter(or_(
-                worker_profile_model.specialization.ilike(search_term),
-                worker_profile_model.bio.ilike(search_term),
-                worker_profile_model.location_state.ilike(search_term),
-                worker_profile_model.location_area.ilike(search_term),
+            query = query.join(model.user).filter(or_(
+                model.specialization.ilike(search_term),
+                model.bio.ilike(search_term),
+                model.location_state.ilike(search_term),
+                model.location_area.ilike(search_term),
                 user_model.full_name.ilike(search_term)
             ))
 
-        # Sorting
-        sort_by = request.args.get('sort_by', 'recommended')
-        
-        # Always prioritize boosted profiles
-        if sort_by == 'rating':
-            query = query.order_by(worker_profile_model.is_boosted.desc(), worker_profile_model.rating.desc())
-        elif sort_by == 'experience':
-            query = query.order_by(worker_profile_model.is_boosted.desc(), worker_profile_model.experience_years.desc())
-        elif sort_by == 'rate_low':
-            query = query.order_by(worker_profile_model.is_boosted.desc(), worker_profile_model.hourly_rate.asc())
-        elif sort_by == 'rate_high':
-            query = query.order_by(worker_profile_model.is_boosted.desc(), worker_profile_model.hourly_rate.desc())
-        else: # recommended / default
-            query = query.order_by(worker_profile_model.is_boosted.desc(), worker_profile_model.rating.desc(), worker_profile_model.total_jobs.desc())
-
-        workers = query.all()
+        rate = args.get('rate') or default_rate
+        if rate not in ('hourly', 'daily'):
+            raise ValueError('rate must be hourly or daily')
+        sort_by = args.get('sort_by') or default_sort
+        nullable = False
+        if sort_by == 'experience':
+            key_column, descending, nullable = model.experience_years, True, True
+        elif sort_by in ('rate_low', 'rate_high'):
+            key_column = model.hourly_rate if rate == 'hourly' else model.daily_rate
+            descending, nullable = sort_by == 'rate_high', True
+            sort_by = f'{sort_by}:{rate}'
+        else: # recommended / rating
+            sort_by = 'recommended'
+            key_column, descending = (model.rating, model.total_jobs), True
+
+        if fields:
+            from projections import WORKER_FIELDS
+            keys = key_column if isinstance(key_column, tuple) else (key_column,)
+            query = WORKER_FIELDS.select(query, model, fields, required=tuple(key.key for key in keys))
+
+        from sqlalchemy import select
+        from pagination import paginate_featured_first, parse_limit
+        from boost_sweeper import boost_active, boost_inactive
+        now = datetime.datetime.now(datetime.timezone.utc)
+        # Boosted profiles are few: find them through the boost_expiry index
+        # (left to itself SQLite walks the whole sort index looking for them)
+        boosted = model.id.in_(select(model.id).where(boost_active(model, now)))
+        return paginate_featured_first(
+            query.filter(boosted), query.filter(boost_inactive(model, now)),
+            key_column, model.id, descending, sort_by,
+            cursor=args.get('cursor'), limit=parse_limit(args.get('limit')), nullable=nullable)
+
+    def next_page_headers(response, endpoint, next_cursor):
+        """Advertise the next page of a cursor-paginated array response in headers"""
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+            next_args = {**(request.view_args or {}), **request.args.to_dict()}
+            next_args['cursor'] = next_cursor
+            response.headers['Link'] = f'<{url_for(endpoint, **next_args)}>; rel="next"'
+        return response
+
+    @app.route('/workers', methods=['GET'])
+    def get_workers():
+        """
+        Worker profiles, filtered and paginated (see worker_directory).
+
+        Optional: ?fields=, ?limit= and ?cursor= (next page in X-Next-Cursor).
+        """
+        if not db_available or session_local is None or worker_profile_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        session = session_local()
+        validators = read_validators(session, ('worker_profiles', 'worker_bookings', 'users'))
+        if validators is not None and validators.matches(request):
+            session.close()
+            return validators.not_modified()
+
+        # Sparse fieldsets: ?fields=card or ?fields=id,name,rating
+        from projections import WORKER_FIELDS
+        try:
+            fields = WORKER_FIELDS.parse(request.args.get('fields'))
+        except ValueError as e:
+            session.close()
+            return jsonify({'error': str(e)}), 400
+
+        from pagination import InvalidCursor
+        try:
+            workers, next_cursor = worker_directory(session, request.args, fields=fields)
+        except (ValueError, InvalidCursor) as e:
+            session.close()
+            return jsonify({'error': str(e)}), 400
         # Serialize before closing
-        result = [worker.to_dict() for worker in workers]
+        if fields:
+            result = WORKER_FIELDS.render(fields, workers)
+        else:
+            result = [worker.to_dict() for worker in workers]
         session.close()
 
-        return jsonify(result), 200
+        response = next_page_headers(jsonify(result), 'get_workers', next_cursor)
+        return with_validators(response, validators), 200
 
     @app.route('/workers/<int:worker_id>', methods=['GET'])
     def get_worker(worker_id):
@@ -2378,11 +3693,17 @@ def create_app():
         if 'portfolio_images' in data and isinstance(data['portfolio_images'], list):
             worker.portfolio_images = json.dumps(data['portfolio_images'])
 
+        if 'skills' in data or 'certifications' in data:
+            from worker_tags import sync_tags
+            sync_tags(session, worker_tag_model, worker)
+
         worker.updated_at = datetime.datetime.now(datetime.timezone.utc)
         session.commit()
         session.refresh(worker)
         # Eager load user for to_dict
         _ = worker.user
+        from search_suggest import worker_entry
+        index_suggestions('workers', worker.id, worker_entry(worker, worker.user.full_name))
         session.close()
 
         return jsonify(worker.to_dict()), 200
@@ -2410,6 +3731,39 @@ def create_app():
             session.close()
         return jsonify(worker.to_dict()), 200
 
+    @app.route('/api/workers/<int:worker_id>/bookings', methods=['GET'])
+    def get_worker_bookings(worker_id):
+        """
+        A worker's booked periods overlapping ?from=&to= (ISO dates; default
+        the next 30 days), earliest first.
+        """
+        if not db_available or session_local is None or worker_booking_model is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        from worker_calendar import parse_time, utc_naive
+        try:
+            start = (parse_time(request.args['from']) if request.args.get('from')
+                     else utc_naive(datetime.datetime.now(datetime.timezone.utc)))
+            end = (parse_time(request.args['to'], end=True) if request.args.get('to')
+                   else start + datetime.timedelta(days=30))
+        except ValueError:
+            return jsonify({'error': 'from and to must be ISO dates or datetimes'}), 400
+
+        session = session_local()
+        try:
+            if session.query(worker_profile_model.id).filter_by(id=worker_id).first() is None:
+                return jsonify({'error': 'worker profile not found'}), 404
+            bookings = (session.query(worker_booking_model)
+                        .filter(worker_booking_model.worker_id == worker_id,
+                                worker_booking_model.starts_at < end, worker_booking_model.ends_at > start)
+                        .order_by(worker_booking_model.starts_at, worker_booking_model.id).all())
+            return jsonify({'worker_id': worker_id, 'from': start.isoformat(), 'to': end.isoformat(),
+                            'bookings': [b.to_dict() for b in bookings]}), 200
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+        finally:
+            session.close()
+
     # ================== PRODUCE ASSISTANT ENDPOINTS ==================
 
     @app.route('/produce-assistant/calculate-cost', methods=['POST'])
@@ -3064,6 +4418,11 @@ def create_app():
         crop = request.args.get('crop')
         
         session = session_local()
+        validators = read_validators(session, ('forum_posts', 'forum_comments', 'users'))
+        if validators is not None and validators.matches(request):
+            session.close()
+            return validators.not_modified()
+
         query = session.query(forum_post_model)
         
         if category and category != 'all':
@@ -3088,7 +4447,7 @@ def create_app():
         result = [p.to_dict() for p in posts]
         session.close()
         
-        return jsonify(result), 200
+        return with_validators(jsonify(result), validators), 200
 
     @app.route('/forum/posts/<int:post_id>', methods=['GET'])
     def get_forum_post(post_id):
@@ -3103,11 +4462,10 @@ def create_app():
             session.close()
             return jsonify({'error': 'post not found'}), 404
             
-        # Increment view count
-        post.view_count += 1
-        session.commit()
-        
+        # Count the view without a write transaction; include unflushed views in the response
+        view_counter.record('forum_post', post_id)
         result = post.to_dict()
+        result['view_count'] = (result['view_count'] or 0) + view_counter.pending('forum_post', post_id)
         
         # Get comments (only top-level)
         comments = session.query(forum_comment_model).filter_by(post_id=post_id, parent_id=None).order_by(forum_comment_model.created_at).all()
@@ -3494,8 +4852,12 @@ def create_app():
         
         listing_title = listing.title
         
+        release_listing_media(session, listing)
         session.delete(listing)
         session.commit()
+        media_store.collect(session)
+        listing_cache.invalidate(listing_id)
+        index_suggestions('listings', listing_id, None)
         
         log_admin_action(
             admin_id=admin_id,
@@ -3975,9 +5337,11 @@ def create_app():
                 # Capture values before closing session
                 amount = transaction.amount
                 new_balance = wallet.balance if wallet else 0
+                credited_user_id = wallet.user_id if wallet else None
 
                 session.commit()
                 session.close()
+                invalidate_dashboard(credited_user_id)
                 # If this was a browser redirect (user returning from the payment page), send them to the wallet UI.
                 # Detect browser returns by checking Accept and User-Agent headers so POSTs from the provider
                 # that are intended to be browser redirects will also be redirected to the wallet UI.
@@ -4230,6 +5594,7 @@ def create_app():
                     session.add(system_fee_credit)
         
         session.commit()
+        invalidate_dashboard(user_id)
         
         # In a real app, we would trigger an async job here to process the payout via Interswitch
         # For this implementation, we leave it as 'pending' for admin review or manual processing
@@ -4338,6 +5703,7 @@ def create_app():
                 worker_profile.rating = int(rated_user.average_rating * 10)
 
         session.commit()
+        invalidate_dashboard(rated_user.id)
         result = {
             'message': 'rating submitted successfully',
             'new_average': rated_user.average_rating,
@@ -4360,6 +5726,11 @@ def create_app():
             session.close()
             return jsonify({'error': 'user not found'}), 404
             
+        validators = read_validators(session, ('ratings', 'users'))
+        if validators is not None and validators.matches(request):
+            session.close()
+            return validators.not_modified()
+
         ratings = session.query(rating_model).filter_by(rated_user_id=user_id).order_by(rating_model.created_at.desc()).all()
         
         result = {
@@ -4370,7 +5741,7 @@ def create_app():
         }
         
         session.close()
-        return jsonify(result), 200
+        return with_validators(jsonify(result), validators), 200
 
     # ========== Legal Endpoints ==========
 
@@ -4453,6 +5824,7 @@ def create_app():
         listing.boost_expiry = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=BOOST_DURATION_DAYS)
 
         session.commit()
+        invalidate_dashboard(user_id)
         
         expiry_iso = listing.boost_expiry.isoformat()
         new_balance = wallet.balance
@@ -4524,6 +5896,7 @@ def create_app():
         worker.boost_expiry = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=BOOST_DURATION_DAYS)
 
         session.commit()
+        invalidate_dashboard(user_id)
         
         expiry_iso = worker.boost_expiry.isoformat()
         new_balance = wallet.balance
@@ -4680,8 +6053,12 @@ def create_app():
                 location=data.get('location'),
                 salary_range=data.get('salary_range')
             )
+            from job_search import apply_derived_fields
+            apply_derived_fields(new_job)
             session.add(new_job)
             session.commit()
+            from search_suggest import job_entry
+            index_suggestions('jobs', new_job.id, job_entry(new_job))
             return jsonify({'message': 'Job posted successfully', 'id': new_job.id}), 201
         except Exception as e:
             session.rollback()
@@ -4691,13 +6068,63 @@ def create_app():
 
     @app.route('/api/jobs/list', methods=['GET'])
     def get_all_jobs():
-        """Get all jobs with optional filtering"""
+        """
+        Jobs, filtered and keyset-paginated.
+
+        Filters: status, location (the state, matched on location_key),
+        min_salary (salary_max at least this), max_salary (salary_min at most
+        this), boosted (true/false), q. Sorts: recent (default), salary_high
+        (salary_max) and salary_low (salary_min); jobs without a parsed salary
+        come last in both. Optional ?fields=, ?limit= and ?cursor= (next page
+        in X-Next-Cursor).
+        """
         if not db_available or session_local is None or job_model is None:
             return jsonify({'error': 'database not available'}), 503
             
         session = session_local()
         try:
-            query = session.query(job_model).options(joinedload(job_model.employer))
+            validators = read_validators(session, ('jobs', 'users'))
+            if validators is not None and validators.matches(request):
+                return validators.not_modified()
+
+            # Sparse fieldsets: ?fields=card or ?fields=id,title,salary_range
+            from projections import JOB_FIELDS
+            try:
+                fields = JOB_FIELDS.parse(request.args.get('fields'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            query = session.query(job_model)
+            if not fields:
+                query = query.options(joinedload(job_model.employer))
+
+            status = request.args.get('status')
+            if status:
+                query = query.filter(job_model.status == status)
+
+            from job_search import location_key
+            location = location_key(request.args.get('location'))
+            if location:
+                query = query.filter(job_model.location_key == location)
+
+            # Salary filters ignore values that don't parse; jobs without amounts never match them
+            for param, column, compare in (('min_salary', job_model.salary_max, 'ge'),
+                                           ('max_salary', job_model.salary_min, 'le')):
+                try:
+                    value = float(request.args.get(param) or '')
+                except ValueError:
+                    continue
+                query = query.filter(column >= value if compare == 'ge' else column <= value)
+
+            from sqlalchemy import select
+            from boost_sweeper import boost_active, boost_inactive
+            boosted = (request.args.get('boosted') or '').lower()
+            now = datetime.datetime.now(datetime.timezone.utc)
+            if boosted == 'true':
+                # Few jobs are boosted: find them through the boost_expiry index
+                query = query.filter(job_model.id.in_(select(job_model.id).where(boost_active(job_model, now))))
+            elif boosted == 'false':
+                query = query.filter(boost_inactive(job_model, now))
             
             # Search query
             search_q = request.args.get('q')
@@ -4710,18 +6137,36 @@ def create_app():
                 )
             
             # Sorting
-            sort_by = request.args.get('sort_by', 'recent')
+            sort_by = request.args.get('sort_by') or 'recent'
+            nullable = False
             if sort_by == 'salary_high':
-                # This is tricky if salary is a string range. 
-                # For now, just sort by ID or created_at as proxy or ignore
-                pass 
-            elif sort_by == 'recent':
-                query = query.order_by(job_model.created_at.desc())
-                
-            jobs = query.all()
+                key_column, descending, nullable = job_model.salary_max, True, True
+            elif sort_by == 'salary_low':
+                key_column, descending, nullable = job_model.salary_min, False, True
+            else:
+                sort_by, key_column, descending = 'recent', job_model.created_at, True
+
+            if fields:
+                query = JOB_FIELDS.select(query, job_model, fields, required=(key_column.key,))
+
+            from pagination import InvalidCursor, paginate, paginate_featured_first, parse_limit
+            try:
+                if sort_by == 'salary_low':
+                    # SQLite sorts NULLs first ascending: page the priced jobs, then the unpriced ones
+                    jobs, next_cursor = paginate_featured_first(
+                        query.filter(key_column.isnot(None)), query.filter(key_column.is_(None)),
+                        key_column, job_model.id, descending, sort_by, cursor=request.args.get('cursor'),
+                        limit=parse_limit(request.args.get('limit')), nullable=nullable)
+                else:
+                    jobs, next_cursor = paginate(query, key_column, job_model.id, descending, sort_by,
+                                                 cursor=request.args.get('cursor'),
+                                                 limit=parse_limit(request.args.get('limit')), nullable=nullable)
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+
             # Serialize before closing session
-            result = [job.to_dict() for job in jobs]
-            return jsonify(result)
+            result = JOB_FIELDS.render(fields, jobs) if fields else [job.to_dict() for job in jobs]
+            return with_validators(next_page_headers(jsonify(result), 'get_all_jobs', next_cursor), validators)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
@@ -4743,6 +6188,44 @@ def create_app():
         finally:
             session.close()
 
+    @app.route('/api/jobs/<int:job_id>/matches', methods=['GET'])
+    def get_job_matches(job_id):
+        """
+        Available workers ranked for a job, with each feature's contribution to the score.
+
+        Scored in memory against every worker (see worker_matching.py).
+        Optional: ?limit= (default 20, at most 100) and ?skills= (comma-separated,
+        instead of the skills named in the job text).
+        """
+        if not db_available or session_local is None or worker_matcher is None:
+            return jsonify({'error': 'database not available'}), 503
+
+        if worker_matcher.interval <= 0:
+            worker_matcher.refresh()
+        elif not worker_matcher.built:
+            return jsonify({'error': 'workers are still being indexed'}), 503
+
+        from pagination import parse_limit
+        from worker_tags import parse_tags
+        limit = parse_limit(request.args.get('limit'), default=20, maximum=100)
+        skills = parse_tags(request.args.get('skills')) if request.args.get('skills') else None
+
+        session = session_local()
+        try:
+            job = session.query(job_model).filter_by(id=job_id).first()
+            if not job:
+                return jsonify({'error': 'Job not found'}), 404
+            matches, matched_skills = worker_matcher.match(job, k=limit, skills=skills)
+
+            workers = {worker.id: worker for worker in session.query(worker_profile_model)
+                       .options(joinedload(worker_profile_model.user))
+                       .filter(worker_profile_model.id.in_([worker_id for worker_id, _, _ in matches]))}
+            result = [{'worker': workers[worker_id].to_dict(), 'score': score, 'breakdown': breakdown}
+                      for worker_id, score, breakdown in matches if worker_id in workers]
+            return jsonify({'job_id': job_id, 'skills': matched_skills, 'matches': result})
+        finally:
+            session.close()
+
     @app.route('/api/my-jobs', methods=['GET'])
     def get_my_jobs():
         if not db_available or session_local is None or job_model is None:
@@ -4870,6 +6353,13 @@ def create_app():
                 setattr(user, field, data[field])
 
         session.commit()
+        if 'full_name' in data:
+            # Listing cards embed owner_name
+            listing_cache.invalidate_owner(user_id)
+            worker = session.query(worker_profile_model).filter_by(user_id=user_id).first()
+            if worker is not None:
+                from search_suggest import worker_entry
+                index_suggestions('workers', worker.id, worker_entry(worker, user.full_name))
         session.refresh(user)
         session.close()
 
@@ -4877,92 +6367,93 @@ def create_app():
 
     @app.route('/api/workers/list', methods=['GET'])
     def get_all_workers():
-        """Get all workers with optional filtering"""
+        """
+        Worker directory for the workers page: same filters and pagination as
+        /workers, sorted by rating unless ?sort_by= says otherwise, with rate
+        sorts on the daily rate by default.
+        """
         if not db_available or session_local is None or worker_profile_model is None:
             return jsonify({'error': 'database not available'}), 503
             
+        from pagination import InvalidCursor
         session = session_local()
         try:
-            query = session.query(worker_profile_model).join(user_model).options(joinedload(worker_profile_model.user))
-            
-            # Search query
-            search_q = request.args.get('q')
-            if search_q:
-                search_term = f"%{search_q}%"
-                query = query.filter(
-                    (user_model.full_name.ilike(search_term)) | 
-                    (worker_profile_model.specialization.ilike(search_term)) |
-                    (worker_profile_model.location_state.ilike(search_term)) |
-                    (worker_profile_model.location_area.ilike(search_term))
-                )
-            
-            # Sorting
-            sort_by = request.args.get('sort_by', 'rating')
-            if sort_by == 'rating':
-                query = query.order_by(worker_profile_model.rating.desc())
-            elif sort_by == 'experience':
-                query = query.order_by(worker_profile_model.experience_years.desc())
-            elif sort_by == 'rate_low':
-                query = query.order_by(worker_profile_model.daily_rate.asc())
-            elif sort_by == 'rate_high':
-                query = query.order_by(worker_profile_model.daily_rate.desc())
-            elif sort_by == 'recommended':
-                # Boosted first, then rating
-                query = query.order_by(worker_profile_model.is_boosted.desc(), worker_profile_model.rating.desc())
-                
-            workers = query.all()
+            workers, next_cursor = worker_directory(session, request.args, default_rate='daily')
             # Serialize while session is still open
             result = [worker.to_dict() for worker in workers]
-            return jsonify(result)
+            return next_page_headers(jsonify(result), 'get_all_workers', next_cursor)
+        except (ValueError, InvalidCursor) as e:
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
             session.close()
 
+    def invalidate_dashboard(*user_ids):
+        """Drop cached worker dashboard stats after a committed write that changes them"""
+        if dashboard_stats is not None:
+            dashboard_stats.invalidate(*[int(user_id) for user_id in user_ids if user_id is not None])
+
     @app.route('/api/worker-dashboard-stats', methods=['GET'])
     def get_worker_dashboard_stats():
+        """
+        A worker's jobs completed, rating, wallet balance and five most recent
+        applications, read in one query and cached per user for
+        WORKER_DASHBOARD_CACHE_SECONDS (see stats_cache.py).
+        """
         if not db_available or session_local is None:
             return jsonify({'error': 'database not available'}), 503
         
         user_id = request.args.get('user_id')
         if not user_id:
             return jsonify({'error': 'user_id required'}), 400
-            
+        try:
+            user_id = int(user_id)
+        except ValueError:
+            return jsonify({'error': 'user_id must be an integer'}), 400
+
+        cached = dashboard_stats.get(user_id) if dashboard_stats is not None else None
+        if cached is not None:
+            return jsonify(cached)
+
+        from sqlalchemy import select, true
         session = session_local()
         try:
-            # 1. Worker Profile Stats
-            worker_profile = session.query(worker_profile_model).filter_by(user_id=user_id).first()
-            jobs_completed = worker_profile.total_jobs if worker_profile else 0
-            rating = worker_profile.rating if worker_profile else 0.0
-            
-            # 2. Wallet Balance
-            wallet = session.query(wallet_model).filter_by(user_id=user_id).first()
-            total_earnings = wallet.balance if wallet else 0.0
-            
-            # 3. Recent Job Applications
-            recent_applications = session.query(job_application_model)\
-                .filter_by(applicant_id=user_id)\
-                .order_by(job_application_model.created_at.desc())\
-                .limit(5)\
-                .all()
-            
-            applications_data = []
-            for app in recent_applications:
-                job = session.query(job_model).get(app.job_id)
-                applications_data.append({
-                    'id': app.id,
-                    'job_title': job.title if job else 'Unknown Job',
-                    'status': app.status,
-                    'date': app.created_at.isoformat() if app.created_at else None,
-                    'location': job.location if job else ''
-                })
+            # Profile, wallet and the recent applications with their jobs, one row per application
+            recent = (select(job_application_model.id, job_application_model.job_id,
+                             job_application_model.status, job_application_model.created_at)
+                      .where(job_application_model.applicant_id == user_id)
+                      .order_by(job_application_model.created_at.desc(), job_application_model.id.desc())
+                      .limit(5)
+                      .subquery())
+            rows = session.execute(
+                select(worker_profile_model.total_jobs, worker_profile_model.rating, wallet_model.balance,
+                       recent.c.id, recent.c.status, recent.c.created_at, job_model.title, job_model.location)
+                .select_from(user_model)
+                .outerjoin(worker_profile_model, worker_profile_model.user_id == user_model.id)
+                .outerjoin(wallet_model, wallet_model.user_id == user_model.id)
+                .outerjoin(recent, true())
+                .outerjoin(job_model, job_model.id == recent.c.job_id)
+                .where(user_model.id == user_id)
+                .order_by(recent.c.created_at.desc(), recent.c.id.desc())
+            ).all()
 
-            return jsonify({
-                'jobsCompleted': jobs_completed,
-                'totalEarnings': total_earnings,
-                'rating': rating,
-                'recentApplications': applications_data
-            })
+            first = rows[0] if rows else None
+            stats = {
+                'jobsCompleted': first.total_jobs if first and first.total_jobs is not None else 0,
+                'totalEarnings': first.balance if first and first.balance is not None else 0.0,
+                'rating': first.rating if first and first.rating is not None else 0.0,
+                'recentApplications': [{
+                    'id': row.id,
+                    'job_title': row.title if row.title is not None else 'Unknown Job',
+                    'status': row.status,
+                    'date': row.created_at.isoformat() if row.created_at else None,
+                    'location': row.location if row.location is not None else ''
+                } for row in rows if row.id is not None]
+            }
+            if dashboard_stats is not None:
+                dashboard_stats.put(user_id, stats)
+            return jsonify(stats)
         except Exception as e:
             return jsonify({'error': str(e)}), 500
         finally:
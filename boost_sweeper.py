@@ -0,0 +1,91 @@
+"""
+Boost expiry sweeper
+Paid boosts (listing `featured`, worker/job `is_boosted`) carry a
+`boost_expiry` but nothing used to clear the flag afterwards. The sweeper
+runs on a background thread and expires them in bulk with one indexed
+UPDATE per table. Ranking does not wait for it: read paths treat a boost as
+active only while `boost_expiry > now`, the sweeper just keeps the stored
+flags honest for serializers and flag-based indexes.
+"""
+import datetime
+import logging
+import threading
+
+from sqlalchemy import or_
+
+
+logger = logging.getLogger(__name__)
+
+
+def boost_active(model, now=None):
+    """SQL condition for rows whose boost has not expired yet (uses the boost_expiry index)"""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return model.boost_expiry > now
+
+
+def boost_inactive(model, now=None):
+    """Negation of boost_active that also matches rows that were never boosted"""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return or_(model.boost_expiry == None, model.boost_expiry <= now)
+
+
+class BoostSweeper:
+    """
+    Periodically clears expired boost flags.
+
+        sweeper = BoostSweeper(engine, interval=60)
+        sweeper.register(Listing.__table__, 'featured')
+        sweeper.start()
+    """
+
+    def __init__(self, engine, interval=60.0):
+        self.engine = engine
+        self.interval = interval
+        self._targets = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, table, flag_column):
+        """Expire table.flag_column once table.boost_expiry has passed"""
+        self._targets.append((table, flag_column))
+
+    def sweep(self, now=None):
+        """
+        Clear every boost whose expiry is at or before now.
+
+        Onupdate timestamps (updated_at) are bumped, so cached payloads that
+        embed the flag are invalidated.
+
+        Returns:
+            dict: Rows expired per table name
+        """
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        expired = {}
+        with self.engine.begin() as conn:
+            for table, flag_column in self._targets:
+                flag = table.c[flag_column]
+                stmt = (table.update()
+                        .where(table.c.boost_expiry <= now)
+                        .where(flag == True)
+                        .values({flag_column: False}))
+                expired[table.name] = conn.execute(stmt).rowcount
+        return expired
+
+    def start(self):
+        """Start the background thread (first sweep runs immediately)"""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name='boost-sweeper', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception('Boost sweep failed')
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,316 @@
+"""
+Bulk listing import
+Realtors upload a CSV or NDJSON file with one listing per row. The upload is
+spooled to disk in fixed-size chunks, then parsed row by row (never loaded
+whole) and inserted in batched transactions with executemany. Progress and
+a per-row error report are kept on an `import_jobs` row that clients poll.
+
+CSV columns / NDJSON keys match the /listings/create fields: title,
+listing_type (or category), price, price_type, description, location_state,
+location_area, location_address, size_value, size_unit, latitude, longitude,
+images, videos. In CSV, images/videos are '|'-separated.
+"""
+import csv
+import datetime
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+
+from sqlalchemy import update
+
+
+logger = logging.getLogger(__name__)
+
+
+LISTING_TYPES = {'land_sale', 'land_rent', 'produce', 'equipment', 'services'}
+TEXT_FIELDS = ('description', 'location_state', 'location_area', 'location_address', 'size_unit')
+FORMATS = ('csv', 'ndjson')
+
+SPOOL_CHUNK_BYTES = 64 * 1024
+
+# Only the first errors are kept in the report; counts are always exact
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename=None, content_type=None, requested=None):
+    """
+    Pick the upload format from an explicit ?format=, the file name or the content type.
+
+    Raises:
+        ValueError: If the format can't be determined or isn't supported
+    """
+    if requested:
+        fmt = requested.lower()
+    elif filename and filename.lower().endswith('.csv'):
+        fmt = 'csv'
+    elif filename and filename.lower().endswith(('.ndjson', '.jsonl')):
+        fmt = 'ndjson'
+    elif content_type and 'csv' in content_type:
+        fmt = 'csv'
+    elif content_type and ('ndjson' in content_type or 'jsonl' in content_type):
+        fmt = 'ndjson'
+    else:
+        raise ValueError('could not determine upload format; use a .csv/.ndjson file or ?format=')
+    if fmt not in FORMATS:
+        raise ValueError(f'unsupported format: {fmt}')
+    return fmt
+
+
+def spool_upload(stream, directory=None):
+    """Copy an upload stream to a temporary file chunk by chunk; returns the file path"""
+    fd, path = tempfile.mkstemp(prefix='listing-import-', dir=directory)
+    with os.fdopen(fd, 'wb') as out:
+        shutil.copyfileobj(stream, out, SPOOL_CHUNK_BYTES)
+    return path
+
+
+def iter_rows(text, fmt):
+    """
+    Yield (row_number, record) for each data row of a text stream.
+
+    record is a dict, or a ValueError for rows that could not be parsed.
+    Row numbers are 1-based and count data rows only.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for number, record in enumerate(reader, start=1):
+            if None in record:
+                yield number, ValueError('row has more values than the header')
+            else:
+                yield number, record
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f'invalid JSON: {e}')
+            continue
+        if not isinstance(record, dict):
+            yield number, ValueError('each line must be a JSON object')
+            continue
+        yield number, record
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _media(value, name):
+    if _blank(value):
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split('|') if item.strip()]
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return value
+    raise ValueError(f'{name} must be a list of URLs')
+
+
+def validate_row(record):
+    """
+    Turn one parsed record into Listing column values.
+
+    Raises:
+        ValueError: With a message suitable for the error report
+    """
+    title = record.get('title')
+    if _blank(title):
+        raise ValueError('title is required')
+    title = str(title).strip()
+    if len(title) > 200:
+        raise ValueError('title must be at most 200 characters')
+
+    listing_type = record.get('listing_type') or record.get('category')
+    if listing_type not in LISTING_TYPES:
+        raise ValueError(f'listing_type must be one of: {", ".join(sorted(LISTING_TYPES))}')
+
+    try:
+        price = float(record.get('price'))
+    except (TypeError, ValueError):
+        raise ValueError('price must be a number')
+    if not math.isfinite(price) or price < 0:
+        raise ValueError('price must be a non-negative number')
+
+    values = {
+        'title': title,
+        'listing_type': listing_type,
+        'price': price,
+        'price_type': str(record.get('price_type') or 'fixed'),
+    }
+    for name in TEXT_FIELDS:
+        value = record.get(name)
+        values[name] = None if _blank(value) else str(value).strip()
+    values['description'] = values['description'] or ''
+
+    size_value = record.get('size_value')
+    if _blank(size_value):
+        values['size_value'] = None
+    else:
+        try:
+            values['size_value'] = int(float(size_value))
+        except (TypeError, ValueError):
+            raise ValueError('size_value must be a number')
+
+    latitude, longitude = record.get('latitude'), record.get('longitude')
+    if _blank(latitude) and _blank(longitude):
+        values['latitude'] = values['longitude'] = None
+    else:
+        from geo import validate_coordinates
+        try:
+            latitude, longitude = float(latitude), float(longitude)
+        except (TypeError, ValueError):
+            raise ValueError('latitude and longitude must both be numbers')
+        validate_coordinates(latitude, longitude)
+        values['latitude'], values['longitude'] = latitude, longitude
+
+    values['images'] = json.dumps(_media(record.get('images'), 'images'))
+    values['videos'] = json.dumps(_media(record.get('videos'), 'videos'))
+    return values
+
+
+class ImportRunner:
+    """
+    Parses a spooled upload and inserts its listings in batches.
+
+        runner = ImportRunner(session_factory, Listing, ImportJob, batch_size=500)
+        runner.run(job_id, path, 'csv', owner_id)
+
+    Each batch is one transaction that also advances the job's progress
+    counters. A batch that fails to insert is retried row by row so only
+    the offending rows are reported. With a media_store, rows that point at
+    already stored media take a reference to it in the same transaction.
+    on_saved(session, listings) is called after each committed batch (with
+    the listings' ids set) for follow-up work such as saved-search matching;
+    its failures are logged and never fail the import.
+    """
+
+    def __init__(self, session_factory, listing_model, job_model, batch_size=500, media_store=None,
+                 on_saved=None):
+        self.session_factory = session_factory
+        self.listing_model = listing_model
+        self.job_model = job_model
+        self.batch_size = batch_size
+        self.media_store = media_store
+        self.on_saved = on_saved
+
+    def run(self, job_id, path, fmt, owner_id):
+        """Process the whole file; always removes it and leaves the job completed or failed"""
+        errors = []
+        counts = {'total_rows': 0, 'inserted_rows': 0, 'failed_rows': 0}
+        try:
+            self._set_status(job_id, 'running')
+            with open(path, 'r', encoding='utf-8-sig', newline='') as text:
+                batch = []
+                for number, record in iter_rows(text, fmt):
+                    counts['total_rows'] += 1
+                    try:
+                        if isinstance(record, Exception):
+                            raise record
+                        batch.append((number, self._build(validate_row(record), owner_id)))
+                    except ValueError as e:
+                        self._fail(errors, counts, number, e)
+                    if len(batch) >= self.batch_size:
+                        self._flush(job_id, batch, errors, counts)
+                        batch = []
+                self._flush(job_id, batch, errors, counts)
+            self._finish(job_id, 'completed', counts, errors)
+        except Exception as e:
+            logger.exception('Listing import %s failed', job_id)
+            self._fail(errors, counts, None, e)
+            self._finish(job_id, 'failed', counts, errors)
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _build(self, values, owner_id):
+        latitude, longitude = values.pop('latitude'), values.pop('longitude')
+        listing = self.listing_model(owner_id=owner_id, status='active', **values)
+        listing.set_coordinates(latitude, longitude)
+        return listing
+
+    @staticmethod
+    def _fail(errors, counts, number, error):
+        counts['failed_rows'] += 1 if number is not None else 0
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'row': number, 'error': str(error)})
+
+    def _save(self, session, listings):
+        # Ids are only fetched back (row by row) when on_saved needs them
+        session.bulk_save_objects(listings, return_defaults=self.on_saved is not None)
+        if self.media_store is not None:
+            for listing in listings:
+                self.media_store.retain(session, json.loads(listing.images) + json.loads(listing.videos))
+
+    def _progress(self, job_id, counts, **extra):
+        table = self.job_model.__table__
+        return update(table).where(table.c.id == job_id).values(**counts, **extra)
+
+    def _flush(self, job_id, batch, errors, counts):
+        session = self.session_factory()
+        try:
+            if batch:
+                self._save(session, [listing for _, listing in batch])
+            counts['inserted_rows'] += len(batch)
+            session.execute(self._progress(job_id, counts))
+            session.commit()
+        except Exception:
+            session.rollback()
+            counts['inserted_rows'] -= len(batch)
+        else:
+            self._saved(session, [listing for _, listing in batch])
+            return
+        finally:
+            session.close()
+
+        # Isolate the rows the database rejected
+        for number, listing in batch:
+            session = self.session_factory()
+            try:
+                self._save(session, [listing])
+                counts['inserted_rows'] += 1
+                session.execute(self._progress(job_id, counts))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                self._fail(errors, counts, number, getattr(e, 'orig', e))
+            else:
+                self._saved(session, [listing])
+            finally:
+                session.close()
+
+    def _saved(self, session, listings):
+        if self.on_saved is None or not listings:
+            return
+        try:
+            self.on_saved(session, listings)
+        except Exception:
+            session.rollback()
+            logger.exception('Post-import hook failed for %d listings', len(listings))
+
+    def _set_status(self, job_id, status):
+        session = self.session_factory()
+        try:
+            session.execute(self._progress(job_id, {}, status=status))
+            session.commit()
+        finally:
+            session.close()
+
+    def _finish(self, job_id, status, counts, errors):
+        session = self.session_factory()
+        try:
+            session.execute(self._progress(
+                job_id, counts, status=status, errors=json.dumps(errors),
+                finished_at=datetime.datetime.now(datetime.timezone.utc)))
+            session.commit()
+        finally:
+            session.close()
+
@@ -0,0 +1,183 @@
+"""
+Resumable chunked uploads
+Large files (listing videos, verification scans) are sent as a sequence of
+fixed-size chunks instead of one multipart request:
+
+    POST /uploads                        -> upload id and chunk size
+    PUT  /uploads/<id>/chunks/<n>        raw bytes of chunk n (0-based)
+    GET  /uploads/<id>                   -> next_chunk, to resume after a disconnect
+    POST /uploads/<id>/complete          attach the file to a listing or document
+
+Each chunk is streamed from the request straight to its offset in a partial
+file, so memory use is bounded by one read buffer whatever the file size.
+Progress lives in `upload_sessions`; only the contiguous prefix counts, and
+a chunk is accounted for only after all of its bytes were written, so an
+interrupted chunk is simply sent again. Re-sending a chunk that was already
+received is a no-op, which makes retries after a lost response safe.
+"""
+import datetime
+import os
+
+from werkzeug.utils import secure_filename
+
+
+READ_CHUNK_BYTES = 64 * 1024
+
+# purpose -> size class, i.e. the key of its cap in max_sizes
+PURPOSES = {
+    'listing_video': 'video',
+    'listing_image': 'image',
+    'verification_document': 'document',
+}
+
+
+class UploadError(ValueError):
+    """Raised for requests that don't fit the upload's state; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400, expected_chunk=None):
+        super().__init__(message)
+        self.status = status
+        self.expected_chunk = expected_chunk
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class ChunkedUploads:
+    """
+    Creates upload sessions and writes their chunks to disk.
+
+        uploads = ChunkedUploads(directory, UploadSession, chunk_size=4 << 20,
+                                 max_sizes={'video': 1 << 30, ...}, ttl_seconds=86400)
+
+    Row changes are made in the caller's session; write_chunk commits, since
+    the chunk is already on disk at that point.
+    """
+
+    def __init__(self, directory, upload_model, chunk_size, max_sizes, ttl_seconds):
+        self.directory = directory
+        self.upload_model = upload_model
+        self.chunk_size = chunk_size
+        self.max_sizes = max_sizes
+        self.ttl = datetime.timedelta(seconds=ttl_seconds)
+
+    def partial_path(self, upload_id):
+        return os.path.join(self.directory, f'{upload_id}.part')
+
+    def create(self, session, upload_id, owner_id, purpose, filename, size, content_type=None):
+        """
+        Start an upload of `size` bytes.
+
+        Raises:
+            UploadError: For an unknown purpose or a size outside the purpose's cap
+        """
+        if purpose not in PURPOSES:
+            raise UploadError(f'purpose must be one of: {", ".join(sorted(PURPOSES))}')
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            raise UploadError('size must be an integer number of bytes')
+        limit = self.max_sizes[PURPOSES[purpose]]
+        if size <= 0 or size > limit:
+            raise UploadError(f'size must be between 1 and {limit} bytes for {purpose}', status=413 if size > 0 else 400)
+        filename = secure_filename(filename or '') or 'upload'
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.partial_path(upload_id), 'wb'):
+            pass
+        upload = self.upload_model(
+            id=upload_id, owner_id=owner_id, purpose=purpose, filename=filename[:255],
+            content_type=(content_type or None), total_size=size, chunk_size=self.chunk_size,
+            received_bytes=0, status='uploading', expires_at=_now() + self.ttl)
+        session.add(upload)
+        return upload
+
+    def write_chunk(self, session, upload, index, stream, length):
+        """
+        Write chunk `index` from a request stream of `length` bytes.
+
+        Returns:
+            bool: True if the chunk was written, False if it had already been received
+
+        Raises:
+            UploadError: 409 with expected_chunk for chunks sent out of order,
+                400 for a wrong length or a body that ended early
+        """
+        if upload.status != 'uploading':
+            raise UploadError(f'upload is {upload.status}', status=409)
+        expected = upload.received_bytes // upload.chunk_size
+        if index < expected or upload.received_bytes >= upload.total_size:
+            return False
+        if index > expected:
+            raise UploadError(f'expected chunk {expected}', status=409, expected_chunk=expected)
+
+        offset = index * upload.chunk_size
+        chunk_length = min(upload.chunk_size, upload.total_size - offset)
+        if length is None or length != chunk_length:
+            raise UploadError(f'chunk {index} must be exactly {chunk_length} bytes')
+
+        written = 0
+        with open(self.partial_path(upload.id), 'r+b') as out:
+            out.seek(offset)
+            while written < chunk_length:
+                data = stream.read(min(READ_CHUNK_BYTES, chunk_length - written))
+                if not data:
+                    break
+                out.write(data)
+                written += len(data)
+        if written != chunk_length:
+            raise UploadError(f'chunk {index} ended after {written} of {chunk_length} bytes')
+
+        # Only advance from the offset this chunk was written at; a concurrent
+        # retry of the same chunk wrote identical bytes and loses the race harmlessly
+        table = self.upload_model.__table__
+        session.execute(table.update()
+                        .where(table.c.id == upload.id, table.c.received_bytes == offset)
+                        .values(received_bytes=offset + chunk_length, updated_at=_now(),
+                                expires_at=_now() + self.ttl))
+        session.commit()
+        session.refresh(upload)
+        return True
+
+    def assembled_path(self, upload):
+        """
+        Path of the complete file, ready to be moved elsewhere.
+
+        Raises:
+            UploadError: If chunks are still missing
+        """
+        if upload.status != 'uploading':
+            raise UploadError(f'upload is {upload.status}', status=409)
+        if upload.received_bytes != upload.total_size:
+            raise UploadError(f'upload is incomplete: {upload.received_bytes} of {upload.total_size} bytes received',
+                              status=409, expected_chunk=upload.received_bytes // upload.chunk_size)
+        path = self.partial_path(upload.id)
+        if os.path.getsize(path) != upload.total_size:
+            raise UploadError('partial file does not match the received size', status=409)
+        return path
+
+    def discard(self, upload):
+        """Remove an upload's partial file (the row is left to the caller)"""
+        try:
+            os.unlink(self.partial_path(upload.id))
+        except FileNotFoundError:
+            pass
+
+    def expire(self, session):
+        """
+        Abort uploads whose deadline passed and delete their partial files.
+
+        Returns:
+            int: Number of uploads expired
+        """
+        model = self.upload_model
+        stale = (session.query(model)
+                 .filter(model.status == 'uploading', model.expires_at < _now().replace(tzinfo=None))
+                 .all())
+        for upload in stale:
+            upload.status = 'expired'
+            self.discard(upload)
+        if stale:
+            session.commit()
+        return len(stale)
@@ -0,0 +1,156 @@
+"""
+HTTP conditional requests for read endpoints
+Every table that feeds a public list endpoint has a row in `table_versions`
+whose version is bumped by triggers on insert, delete and relevant updates.
+An endpoint's ETag is a hash of its URL and the versions of the tables it
+reads, so a revalidation costs one lookup in a tiny table and a 304 skips
+the list query and serialization entirely. Last-Modified comes from the
+same rows (`modified_at` watermark) or, for single rows, their updated_at.
+
+Validators are weak: write-behind view counts change the body without
+bumping a version, and the client's copy is considered equivalent.
+"""
+import datetime
+import hashlib
+import secrets
+
+from flask import Response
+
+
+VERSION_TABLE = 'table_versions'
+
+# Table -> update rule. 'columns' limits the update trigger to the columns
+# embedded in public payloads; 'counter' names a write-behind counter column
+# whose flushes (counter changes, updated_at untouched) are not edits.
+VERSIONED_TABLES = {
+    'listings': {'counter': 'views'},
+    'users': {'columns': ('full_name', 'verified', 'is_banned', 'average_rating', 'rating_count')},
+    'worker_profiles': {},
+    'worker_bookings': {},
+    'jobs': {},
+    'forum_posts': {'counter': 'view_count'},
+    'forum_comments': {},
+    'ratings': {},
+}
+
+
+def _bump_sql(table):
+    return (f"UPDATE {VERSION_TABLE} SET version = version + 1, "
+            f"modified_at = strftime('%Y-%m-%d %H:%M:%S', 'now') WHERE name = '{table}';")
+
+
+def _triggers(table, rule):
+    bump = _bump_sql(table)
+    update_of = f" OF {', '.join(rule['columns'])}" if rule.get('columns') else ''
+    when = ''
+    if rule.get('counter'):
+        counter = rule['counter']
+        when = f" WHEN NOT (old.{counter} IS NOT new.{counter} AND old.updated_at IS new.updated_at)"
+    return {
+        f'{table}_version_ai': f"CREATE TRIGGER {table}_version_ai AFTER INSERT ON {table} BEGIN {bump} END",
+        f'{table}_version_ad': f"CREATE TRIGGER {table}_version_ad AFTER DELETE ON {table} BEGIN {bump} END",
+        f'{table}_version_au': (f"CREATE TRIGGER {table}_version_au AFTER UPDATE{update_of} ON {table}"
+                                f"{when} BEGIN {bump} END"),
+    }
+
+
+def ensure_table_versions(engine):
+    """
+    Install the version triggers and seed one row per versioned table.
+
+    Each row gets a random epoch when it is first created, so a rebuilt
+    database never re-issues ETags from an older one.
+
+    Returns:
+        bool: True if validators can be served, False otherwise
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+    try:
+        with engine.begin() as conn:
+            for table, rule in VERSIONED_TABLES.items():
+                conn.exec_driver_sql(
+                    f"INSERT OR IGNORE INTO {VERSION_TABLE} (name, epoch, version, modified_at) "
+                    f"VALUES (?, ?, 0, strftime('%Y-%m-%d %H:%M:%S', 'now'))",
+                    (table, secrets.token_hex(8))
+                )
+                for name, ddl in _triggers(table, rule).items():
+                    conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
+                    conn.exec_driver_sql(ddl)
+        return True
+    except Exception:
+        return False
+
+
+def _utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.replace(microsecond=0)
+
+
+class Validators:
+    """ETag/Last-Modified pair for one response"""
+
+    def __init__(self, etag, last_modified=None):
+        self.etag = etag
+        self.last_modified = _utc(last_modified)
+
+    def matches(self, request):
+        """
+        Whether the client's cached copy is still current.
+
+        If-None-Match wins over If-Modified-Since. A Last-Modified in the
+        current second is never trusted, since another write could still
+        land in the same second.
+        """
+        if request.if_none_match:
+            return request.if_none_match.contains_weak(self.etag)
+        since = request.if_modified_since
+        if since is None or self.last_modified is None:
+            return False
+        now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+        return self.last_modified <= since and self.last_modified < now
+
+    def apply(self, response):
+        response.set_etag(self.etag, weak=True)
+        if self.last_modified is not None:
+            response.last_modified = self.last_modified
+        # Let clients keep the body but revalidate before reusing it
+        response.cache_control.no_cache = True
+        return response
+
+    def not_modified(self):
+        return self.apply(Response(status=304))
+
+
+def table_validators(session, version_model, tables, request, row=None):
+    """
+    Validators for a response built from the given tables.
+
+    Args:
+        tables: Names from VERSIONED_TABLES the response depends on
+        row: Optional (id, updated_at) of the single row a detail endpoint
+            returns; its updated_at replaces its own table's version
+
+    Returns:
+        Validators
+    """
+    versions = (session.query(version_model.name, version_model.epoch, version_model.version,
+                              version_model.modified_at)
+                .filter(version_model.name.in_(tables))
+                .order_by(version_model.name)
+                .all())
+    digest = hashlib.sha1(request.full_path.encode('utf-8'))
+    modified = []
+    for name, epoch, version, modified_at in versions:
+        digest.update(f'|{name}:{epoch}:{version}'.encode('utf-8'))
+        modified.append(_utc(modified_at))
+    if row is not None:
+        row_id, updated_at = row
+        digest.update(f'|row:{row_id}:{updated_at.isoformat() if updated_at else ""}'.encode('utf-8'))
+        if updated_at is not None:
+            modified.append(_utc(updated_at))
+    modified = [m for m in modified if m is not None]
+    return Validators(digest.hexdigest()[:32], max(modified) if modified else None)
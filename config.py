@@ -14,3 +14,56 @@ WITHDRAWAL_FEE = 100.0  # NGN
 DEPOSIT_FEE_PERCENTAGE = 0.015  # 1.5%
 PLATFORM_COMMISSION_PERCENTAGE = 0.05  # 5%
 
+
+# View counters are buffered in memory and flushed in batches every N seconds
+VIEW_COUNT_FLUSH_SECONDS = float(os.environ.get('VIEW_COUNT_FLUSH_SECONDS', '5'))
+
+# Memory cap for the pre-serialized listing card cache
+LISTING_CACHE_MAX_BYTES = int(os.environ.get('LISTING_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+
+# Per-user worker dashboard stats: seconds a payload may be served without rereading, and how many are kept
+WORKER_DASHBOARD_CACHE_SECONDS = float(os.environ.get('WORKER_DASHBOARD_CACHE_SECONDS', '30'))
+WORKER_DASHBOARD_CACHE_MAX_ENTRIES = int(os.environ.get('WORKER_DASHBOARD_CACHE_MAX_ENTRIES', '10000'))
+
+# How often expired listing/worker/job boosts are cleared in bulk
+BOOST_SWEEP_SECONDS = float(os.environ.get('BOOST_SWEEP_SECONDS', '60'))
+
+# How often the similar-listings index picks up listing changes
+SIMILAR_LISTINGS_REFRESH_SECONDS = float(os.environ.get('SIMILAR_LISTINGS_REFRESH_SECONDS', '30'))
+
+# How often the job -> worker matcher picks up worker profile changes
+WORKER_MATCH_REFRESH_SECONDS = float(os.environ.get('WORKER_MATCH_REFRESH_SECONDS', '30'))
+
+# Search-box suggestions: how often the tries are rebuilt in full, and their memory budget (all scopes)
+SEARCH_SUGGEST_REBUILD_SECONDS = float(os.environ.get('SEARCH_SUGGEST_REBUILD_SECONDS', '3600'))
+SEARCH_SUGGEST_MAX_BYTES = int(os.environ.get('SEARCH_SUGGEST_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# How long an accepted application or signed contract books its worker when no end date is given
+WORKER_BOOKING_DEFAULT_DAYS = int(os.environ.get('WORKER_BOOKING_DEFAULT_DAYS', '7'))
+
+# Most applications one /api/jobs/<id>/applications/bulk request may accept or decline
+JOB_APPLICATION_BULK_MAX = int(os.environ.get('JOB_APPLICATION_BULK_MAX', '500'))
+
+# Rows per transaction for /listings/bulk-import
+BULK_IMPORT_BATCH_SIZE = int(os.environ.get('BULK_IMPORT_BATCH_SIZE', '500'))
+
+# Content-addressed store for uploaded listing images and videos
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'static', 'uploads', 'media'))
+
+# Resumable chunked uploads: partial files, chunk size, idle expiry and per-kind size caps
+CHUNKED_UPLOAD_DIR = os.environ.get('CHUNKED_UPLOAD_DIR', os.path.join(BASE_DIR, 'uploads', 'partial'))
+CHUNKED_UPLOAD_CHUNK_BYTES = int(os.environ.get('CHUNKED_UPLOAD_CHUNK_BYTES', str(4 * 1024 * 1024)))
+CHUNKED_UPLOAD_TTL_SECONDS = int(os.environ.get('CHUNKED_UPLOAD_TTL_SECONDS', str(24 * 3600)))
+MAX_UPLOAD_BYTES = {
+    'video': int(os.environ.get('MAX_VIDEO_UPLOAD_BYTES', str(1024 * 1024 * 1024))),
+    'image': int(os.environ.get('MAX_IMAGE_UPLOAD_BYTES', str(25 * 1024 * 1024))),
+    'document': int(os.environ.get('MAX_DOCUMENT_UPLOAD_BYTES', str(20 * 1024 * 1024))),
+}
+
+# Uploaded media delivery: cache lifetime of non content-addressed files, and how many
+# transfers of at least MEDIA_LARGE_TRANSFER_BYTES may stream at once
+MEDIA_CACHE_SECONDS = int(os.environ.get('MEDIA_CACHE_SECONDS', '3600'))
+MEDIA_LARGE_TRANSFER_BYTES = int(os.environ.get('MEDIA_LARGE_TRANSFER_BYTES', str(8 * 1024 * 1024)))
+MEDIA_MAX_LARGE_TRANSFERS = int(os.environ.get('MEDIA_MAX_LARGE_TRANSFERS', '8'))
+# Let nginx/Apache send files (X-Sendfile / X-Accel-Redirect) instead of a Python worker
+MEDIA_USE_X_SENDFILE = os.environ.get('MEDIA_USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,158 @@
+"""
+Marketplace facet counts
+Keeps `listing_facet_counts` (one row per status/type/state/price_type/price
+bucket combination) up to date with triggers on `listings`, so the sidebar
+counts are a SUM over a table with a few hundred rows instead of a GROUP BY
+over every listing.
+"""
+from sqlalchemy import case, func
+
+
+# Lower edges of the price buckets in Naira; the last bucket is open-ended
+PRICE_BUCKET_EDGES = (0, 100000, 500000, 1000000, 5000000, 10000000, 50000000)
+
+# Facet dimensions shared by the aggregate table and the listings table
+FACET_DIMENSIONS = ('listing_type', 'location_state', 'price_type')
+
+# Query parameters that the aggregate table cannot answer
+LIVE_ONLY_FILTERS = ('q', 'min_price', 'max_price')
+
+FACET_TABLE = 'listing_facet_counts'
+
+
+def _bucket_sql(price):
+    """SQL CASE expression mapping a price to its bucket index"""
+    whens = ' '.join(
+        f'WHEN {price} >= {edge} THEN {index}'
+        for index, edge in reversed(list(enumerate(PRICE_BUCKET_EDGES)))
+        if index > 0
+    )
+    return f'(CASE {whens} ELSE 0 END)'
+
+
+def price_bucket_expression(column):
+    """SQLAlchemy expression mapping a price column to its bucket index"""
+    whens = [(column >= edge, index) for index, edge in reversed(list(enumerate(PRICE_BUCKET_EDGES))) if index > 0]
+    return case(*whens, else_=0)
+
+
+def _key_sql(row):
+    return (f"COALESCE({row}.status, ''), COALESCE({row}.listing_type, ''), "
+            f"COALESCE({row}.location_state, ''), COALESCE({row}.price_type, ''), {_bucket_sql(row + '.price')}")
+
+
+def _increment_sql(row):
+    return (f"INSERT INTO {FACET_TABLE} (status, listing_type, location_state, price_type, price_bucket, count) "
+            f"VALUES ({_key_sql(row)}, 1) "
+            f"ON CONFLICT (status, listing_type, location_state, price_type, price_bucket) "
+            f"DO UPDATE SET count = count + 1;")
+
+
+def _decrement_sql(row):
+    where = (f"status = COALESCE({row}.status, '') AND listing_type = COALESCE({row}.listing_type, '') "
+             f"AND location_state = COALESCE({row}.location_state, '') "
+             f"AND price_type = COALESCE({row}.price_type, '') AND price_bucket = {_bucket_sql(row + '.price')}")
+    return (f"UPDATE {FACET_TABLE} SET count = count - 1 WHERE {where}; "
+            f"DELETE FROM {FACET_TABLE} WHERE count <= 0;")
+
+
+_TRIGGERS = {
+    'listing_facets_ai': f"""CREATE TRIGGER listing_facets_ai AFTER INSERT ON listings BEGIN
+        {_increment_sql('new')}
+    END""",
+    'listing_facets_ad': f"""CREATE TRIGGER listing_facets_ad AFTER DELETE ON listings BEGIN
+        {_decrement_sql('old')}
+    END""",
+    # Status changes (hide, sold, rented) and edits to any faceted column move a listing between rows
+    'listing_facets_au': f"""CREATE TRIGGER listing_facets_au
+        AFTER UPDATE OF status, listing_type, location_state, price_type, price ON listings BEGIN
+        {_decrement_sql('old')}
+        {_increment_sql('new')}
+    END""",
+}
+
+
+def rebuild_listing_facets(conn):
+    """Recompute the aggregate table from scratch inside an open connection/transaction"""
+    conn.exec_driver_sql(f'DELETE FROM {FACET_TABLE}')
+    conn.exec_driver_sql(
+        f"INSERT INTO {FACET_TABLE} (status, listing_type, location_state, price_type, price_bucket, count) "
+        f"SELECT {_key_sql('listings')}, COUNT(*) FROM listings GROUP BY 1, 2, 3, 4, 5"
+    )
+
+
+def ensure_listing_facets(engine):
+    """
+    Install the facet maintenance triggers and backfill the aggregate table.
+
+    Triggers are re-created on every start so changes to PRICE_BUCKET_EDGES
+    take effect; the table is rebuilt when it is out of step with listings.
+
+    Returns:
+        bool: True if facet counts are maintained incrementally, False if the
+        endpoint has to fall back to live GROUP BY queries
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+    try:
+        with engine.begin() as conn:
+            for name, ddl in _TRIGGERS.items():
+                conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
+                conn.exec_driver_sql(ddl)
+            listed = conn.exec_driver_sql('SELECT COUNT(*) FROM listings').scalar()
+            counted = conn.exec_driver_sql(f'SELECT COALESCE(SUM(count), 0) FROM {FACET_TABLE}').scalar()
+            if listed != counted:
+                rebuild_listing_facets(conn)
+        return True
+    except Exception:
+        return False
+
+
+def can_use_aggregate(args):
+    """Whether the request's filters can be answered from the aggregate table"""
+    if any(args.get(name) for name in LIVE_ONLY_FILTERS):
+        return False
+    featured = args.get('featured')
+    return not (featured and featured.lower() == 'true')
+
+
+def aggregate_facet_counts(session, facet_model, args):
+    """
+    Facet counts from the aggregate table.
+
+    Returns:
+        dict: {dimension: [(value, count), ...]} including 'price_bucket'
+    """
+    def filtered(query):
+        query = query.filter(facet_model.status == (args.get('status') or 'active'))
+        if args.get('listing_type'):
+            query = query.filter(facet_model.listing_type == args.get('listing_type'))
+        if args.get('location_state'):
+            query = query.filter(facet_model.location_state == args.get('location_state'))
+        return query.filter(facet_model.count > 0)
+
+    counts = {}
+    for dimension in FACET_DIMENSIONS + ('price_bucket',):
+        column = getattr(facet_model, dimension)
+        counts[dimension] = filtered(session.query(column, func.sum(facet_model.count))).group_by(column).all()
+    return counts
+
+
+def format_facets(counts):
+    """
+    Shape raw (value, count) pairs into the /listings/facets response.
+
+    Empty or NULL values (e.g. listings without a state) are left out of the
+    per-value maps but still contribute to the total.
+    """
+    result = {}
+    for dimension in FACET_DIMENSIONS:
+        result[dimension] = {value: int(n) for value, n in counts[dimension] if value}
+
+    by_bucket = {int(bucket): int(n) for bucket, n in counts['price_bucket']}
+    result['total'] = sum(by_bucket.values())
+    result['price'] = []
+    for index, edge in enumerate(PRICE_BUCKET_EDGES):
+        upper = PRICE_BUCKET_EDGES[index + 1] if index + 1 < len(PRICE_BUCKET_EDGES) else None
+        result['price'].append({'min': edge, 'max': upper, 'count': by_bucket.get(index, 0)})
+    return result
@@ -0,0 +1,138 @@
+"""
+Geospatial helpers for "near me" listing search
+Listings store a geohash next to their coordinates. A radius query is
+answered in two steps: an indexed prefilter on the geohash cells covering
+the search circle's bounding box, then an exact haversine distance check on
+the (few) candidates that survive it.
+"""
+import math
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+# Precision stored on listings (~5 m cells)
+GEOHASH_PRECISION = 9
+
+# Upper bound on cells used to cover a search area; more cells means a
+# tighter prefilter but a longer OR of index ranges
+MAX_COVER_CELLS = 24
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a geohash string"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits <<= 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size_degrees(precision):
+    """(lat_degrees, lon_degrees) spanned by one geohash cell of this precision"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min_lat, min_lon, max_lat, max_lon) enclosing a circle; does not wrap the antimeridian"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlon = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return (max(latitude - dlat, -90.0), max(longitude - dlon, -180.0),
+            min(latitude + dlat, 90.0), min(longitude + dlon, 180.0))
+
+
+def _cells_for_box(box, precision):
+    min_lat, min_lon, max_lat, max_lon = box
+    cell_lat, cell_lon = cell_size_degrees(precision)
+    rows = int((max_lat - min_lat) / cell_lat) + 2
+    cols = int((max_lon - min_lon) / cell_lon) + 2
+    if rows * cols > MAX_COVER_CELLS * 4:
+        return None
+    cells = set()
+    for i in range(rows):
+        lat = min(min_lat + i * cell_lat, max_lat)
+        for j in range(cols):
+            lon = min(min_lon + j * cell_lon, max_lon)
+            cells.add(encode(lat, lon, precision))
+    return cells
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """
+    Geohash prefixes whose cells together cover the search circle.
+
+    Picks the finest precision that needs at most MAX_COVER_CELLS cells, so
+    small radii get tight prefilters and large radii stay a short OR.
+    """
+    box = bounding_box(latitude, longitude, radius_km)
+    best = {encode(latitude, longitude, 1)}
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        cells = _cells_for_box(box, precision)
+        if cells is None or len(cells) > MAX_COVER_CELLS:
+            break
+        best = cells
+    return sorted(best)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def parse_point(raw):
+    """
+    Parse "lat,lon" from a query string.
+
+    Raises:
+        ValueError: If the value is malformed or out of range
+    """
+    try:
+        lat_str, lon_str = raw.split(',')
+        latitude, longitude = float(lat_str), float(lon_str)
+    except (AttributeError, ValueError):
+        raise ValueError('near must be "lat,lon"')
+    validate_coordinates(latitude, longitude)
+    return latitude, longitude
+
+
+def validate_coordinates(latitude, longitude):
+    """Raise ValueError unless latitude/longitude are finite and in range"""
+    if not (math.isfinite(latitude) and math.isfinite(longitude)):
+        raise ValueError('coordinates must be finite numbers')
+    if not -90.0 <= latitude <= 90.0 or not -180.0 <= longitude <= 180.0:
+        raise ValueError('latitude must be within [-90, 90] and longitude within [-180, 180]')
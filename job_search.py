@@ -0,0 +1,53 @@
+"""
+Structured job search
+Job.salary_range and Job.location stay free text for display. On every
+write they are also parsed into indexed columns the job list filters on:
+
+    salary_range "₦150k - ₦200k"   -> salary_min 150000, salary_max 200000
+    salary_range "₦5,000/day"      -> salary_min = salary_max = 5000
+    salary_range "Daily Pay"       -> no amounts (NULL)
+    location "Dala, Kano State"    -> location_key "kano"
+
+Amounts are kept as written, whatever the pay period.
+"""
+import re
+
+
+# An amount with an optional k (thousand) / m (million) suffix; the suffix
+# must end the word, so "5000 monthly" is 5000 and not 5000 million
+_AMOUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kKmM]?)(?![A-Za-z])')
+
+_MULTIPLIERS = {'k': 1e3, 'm': 1e6}
+
+
+def parse_salary_range(text):
+    """
+    (low, high) amounts in a free-text salary range, e.g. "₦5,000 - ₦8,000/day"
+    or "5k-8k"; (None, None) when it names no amount.
+    """
+    amounts = []
+    for number, suffix in _AMOUNT.findall(text or ''):
+        try:
+            value = float(number.replace(',', ''))
+        except ValueError:
+            continue
+        amounts.append(value * _MULTIPLIERS.get(suffix.lower(), 1))
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+
+def location_key(location):
+    """Normalized state of a free-text location: its last comma-separated part, without "State" """
+    parts = [part for part in (location or '').split(',') if part.strip()]
+    if not parts:
+        return None
+    key = ' '.join(re.findall(r'\w+', parts[-1].lower(), flags=re.UNICODE))
+    key = re.sub(r'\s+state$', '', key)
+    return key[:100] or None
+
+
+def apply_derived_fields(job):
+    """Set a job's salary_min/salary_max and location_key from its text fields"""
+    job.salary_min, job.salary_max = parse_salary_range(job.salary_range)
+    job.location_key = location_key(job.location)
@@ -0,0 +1,73 @@
+"""
+Delivery of uploaded media
+Uploads are sent with werkzeug's send_file, which answers Range requests
+with 206 (video seeking, resumed downloads), honours If-Range and
+conditional headers, and hands the open file to the server's
+wsgi.file_wrapper so servers that support it (gunicorn, uWSGI) transmit it
+with sendfile(2). With USE_X_SENDFILE the front-end server streams the file
+itself and the app only sends headers.
+
+Transfers of large bodies hold a worker for their whole duration, so only a
+fixed number may run at once; beyond that the client is asked to retry
+rather than letting video streams occupy every worker.
+"""
+import threading
+
+
+class TransferLimiter:
+    """
+    Caps the number of concurrent large transfers.
+
+        limiter = TransferLimiter(max_transfers=8, large_bytes=8 << 20)
+        response = limiter.admit(response)  # None when all slots are taken
+
+    A slot is held until the WSGI server closes the response body. HEAD
+    requests and 304s send no body and are never counted.
+    """
+
+    def __init__(self, max_transfers, large_bytes):
+        self.max_transfers = max_transfers
+        self.large_bytes = large_bytes
+        self._slots = threading.BoundedSemaphore(max_transfers)
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def admit(self, response, method='GET'):
+        """Return the response with a slot attached, unchanged if it's small, or None if no slot is free"""
+        length = response.content_length
+        if (method == 'HEAD' or response.status_code not in (200, 206)
+                or length is None or length < self.large_bytes):
+            return response
+        if not self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            self.active += 1
+        released = []
+
+        def release():
+            # close() may be called more than once
+            if not released:
+                released.append(True)
+                with self._lock:
+                    self.active -= 1
+                self._slots.release()
+
+        # send_file responses are passed straight through to the server as its
+        # file_wrapper, which skips the response's own close callbacks; hook the
+        # wrapper's close() instead so the type (and sendfile) is preserved
+        body = response.response
+        wrapped_close = getattr(body, 'close', None)
+
+        def close():
+            try:
+                if wrapped_close is not None:
+                    wrapped_close()
+            finally:
+                release()
+
+        try:
+            body.close = close
+        except AttributeError:
+            pass
+        response.call_on_close(release)
+        return response
@@ -0,0 +1,326 @@
+"""
+Content-addressed media storage
+Uploaded listing images and videos are stored once per distinct content,
+under their SHA-256:
+
+    <MEDIA_ROOT>/ab/ab12...ef.png          original
+    <MEDIA_ROOT>/ab/ab12...ef.thumb.jpg    320px derivative
+    <MEDIA_ROOT>/ab/ab12...ef.medium.jpg   1024px derivative
+
+`media_blobs` keeps a reference count per hash: every listing that lists a
+URL holds one reference, and files are only deleted once nothing refers
+to them. Image derivatives are produced off the request path by
+DerivativePipeline; until they exist, variant URLs fall back to the
+original. URLs never change for a given content, so they can be cached
+forever.
+"""
+import datetime
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+
+from werkzeug.utils import secure_filename
+
+
+logger = logging.getLogger(__name__)
+
+
+URL_PREFIX = '/static/uploads/media/'
+
+# Longest edge in pixels of each image derivative
+VARIANTS = {'thumb': 320, 'medium': 1024}
+DERIVATIVE_FORMAT = ('jpg', 'JPEG')
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class MediaRef:
+    """Result of storing one upload"""
+
+    def __init__(self, url, sha256, created):
+        self.url = url
+        self.sha256 = sha256
+        self.created = created  # True if this content was not stored before
+
+
+def _extension(filename):
+    return os.path.splitext(secure_filename(filename or ''))[1].lower().lstrip('.')[:10] or 'bin'
+
+
+def parse_media_url(url):
+    """(sha256, extension) of a content-addressed URL, or None for any other URL"""
+    if not isinstance(url, str) or not url.startswith(URL_PREFIX):
+        return None
+    name = url.rsplit('/', 1)[-1]
+    sha256, _, extension = name.partition('.')
+    if len(sha256) != 64 or '.' in extension:
+        return None
+    return sha256, extension
+
+
+class MediaStore:
+    """
+    Stores uploads by content hash and tracks references in media_blobs.
+
+    Reference changes happen in the caller's session, so they commit or roll
+    back together with the listing that holds them. Call collect() after the
+    commit to delete content that lost its last reference.
+    """
+
+    def __init__(self, root, blob_model, url_prefix=URL_PREFIX):
+        self.root = root
+        self.blob_model = blob_model
+        self.url_prefix = url_prefix
+
+    def path(self, sha256, extension, variant=None):
+        suffix = f'{variant}.{DERIVATIVE_FORMAT[0]}' if variant else extension
+        return os.path.join(self.root, sha256[:2], f'{sha256}.{suffix}')
+
+    def url(self, sha256, extension, variant=None):
+        suffix = f'{variant}.{DERIVATIVE_FORMAT[0]}' if variant else extension
+        return f'{self.url_prefix}{sha256[:2]}/{sha256}.{suffix}'
+
+    def save(self, session, upload, kind):
+        """
+        Store a werkzeug FileStorage and take one reference to it.
+
+        The upload is hashed while it is streamed to a temporary file, which
+        is then moved into place unless identical content already exists.
+
+        Returns:
+            MediaRef
+        """
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload-', dir=self.root)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = upload.stream.read(READ_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            return self._adopt(session, tmp_path, digest.hexdigest(), size, kind,
+                               _extension(upload.filename), upload.mimetype)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def store_file(self, session, path, kind, filename=None, content_type=None):
+        """
+        Move a file that is already on disk (e.g. an assembled chunked upload)
+        into the store and take one reference to it. The file is consumed.
+
+        Returns:
+            MediaRef
+        """
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.upload-', dir=self.root)
+        os.close(fd)
+        try:
+            # Same-filesystem rename when possible, so the final os.replace is atomic
+            shutil.move(path, tmp_path)
+            digest = hashlib.sha256()
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(READ_CHUNK_BYTES), b''):
+                    digest.update(chunk)
+            return self._adopt(session, tmp_path, digest.hexdigest(), os.path.getsize(tmp_path), kind,
+                               _extension(filename), content_type)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _adopt(self, session, tmp_path, sha256, size, kind, extension, content_type):
+        blob = session.query(self.blob_model).filter_by(sha256=sha256).first()
+        created = blob is None
+        if created:
+            blob = self.blob_model(sha256=sha256, kind=kind, extension=extension,
+                                   content_type=content_type, size=size, ref_count=1,
+                                   derivatives='pending' if kind == 'image' else 'none')
+            session.add(blob)
+        else:
+            blob.ref_count = self.blob_model.ref_count + 1
+
+        final_path = self.path(sha256, blob.extension)
+        if os.path.exists(final_path):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(tmp_path, final_path)
+        return MediaRef(self.url(sha256, blob.extension), sha256, created)
+
+    def _adjust(self, session, urls, delta):
+        counts = {}
+        for url in urls or ():
+            parsed = parse_media_url(url)
+            if parsed:
+                counts[parsed[0]] = counts.get(parsed[0], 0) + delta
+        for sha256, n in counts.items():
+            session.query(self.blob_model).filter_by(sha256=sha256).update(
+                {self.blob_model.ref_count: self.blob_model.ref_count + n}, synchronize_session=False)
+
+    def retain(self, session, urls):
+        """Take a reference for every stored-media URL in urls (other URLs are ignored)"""
+        self._adjust(session, urls, 1)
+
+    def release(self, session, urls):
+        """Drop a reference for every stored-media URL in urls"""
+        self._adjust(session, urls, -1)
+
+    def collect(self, session):
+        """
+        Delete blobs (rows, originals and derivatives) that have no references left.
+
+        Returns:
+            int: Number of blobs removed
+        """
+        blob_model = self.blob_model
+        removed = 0
+        unreferenced = session.query(blob_model.sha256, blob_model.extension).filter(blob_model.ref_count <= 0).all()
+        for sha256, extension in unreferenced:
+            # Re-check in the DELETE: a concurrent upload may have re-referenced it
+            deleted = (session.query(blob_model)
+                       .filter(blob_model.sha256 == sha256, blob_model.ref_count <= 0)
+                       .delete(synchronize_session=False))
+            session.commit()
+            if not deleted:
+                continue
+            removed += 1
+            paths = [self.path(sha256, extension)]
+            paths += [self.path(sha256, extension, variant) for variant in VARIANTS]
+            for path in paths:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def variant_url(self, url, variant):
+        """URL of an image's derivative if it has been generated, else the URL itself"""
+        if not variant or variant == 'original':
+            return url
+        parsed = parse_media_url(url)
+        if parsed is None or variant not in VARIANTS:
+            return url
+        sha256, _ = parsed
+        if os.path.exists(self.path(sha256, None, variant)):
+            return self.url(sha256, None, variant)
+        return url
+
+
+def render_derivative(source_path, target_path, max_edge):
+    """Write a JPEG no larger than max_edge on its longest side (requires Pillow)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_edge, max_edge))
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        fd, tmp_path = tempfile.mkstemp(prefix='.derivative-', dir=os.path.dirname(target_path))
+        os.close(fd)
+        try:
+            image.save(tmp_path, DERIVATIVE_FORMAT[1], quality=82, optimize=True)
+            os.replace(tmp_path, target_path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+
+class DerivativePipeline:
+    """
+    Generates thumbnail and medium derivatives for stored images.
+
+        pipeline = DerivativePipeline(store, session_factory)
+        pipeline.enqueue(ref.sha256)
+
+    Work runs on one background thread; with async_=False it runs inline.
+    Blob rows record the outcome: 'ready', 'failed' (not a decodable image)
+    or 'unavailable' (Pillow is not installed).
+    """
+
+    def __init__(self, store, session_factory, async_=True):
+        self.store = store
+        self.session_factory = session_factory
+        self.async_ = async_
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, sha256):
+        if not self.async_:
+            self.process(sha256)
+            return
+        self._queue.put(sha256)
+        self._ensure_thread()
+
+    def enqueue_pending(self):
+        """Queue every image whose derivatives were never generated (e.g. after a migration)"""
+        blob_model = self.store.blob_model
+        session = self.session_factory()
+        try:
+            pending = [sha for (sha,) in session.query(blob_model.sha256)
+                       .filter(blob_model.derivatives == 'pending', blob_model.ref_count > 0)]
+        finally:
+            session.close()
+        for sha256 in pending:
+            self.enqueue(sha256)
+        return len(pending)
+
+    def process(self, sha256):
+        blob_model = self.store.blob_model
+        session = self.session_factory()
+        try:
+            blob = session.query(blob_model).filter_by(sha256=sha256).first()
+            if blob is None or blob.kind != 'image':
+                return
+            try:
+                for variant, max_edge in VARIANTS.items():
+                    render_derivative(self.store.path(sha256, blob.extension),
+                                      self.store.path(sha256, blob.extension, variant), max_edge)
+                status = 'ready'
+            except ImportError:
+                status = 'unavailable'
+            except Exception:
+                logger.warning('Could not generate derivatives for %s', sha256, exc_info=True)
+                status = 'failed'
+            blob.derivatives = status
+            blob.derivatives_at = datetime.datetime.now(datetime.timezone.utc)
+            session.commit()
+        finally:
+            session.close()
+
+    def close(self):
+        """Stop accepting work; the worker exits once the queue is drained"""
+        if self._thread is not None:
+            self._queue.put(None)
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='media-derivatives', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            sha256 = self._queue.get()
+            if sha256 is None:
+                return
+            try:
+                self.process(sha256)
+            except Exception:
+                logger.exception('Derivative generation failed for %s', sha256)
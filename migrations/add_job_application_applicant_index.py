@@ -0,0 +1,36 @@
+import os
+import sqlite3
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Index behind the worker dashboard's "recent applications": one applicant's
+# rows newest first, read without sorting the table. Safe to re-run.
+INDEX = ('CREATE INDEX IF NOT EXISTS ix_job_applications_applicant_created_at '
+         'ON job_applications (applicant_id, created_at, id);')
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='job_applications';")
+if not cur.fetchone():
+    print('Table job_applications not found. Nothing to do.')
+    conn.close()
+    exit(0)
+
+try:
+    cur.execute(INDEX)
+    conn.commit()
+except Exception as e:
+    print('Error creating index:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+print('Migration completed successfully.')
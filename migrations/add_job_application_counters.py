@@ -0,0 +1,63 @@
+import os
+import sqlite3
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Per-job application totals the apply/accept/decline endpoints now keep up
+# to date, backfilled by counting job_applications once, plus the indexes
+# behind the paginated applicant list. Safe to re-run: counts are recomputed.
+COLUMNS = [
+    ('applications_count', 'INTEGER DEFAULT 0'),
+    ('pending_count', 'INTEGER DEFAULT 0'),
+]
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS ix_job_applications_job_status_created_at '
+    'ON job_applications (job_id, status, created_at, id);',
+    'CREATE INDEX IF NOT EXISTS ix_job_applications_job_created_at ON job_applications (job_id, created_at, id);',
+]
+BACKFILL = """
+UPDATE jobs SET
+    applications_count = (SELECT COUNT(*) FROM job_applications a WHERE a.job_id = jobs.id),
+    pending_count = (SELECT COUNT(*) FROM job_applications a WHERE a.job_id = jobs.id AND a.status = 'pending');
+"""
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+for table in ('jobs', 'job_applications'):
+    cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?;", (table,))
+    if not cur.fetchone():
+        print(f'Table {table} not found. Nothing to do.')
+        conn.close()
+        exit(0)
+
+cur.execute("PRAGMA table_info('jobs');")
+cols = [r[1] for r in cur.fetchall()]
+print('Existing columns:', cols)
+
+try:
+    for name, col_type in COLUMNS:
+        if name in cols:
+            print(f"Column '{name}' already exists.")
+            continue
+        print(f"Adding column '{name}' to jobs...")
+        cur.execute(f"ALTER TABLE jobs ADD COLUMN {name} {col_type};")
+    for ddl in INDEXES:
+        cur.execute(ddl)
+    cur.execute(BACKFILL)
+    conn.commit()
+    print(f'Backfilled application counts for {cur.rowcount} jobs.')
+except Exception as e:
+    print('Error migrating jobs:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+print('Migration completed successfully.')
@@ -0,0 +1,96 @@
+import os
+import re
+import sqlite3
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Indexed columns behind the /api/jobs/list filters, parsed from the free-text
+# salary_range and location of every existing job ("₦150k - ₦200k" ->
+# 150000/200000, "Daily Pay" -> NULL, "Dala, Kano State" -> "kano"). Safe to
+# re-run: every row is re-parsed. Parsing matches job_search.py.
+COLUMNS = [
+    ('location_key', 'VARCHAR(100)'),
+    ('salary_min', 'FLOAT'),
+    ('salary_max', 'FLOAT'),
+]
+INDEXES = [
+    ('ix_jobs_created_at_id', '(created_at, id)'),
+    ('ix_jobs_status_created_at_id', '(status, created_at, id)'),
+    ('ix_jobs_location_key_created_at_id', '(location_key, created_at, id)'),
+    ('ix_jobs_salary_min_id', '(salary_min, id)'),
+    ('ix_jobs_salary_max_id', '(salary_max, id)'),
+]
+
+AMOUNT = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kKmM]?)(?![A-Za-z])')
+MULTIPLIERS = {'k': 1e3, 'm': 1e6}
+
+
+def parse_salary_range(text):
+    amounts = []
+    for number, suffix in AMOUNT.findall(text or ''):
+        try:
+            value = float(number.replace(',', ''))
+        except ValueError:
+            continue
+        amounts.append(value * MULTIPLIERS.get(suffix.lower(), 1))
+    if not amounts:
+        return None, None
+    return min(amounts), max(amounts)
+
+
+def location_key(location):
+    parts = [part for part in (location or '').split(',') if part.strip()]
+    if not parts:
+        return None
+    key = ' '.join(re.findall(r'\w+', parts[-1].lower(), flags=re.UNICODE))
+    key = re.sub(r'\s+state$', '', key)
+    return key[:100] or None
+
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='jobs';")
+if not cur.fetchone():
+    print('Table jobs not found. Nothing to do.')
+    conn.close()
+    exit(0)
+
+cur.execute("PRAGMA table_info('jobs');")
+cols = [r[1] for r in cur.fetchall()]
+print('Existing columns:', cols)
+
+try:
+    for name, col_type in COLUMNS:
+        if name in cols:
+            print(f"Column '{name}' already exists.")
+            continue
+        print(f"Adding column '{name}' to jobs...")
+        cur.execute(f"ALTER TABLE jobs ADD COLUMN {name} {col_type};")
+    for name, columns in INDEXES:
+        cur.execute(f'CREATE INDEX IF NOT EXISTS {name} ON jobs {columns};')
+
+    rows = []
+    unparsed = 0
+    for job_id, salary_range, location in cur.execute('SELECT id, salary_range, location FROM jobs;').fetchall():
+        low, high = parse_salary_range(salary_range)
+        if salary_range and low is None:
+            unparsed += 1
+        rows.append((low, high, location_key(location), job_id))
+    cur.executemany('UPDATE jobs SET salary_min = ?, salary_max = ?, location_key = ? WHERE id = ?;', rows)
+    conn.commit()
+    print(f'Backfilled {len(rows)} jobs; {unparsed} salary ranges name no amount.')
+except Exception as e:
+    print('Error migrating jobs:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+print('Migration completed successfully.')
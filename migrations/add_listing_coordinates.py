@@ -0,0 +1,48 @@
+import sqlite3
+import os
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Columns backing "near me" listing search
+COLUMNS = [
+    ('latitude', 'REAL'),
+    ('longitude', 'REAL'),
+    ('geohash', 'VARCHAR(12)'),
+]
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='listings';")
+if not cur.fetchone():
+    print('Table listings not found. Nothing to do.')
+    conn.close()
+    exit(0)
+
+cur.execute("PRAGMA table_info('listings');")
+cols = [r[1] for r in cur.fetchall()]
+print('Existing columns:', cols)
+
+try:
+    for name, col_type in COLUMNS:
+        if name in cols:
+            print(f"Column '{name}' already exists.")
+            continue
+        print(f"Adding column '{name}' to listings...")
+        cur.execute(f"ALTER TABLE listings ADD COLUMN {name} {col_type};")
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_listings_status_geohash ON listings (status, geohash);")
+    conn.commit()
+except Exception as e:
+    print('Error migrating listings:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+print('Migration completed successfully.')
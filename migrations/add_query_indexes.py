@@ -0,0 +1,54 @@
+import sqlite3
+import os
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Composite indexes used by keyset pagination on GET /listings and the worker directory, and boost expiry indexes
+INDEXES = [
+    ('ix_listings_status_created_at_id', 'listings', '(status, created_at, id)'),
+    ('ix_listings_status_price_id', 'listings', '(status, price, id)'),
+    ('ix_listings_boost_expiry', 'listings', '(boost_expiry)'),
+    ('ix_worker_profiles_boost_expiry', 'worker_profiles', '(boost_expiry)'),
+    ('ix_jobs_boost_expiry', 'jobs', '(boost_expiry)'),
+    # Worker directory sort orders (GET /workers, /api/workers/list)
+    ('ix_worker_profiles_rating_jobs_id', 'worker_profiles', '(rating, total_jobs, id)'),
+    ('ix_worker_profiles_available_state_rating', 'worker_profiles', '(available, location_state, rating, total_jobs, id)'),
+    ('ix_worker_profiles_specialization_rating', 'worker_profiles', '(specialization, rating, total_jobs, id)'),
+    ('ix_worker_profiles_experience_id', 'worker_profiles', '(experience_years, id)'),
+    ('ix_worker_profiles_hourly_rate_id', 'worker_profiles', '(hourly_rate, id)'),
+    ('ix_worker_profiles_daily_rate_id', 'worker_profiles', '(daily_rate, id)'),
+    ('ix_worker_profiles_updated_at', 'worker_profiles', '(updated_at)'),
+]
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table';")
+tables = {r[0] for r in cur.fetchall()}
+
+try:
+    for name, table, columns in INDEXES:
+        if table not in tables:
+            print(f'Table {table} not found. Skipping {name}.')
+            continue
+        print(f'Creating index {name} on {table}{columns}...')
+        cur.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} {columns};')
+    conn.commit()
+except Exception as e:
+    print('Error creating indexes:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+for table in sorted({t for _, t, _ in INDEXES} & tables):
+    cur.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=?;", (table,))
+    print(f'Indexes on {table}:', [r[0] for r in cur.fetchall()])
+
+conn.close()
+print('Migration completed successfully.')
@@ -0,0 +1,127 @@
+import datetime
+import os
+import sqlite3
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Create worker_bookings and book workers for already accepted applications
+# and signed contracts, the same way the accept/sign endpoints now do:
+# applications from their creation for DEFAULT_DAYS (they carry no dates),
+# contracts for their work period (contracts.work_starts_at/work_ends_at,
+# added here if missing), defaulting to DEFAULT_DAYS from the second
+# signature. Safe to re-run: the unique (source, source_id, worker_id) index
+# skips application bookings already made, contract bookings are moved to
+# the period above and those of contracts no longer signed are dropped.
+CONTRACT_COLUMNS = [
+    ('work_starts_at', 'DATETIME'),
+    ('work_ends_at', 'DATETIME'),
+]
+CREATE_BOOKINGS = """
+CREATE TABLE IF NOT EXISTS worker_bookings (
+    id INTEGER PRIMARY KEY,
+    worker_id INTEGER NOT NULL REFERENCES worker_profiles (id),
+    starts_at DATETIME NOT NULL,
+    ends_at DATETIME NOT NULL,
+    source VARCHAR(20) NOT NULL,
+    source_id INTEGER NOT NULL,
+    created_at DATETIME
+);
+"""
+INDEXES = [
+    'CREATE INDEX IF NOT EXISTS ix_worker_bookings_ends_starts_worker ON worker_bookings (ends_at, starts_at, worker_id);',
+    'CREATE INDEX IF NOT EXISTS ix_worker_bookings_worker_starts ON worker_bookings (worker_id, starts_at);',
+    'CREATE UNIQUE INDEX IF NOT EXISTS ix_worker_bookings_source ON worker_bookings (source, source_id, worker_id);',
+]
+
+# Matches config.WORKER_BOOKING_DEFAULT_DAYS
+DEFAULT_DAYS = int(os.environ.get('WORKER_BOOKING_DEFAULT_DAYS', '7'))
+
+APPLICATIONS = """
+SELECT w.id, a.id, a.created_at
+FROM job_applications a JOIN worker_profiles w ON w.user_id = a.applicant_id
+WHERE a.status = 'accepted';
+"""
+CONTRACTS = """
+SELECT w.id, c.id, MAX(COALESCE(c.party_a_signed_at, c.created_at), COALESCE(c.party_b_signed_at, c.created_at)),
+       c.work_starts_at, c.work_ends_at
+FROM contracts c JOIN worker_profiles w ON w.user_id IN (c.party_a_id, c.party_b_id)
+WHERE c.status = 'signed';
+"""
+
+
+def parse(value):
+    # SQLAlchemy stores DateTime as 'YYYY-MM-DD HH:MM:SS[.ffffff]'
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='worker_profiles';")
+if not cur.fetchone():
+    print('Table worker_profiles not found. Nothing to migrate.')
+    conn.close()
+    exit(0)
+
+try:
+    cur.execute(CREATE_BOOKINGS)
+    for ddl in INDEXES:
+        cur.execute(ddl)
+    default = datetime.timedelta(days=DEFAULT_DAYS)
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat(' ')
+    rows = []
+    for worker_id, application_id, created_at in cur.execute(APPLICATIONS).fetchall():
+        start = parse(created_at)
+        if start is not None:
+            rows.append((worker_id, start, start + default, 'application', application_id))
+    before = conn.total_changes
+    cur.executemany(
+        'INSERT OR IGNORE INTO worker_bookings (worker_id, starts_at, ends_at, source, source_id, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?);',
+        [(worker_id, start.isoformat(' '), end.isoformat(' '), source, source_id, now)
+         for worker_id, start, end, source, source_id in rows]
+    )
+    added = conn.total_changes - before
+
+    cur.execute("PRAGMA table_info('contracts');")
+    cols = [r[1] for r in cur.fetchall()]
+    for name, col_type in CONTRACT_COLUMNS:
+        if cols and name not in cols:
+            print(f"Adding column '{name}' to contracts...")
+            cur.execute(f"ALTER TABLE contracts ADD COLUMN {name} {col_type};")
+    contracts = []
+    for worker_id, contract_id, signed_at, work_starts_at, work_ends_at in (
+            cur.execute(CONTRACTS).fetchall() if cols else []):
+        start = parse(work_starts_at) or parse(signed_at)
+        if start is not None:
+            end = parse(work_ends_at) or start + default
+            if end > start:
+                contracts.append((worker_id, start.isoformat(' '), end.isoformat(' '), 'contract', contract_id, now))
+    if cols:
+        # Contracts no longer signed keep no bookings
+        cur.execute("DELETE FROM worker_bookings WHERE source = 'contract' "
+                    "AND source_id NOT IN (SELECT id FROM contracts WHERE status = 'signed');")
+    cur.executemany(
+        'INSERT INTO worker_bookings (worker_id, starts_at, ends_at, source, source_id, created_at) '
+        'VALUES (?, ?, ?, ?, ?, ?) '
+        'ON CONFLICT (source, source_id, worker_id) DO UPDATE SET starts_at = excluded.starts_at, '
+        'ends_at = excluded.ends_at;',
+        contracts
+    )
+    conn.commit()
+    print(f'Booked {added} application periods ({len(rows) - added} already present) '
+          f'and {len(contracts)} contract periods.')
+except Exception as e:
+    print('Error migrating worker bookings:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+print('Migration completed successfully.')
@@ -0,0 +1,72 @@
+import json
+import os
+import re
+import sqlite3
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Create worker_tags and fill it from the JSON skills/certifications of every
+# worker profile. Safe to re-run: existing tags are kept, missing ones added.
+# Normalization matches worker_tags.normalize_tag.
+CREATE_TAGS = """
+CREATE TABLE IF NOT EXISTS worker_tags (
+    kind VARCHAR(20) NOT NULL,
+    tag VARCHAR(100) NOT NULL,
+    worker_id INTEGER NOT NULL REFERENCES worker_profiles (id),
+    PRIMARY KEY (kind, tag, worker_id)
+);
+"""
+CREATE_INDEX = 'CREATE INDEX IF NOT EXISTS ix_worker_tags_worker_id ON worker_tags (worker_id);'
+
+FIELDS = {'skills': 'skill', 'certifications': 'certification'}
+
+
+def normalize_tag(value):
+    if not isinstance(value, str):
+        return None
+    tag = re.sub(r'\s+', ' ', value).strip().lower()
+    return tag[:100] or None
+
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='worker_profiles';")
+if not cur.fetchone():
+    print('Table worker_profiles not found. Nothing to migrate.')
+    conn.close()
+    exit(0)
+
+try:
+    cur.execute(CREATE_TAGS)
+    cur.execute(CREATE_INDEX)
+    rows = []
+    skipped = 0
+    for worker_id, skills, certifications in cur.execute('SELECT id, skills, certifications FROM worker_profiles;').fetchall():
+        for field, raw in (('skills', skills), ('certifications', certifications)):
+            try:
+                values = json.loads(raw or '[]')
+            except ValueError:
+                skipped += 1
+                continue
+            if not isinstance(values, list):
+                skipped += 1
+                continue
+            rows.extend({(FIELDS[field], tag, worker_id) for tag in map(normalize_tag, values) if tag})
+    cur.executemany('INSERT OR IGNORE INTO worker_tags (kind, tag, worker_id) VALUES (?, ?, ?);', rows)
+    conn.commit()
+    print(f'Indexed {len(rows)} tags; skipped {skipped} unparseable fields.')
+except Exception as e:
+    print('Error migrating worker tags:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+print('Migration completed successfully.')
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sqlite3
+import sys
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'static', 'uploads', 'media'))
+MEDIA_URL_PREFIX = '/static/uploads/media/'
+LEGACY_URL_PREFIX = '/static/uploads/listings/'
+
+# Move listing uploads saved under uuid file names into the content-addressed
+# media store: identical files collapse into one blob, listing URLs are
+# rewritten and reference counts are rebuilt from every listing. Originals
+# are kept unless --delete-originals is given. Derivatives are generated by
+# the app on its next start (blobs are left 'pending').
+DELETE_ORIGINALS = '--delete-originals' in sys.argv
+
+CREATE_BLOBS = """
+CREATE TABLE IF NOT EXISTS media_blobs (
+    sha256 VARCHAR(64) NOT NULL PRIMARY KEY,
+    kind VARCHAR(10) NOT NULL,
+    extension VARCHAR(10) NOT NULL,
+    content_type VARCHAR(100),
+    size INTEGER NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    derivatives VARCHAR(20),
+    derivatives_at DATETIME,
+    created_at DATETIME
+);
+"""
+
+
+def sha256_of(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def store(cur, legacy_url, kind, migrated):
+    """Content-addressed URL for a legacy upload URL, or the URL unchanged if its file is missing"""
+    if legacy_url in migrated:
+        return migrated[legacy_url]
+    source = os.path.join(BASE_DIR, legacy_url.lstrip('/'))
+    if not os.path.isfile(source):
+        print('  missing file, left as is:', legacy_url)
+        migrated[legacy_url] = legacy_url
+        return legacy_url
+    sha256 = sha256_of(source)
+    extension = os.path.splitext(source)[1].lower().lstrip('.')[:10] or 'bin'
+    cur.execute("SELECT extension FROM media_blobs WHERE sha256 = ?", (sha256,))
+    row = cur.fetchone()
+    if row:
+        extension = row[0]
+    else:
+        cur.execute(
+            "INSERT INTO media_blobs (sha256, kind, extension, content_type, size, ref_count, derivatives, created_at) "
+            "VALUES (?, ?, ?, ?, ?, 0, ?, datetime('now'))",
+            (sha256, kind, extension, mimetypes.guess_type(source)[0], os.path.getsize(source),
+             'pending' if kind == 'image' else 'none'))
+    target = os.path.join(MEDIA_ROOT, sha256[:2], f'{sha256}.{extension}')
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(source, target)
+    url = f'{MEDIA_URL_PREFIX}{sha256[:2]}/{sha256}.{extension}'
+    migrated[legacy_url] = url
+    return url
+
+
+print('DB path:', DB_PATH)
+print('Media root:', MEDIA_ROOT)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='listings';")
+if not cur.fetchone():
+    print('Table listings not found. Nothing to do.')
+    conn.close()
+    exit(0)
+
+migrated = {}
+try:
+    cur.execute(CREATE_BLOBS)
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_media_blobs_ref_count ON media_blobs (ref_count);")
+
+    cur.execute("SELECT id, images, videos FROM listings;")
+    listings = cur.fetchall()
+    references = {}
+    for listing_id, images, videos in listings:
+        columns = {}
+        for column, value, kind in (('images', images, 'image'), ('videos', videos, 'video')):
+            try:
+                urls = json.loads(value) if value else []
+            except ValueError:
+                continue
+            new_urls = [store(cur, url, kind, migrated) if isinstance(url, str) and url.startswith(LEGACY_URL_PREFIX)
+                        else url for url in urls]
+            for url in new_urls:
+                if isinstance(url, str) and url.startswith(MEDIA_URL_PREFIX):
+                    sha256 = url.rsplit('/', 1)[-1].split('.')[0]
+                    references[sha256] = references.get(sha256, 0) + 1
+            if new_urls != urls:
+                columns[column] = json.dumps(new_urls)
+        if columns:
+            print(f'Listing {listing_id}: rewrote', ', '.join(columns))
+            # updated_at is left alone: restart the app so cached listing payloads pick up the new URLs
+            cur.execute(f"UPDATE listings SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+                        (*columns.values(), listing_id))
+
+    # Rebuild every reference count from the listings themselves
+    cur.execute("UPDATE media_blobs SET ref_count = 0;")
+    cur.executemany("UPDATE media_blobs SET ref_count = ? WHERE sha256 = ?",
+                    [(count, sha256) for sha256, count in references.items()])
+    conn.commit()
+except Exception as e:
+    print('Error migrating listing media:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+
+moved = {legacy: url for legacy, url in migrated.items() if url != legacy}
+print(f'{len(moved)} files migrated into {len(set(moved.values()))} blobs.')
+if DELETE_ORIGINALS:
+    for legacy in moved:
+        try:
+            os.unlink(os.path.join(BASE_DIR, legacy.lstrip('/')))
+        except OSError as e:
+            print('  could not delete', legacy, e)
+    print('Original files deleted.')
+print('Migration completed successfully.')
@@ -0,0 +1,60 @@
+import os
+import re
+import sqlite3
+import unicodedata
+
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+DB_PATH = os.path.join(BASE_DIR, 'flb.db')
+
+# Recompute saved_searches.match_key now that keywords match as word prefixes
+# and the key holds only the first PREFIX_LENGTH letters of a keyword.
+# Safe to re-run. Keys match saved_searches.match_key.
+PREFIX_LENGTH = 3
+WILDCARD = '*'
+
+
+def tokenize(text):
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'\w+', text, flags=re.UNICODE)
+
+
+def normalize(value):
+    return (value or '').strip().lower() or WILDCARD
+
+
+def match_key(listing_type, location_state, keywords):
+    words = sorted(set(tokenize(keywords)), key=lambda word: (-len(word), word))
+    return '|'.join((normalize(listing_type), normalize(location_state),
+                     words[0][:PREFIX_LENGTH] if words else WILDCARD))
+
+
+print('DB path:', DB_PATH)
+if not os.path.exists(DB_PATH):
+    print('Database file not found at', DB_PATH)
+    exit(1)
+
+conn = sqlite3.connect(DB_PATH)
+cur = conn.cursor()
+
+cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='saved_searches';")
+if not cur.fetchone():
+    print('Table saved_searches not found. Nothing to do.')
+    conn.close()
+    exit(0)
+
+try:
+    rows = cur.execute('SELECT id, listing_type, location_state, keywords FROM saved_searches;').fetchall()
+    cur.executemany('UPDATE saved_searches SET match_key = ? WHERE id = ?;',
+                    [(match_key(listing_type, state, keywords), search_id)
+                     for search_id, listing_type, state, keywords in rows])
+    conn.commit()
+    print(f'Re-keyed {len(rows)} saved searches.')
+except Exception as e:
+    print('Error re-keying saved searches:', e)
+    conn.rollback()
+    conn.close()
+    exit(1)
+
+conn.close()
+print('Migration completed successfully.')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Float, Index
 from sqlalchemy.orm import declarative_base, relationship, backref
 import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -139,6 +139,9 @@ class Contract(Base):
     party_b_signature = Column(Text, nullable=True) # Base64 encoded signature image
     created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
     expires_at = Column(DateTime, nullable=True)
+    # Period the work itself takes place; a signed contract books its worker for it
+    work_starts_at = Column(DateTime, nullable=True)
+    work_ends_at = Column(DateTime, nullable=True)
 
     # Relationships
     party_a = relationship('User', foreign_keys=[party_a_id], backref='contracts_created')
@@ -161,7 +164,9 @@ class Contract(Base):
             'party_a_signature': self.party_a_signature,
             'party_b_signature': self.party_b_signature,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'work_starts_at': self.work_starts_at.isoformat() if self.work_starts_at else None,
+            'work_ends_at': self.work_ends_at.isoformat() if self.work_ends_at else None
         }
 
 
@@ -177,6 +182,9 @@ class Listing(Base):
     location_state = Column(String(100), nullable=True)
     location_area = Column(String(200), nullable=True)
     location_address = Column(Text, nullable=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String(12), nullable=True)  # Derived from latitude/longitude, used for radius search
     
     # Land/property specific fields
     size_value = Column(Integer, nullable=True)  # Numeric size
@@ -194,7 +202,7 @@ class Listing(Base):
     # Status and visibility
     status = Column(String(50), default='active')  # active, sold, rented, inactive
     featured = Column(Boolean, default=False)  # Premium/boosted listing
-    boost_expiry = Column(DateTime, nullable=True)  # When the boost expires
+    boost_expiry = Column(DateTime, nullable=True, index=True)  # When the boost expires
     
     # Metadata
     created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
@@ -203,8 +211,32 @@ class Listing(Base):
     
     # Relationship
     owner = relationship('User', foreign_keys=[owner_id], backref='listings')
+
+    # Composite indexes backing keyset pagination for each /listings sort order
+    __table_args__ = (
+        Index('ix_listings_status_created_at_id', 'status', 'created_at', 'id'),
+        Index('ix_listings_status_price_id', 'status', 'price', 'id'),
+        Index('ix_listings_status_geohash', 'status', 'geohash'),
+    )
+
+    def set_coordinates(self, latitude, longitude):
+        """Set (or clear, with None) the listing's coordinates and derived geohash"""
+        if latitude is None or longitude is None:
+            self.latitude = self.longitude = self.geohash = None
+            return
+        from geo import encode, validate_coordinates
+        latitude, longitude = float(latitude), float(longitude)
+        validate_coordinates(latitude, longitude)
+        self.latitude = latitude
+        self.longitude = longitude
+        self.geohash = encode(latitude, longitude)
     
-    def to_dict(self):
+    def to_dict(self, image_url=None):
+        """
+        Args:
+            image_url: Optional callable mapping each stored image URL to the
+                URL to return (e.g. a thumbnail variant)
+        """
         import json
         # Parse images if stored as JSON string
         images_list = None
@@ -213,6 +245,8 @@ class Listing(Base):
                 images_list = json.loads(self.images)
             except:
                 images_list = []
+            if image_url is not None:
+                images_list = [image_url(url) for url in images_list]
         
         # Parse videos if stored as JSON string
         videos_list = None
@@ -231,6 +265,8 @@ class Listing(Base):
             'location_state': self.location_state,
             'location_area': self.location_area,
             'location_address': self.location_address,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
             'size_value': self.size_value,
             'size_unit': self.size_unit,
             'price': self.price,
@@ -249,6 +285,177 @@ class Listing(Base):
         }
 
 
+class ListingFacetCount(Base):
+    """Pre-aggregated listing counts per facet combination, maintained by triggers on listings"""
+    __tablename__ = 'listing_facet_counts'
+    status = Column(String(50), primary_key=True)
+    listing_type = Column(String(50), primary_key=True)
+    location_state = Column(String(100), primary_key=True)  # '' when the listing has no state
+    price_type = Column(String(50), primary_key=True)
+    price_bucket = Column(Integer, primary_key=True)  # index into facets.PRICE_BUCKET_EDGES
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ListingPriceSketch(Base):
+    """Log-bucketed price histogram bins for active listings, maintained by triggers on listings"""
+    __tablename__ = 'listing_price_sketches'
+    listing_type = Column(String(50), primary_key=True)
+    location_state = Column(String(100), primary_key=True)  # '' when the listing has no state
+    price_type = Column(String(50), primary_key=True)
+    metric = Column(String(60), primary_key=True)  # 'price' or 'per_<size unit>'
+    bin = Column(Integer, primary_key=True)  # see price_stats.value_bin
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)  # Sum of the values in this bin
+
+
+class TableVersion(Base):
+    """Per-table change counter and watermark, bumped by triggers; backs HTTP validators"""
+    __tablename__ = 'table_versions'
+    name = Column(String(64), primary_key=True)
+    epoch = Column(String(16), nullable=False)  # Random per database, so versions never repeat across rebuilds
+    version = Column(Integer, nullable=False, default=0)
+    modified_at = Column(DateTime, nullable=True)  # UTC time of the last bump
+
+
+class MediaBlob(Base):
+    """One stored upload, addressed by content hash, with the number of listings referring to it"""
+    __tablename__ = 'media_blobs'
+    sha256 = Column(String(64), primary_key=True)
+    kind = Column(String(10), nullable=False)  # image, video
+    extension = Column(String(10), nullable=False)
+    content_type = Column(String(100), nullable=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, index=True)
+    derivatives = Column(String(20), default='pending')  # pending, ready, failed, unavailable, none (videos)
+    derivatives_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+
+class UploadSession(Base):
+    """State of a resumable chunked upload (see chunked_upload.py)"""
+    __tablename__ = 'upload_sessions'
+    id = Column(String(36), primary_key=True)  # UUID handed to the client
+    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    purpose = Column(String(30), nullable=False)  # listing_video, listing_image, verification_document
+    filename = Column(String(255), nullable=False)
+    content_type = Column(String(100), nullable=True)
+    total_size = Column(Integer, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    received_bytes = Column(Integer, default=0)  # Contiguous bytes written from the start of the file
+    status = Column(String(20), default='uploading')  # uploading, completed, aborted, expired
+    result_url = Column(String(500), nullable=True)  # Where the finished file was attached
+    created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def to_dict(self):
+        received = self.received_bytes or 0
+        total_chunks = -(-self.total_size // self.chunk_size)
+        return {
+            'id': self.id,
+            'owner_id': self.owner_id,
+            'purpose': self.purpose,
+            'filename': self.filename,
+            'content_type': self.content_type,
+            'total_size': self.total_size,
+            'chunk_size': self.chunk_size,
+            'total_chunks': total_chunks,
+            'received_bytes': received,
+            'next_chunk': received // self.chunk_size if received < self.total_size else None,
+            'status': self.status,
+            'result_url': self.result_url,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+
+class ImportJob(Base):
+    """Progress and error report of a bulk listing import (see bulk_import.py)"""
+    __tablename__ = 'import_jobs'
+    id = Column(String(36), primary_key=True)  # UUID handed to the client for polling
+    owner_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    format = Column(String(10), nullable=False)  # csv, ndjson
+    status = Column(String(20), default='pending')  # pending, running, completed, failed
+    total_rows = Column(Integer, default=0)
+    inserted_rows = Column(Integer, default=0)
+    failed_rows = Column(Integer, default=0)
+    errors = Column(Text, nullable=True)  # JSON array of {row, error}, capped
+    created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    finished_at = Column(DateTime, nullable=True)
+
+    def to_dict(self):
+        import json
+        return {
+            'id': self.id,
+            'owner_id': self.owner_id,
+            'format': self.format,
+            'status': self.status,
+            'total_rows': self.total_rows,
+            'inserted_rows': self.inserted_rows,
+            'failed_rows': self.failed_rows,
+            'errors': json.loads(self.errors) if self.errors else [],
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+
+class SavedSearch(Base):
+    """A user's standing listing query, matched against new and edited listings (see saved_searches.py)"""
+    __tablename__ = 'saved_searches'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    name = Column(String(200), nullable=True)
+    listing_type = Column(String(50), nullable=True)
+    location_state = Column(String(100), nullable=True)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    keywords = Column(String(200), nullable=True)  # Each word must start a word of the listing
+    match_key = Column(String(320), nullable=True, index=True)  # type|state|keyword prefix, see saved_searches.py
+    active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'name': self.name,
+            'listing_type': self.listing_type,
+            'location_state': self.location_state,
+            'min_price': self.min_price,
+            'max_price': self.max_price,
+            'keywords': self.keywords,
+            'active': self.active,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+class SearchNotification(Base):
+    """A listing that matched one of a user's saved searches"""
+    __tablename__ = 'search_notifications'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    saved_search_id = Column(Integer, ForeignKey('saved_searches.id'), nullable=False)
+    listing_id = Column(Integer, ForeignKey('listings.id'), nullable=False)
+    read = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    __table_args__ = (
+        Index('ux_search_notifications_search_listing', 'saved_search_id', 'listing_id', unique=True),
+        Index('ix_search_notifications_user_id_id', 'user_id', 'id'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'saved_search_id': self.saved_search_id,
+            'listing_id': self.listing_id,
+            'read': self.read,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
 class WorkerProfile(Base):
     __tablename__ = 'worker_profiles'
     id = Column(Integer, primary_key=True)
@@ -282,7 +489,7 @@ class WorkerProfile(Base):
     
     # Boost/Visibility
     is_boosted = Column(Boolean, default=False)
-    boost_expiry = Column(DateTime, nullable=True)
+    boost_expiry = Column(DateTime, nullable=True, index=True)
 
     # Metadata
     created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
@@ -290,6 +497,19 @@ class WorkerProfile(Base):
     
     # Relationship
     user = relationship('User', foreign_keys=[user_id], backref='worker_profile')
+
+    # Worker directory: one index per sort order (keyset pagination), with the
+    # common equality filters leading for the default "recommended" order
+    __table_args__ = (
+        Index('ix_worker_profiles_rating_jobs_id', 'rating', 'total_jobs', 'id'),
+        Index('ix_worker_profiles_available_state_rating', 'available', 'location_state', 'rating', 'total_jobs', 'id'),
+        Index('ix_worker_profiles_specialization_rating', 'specialization', 'rating', 'total_jobs', 'id'),
+        Index('ix_worker_profiles_experience_id', 'experience_years', 'id'),
+        Index('ix_worker_profiles_hourly_rate_id', 'hourly_rate', 'id'),
+        Index('ix_worker_profiles_daily_rate_id', 'daily_rate', 'id'),
+        # Incremental refresh of the job matcher (worker_matching.py)
+        Index('ix_worker_profiles_updated_at', 'updated_at'),
+    )
     
     def to_dict(self):
         import json
@@ -320,7 +540,7 @@ class WorkerProfile(Base):
             'id': self.id,
             'user_id': self.user_id,
             'name': self.user.full_name if self.user else "Unknown",
-            'verified': self.user.is_verified if self.user else False,
+            'verified': self.user.verified if self.user else False,
             'specialization': self.specialization,
             'bio': self.bio,
             'experience_years': self.experience_years,
@@ -342,6 +562,48 @@ class WorkerProfile(Base):
         }
 
 
+class WorkerTag(Base):
+    """A worker's skill or certification, normalized (see worker_tags.py) for indexed directory filters"""
+    __tablename__ = 'worker_tags'
+    # Primary key order serves "workers with tag X" lookups
+    kind = Column(String(20), primary_key=True)  # skill, certification
+    tag = Column(String(100), primary_key=True)
+    worker_id = Column(Integer, ForeignKey('worker_profiles.id'), primary_key=True)
+
+    __table_args__ = (
+        Index('ix_worker_tags_worker_id', 'worker_id'),
+    )
+
+
+class WorkerBooking(Base):
+    """A period a worker is booked for by an accepted application or signed contract (see worker_calendar.py)"""
+    __tablename__ = 'worker_bookings'
+    id = Column(Integer, primary_key=True)
+    worker_id = Column(Integer, ForeignKey('worker_profiles.id'), nullable=False)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)  # exclusive
+    source = Column(String(20), nullable=False)  # application, contract
+    source_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+    __table_args__ = (
+        # Overlap checks scan bookings not yet ended; covers the whole check
+        Index('ix_worker_bookings_ends_starts_worker', 'ends_at', 'starts_at', 'worker_id'),
+        Index('ix_worker_bookings_worker_starts', 'worker_id', 'starts_at'),
+        Index('ix_worker_bookings_source', 'source', 'source_id', 'worker_id', unique=True),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'worker_id': self.worker_id,
+            'starts_at': self.starts_at.isoformat() if self.starts_at else None,
+            'ends_at': self.ends_at.isoformat() if self.ends_at else None,
+            'source': self.source,
+            'source_id': self.source_id,
+        }
+
+
 class ProduceCalculation(Base):
     __tablename__ = 'produce_calculations'
     id = Column(Integer, primary_key=True)
@@ -821,16 +1083,34 @@ class Job(Base):
     location = Column(String(200), nullable=True)
     salary_range = Column(String(100), nullable=True)
     status = Column(String(50), default='open')  # open, closed, filled
+
+    # Derived from location and salary_range on write (see job_search.py)
+    location_key = Column(String(100), nullable=True)  # normalized state, the last part of location
+    salary_min = Column(Float, nullable=True)
+    salary_max = Column(Float, nullable=True)
+
+    # Kept in step with job_applications by the apply/accept/decline endpoints
+    applications_count = Column(Integer, default=0)
+    pending_count = Column(Integer, default=0)
     
     # Boost/Visibility
     is_boosted = Column(Boolean, default=False)
-    boost_expiry = Column(DateTime, nullable=True)
+    boost_expiry = Column(DateTime, nullable=True, index=True)
 
     created_at = Column(DateTime, default=lambda: datetime.datetime.now(datetime.timezone.utc))
     
     # Relationship
     employer = relationship('User', backref='jobs_posted')
 
+    __table_args__ = (
+        # GET /api/jobs/list filters and sort orders
+        Index('ix_jobs_created_at_id', 'created_at', 'id'),
+        Index('ix_jobs_status_created_at_id', 'status', 'created_at', 'id'),
+        Index('ix_jobs_location_key_created_at_id', 'location_key', 'created_at', 'id'),
+        Index('ix_jobs_salary_min_id', 'salary_min', 'id'),
+        Index('ix_jobs_salary_max_id', 'salary_max', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -840,6 +1120,10 @@ class Job(Base):
             'requirements': self.requirements,
             'location': self.location,
             'salary_range': self.salary_range,
+            'salary_min': self.salary_min,
+            'salary_max': self.salary_max,
+            'applications_count': self.applications_count or 0,
+            'pending_count': self.pending_count or 0,
             'status': self.status,
             'is_boosted': self.is_boosted,
             'boost_expiry': self.boost_expiry.isoformat() if self.boost_expiry else None,
@@ -862,6 +1146,14 @@ class JobApplication(Base):
     job = relationship('Job', backref='applications')
     applicant = relationship('User', backref='job_applications')
 
+    __table_args__ = (
+        # Applicant review: a job's applications by status, newest first
+        Index('ix_job_applications_job_status_created_at', 'job_id', 'status', 'created_at', 'id'),
+        Index('ix_job_applications_job_created_at', 'job_id', 'created_at', 'id'),
+        # A worker's own recent applications (dashboard)
+        Index('ix_job_applications_applicant_created_at', 'applicant_id', 'created_at', 'id'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -0,0 +1,218 @@
+"""
+Keyset (cursor) pagination helpers
+Cursors are opaque URL-safe tokens that remember the sort key and id of the
+last row served, so the next page is a single indexed range scan instead of
+an OFFSET that gets slower the deeper a client pages.
+"""
+import base64
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded or belongs to another sort order"""
+
+
+def parse_limit(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Parse a ?limit= query parameter, clamping it to [1, maximum].
+
+    Args:
+        raw (str|None): Raw query string value
+
+    Returns:
+        int: Page size to use
+    """
+    if raw in (None, ''):
+        return default
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(sort_by, value, row_id):
+    """
+    Build an opaque cursor for the row that ended the current page.
+
+    Args:
+        sort_by (str): Sort mode the cursor is valid for
+        value: Sort key of the last row (datetime, number or string), or a
+            tuple of them for multi-column sorts
+        row_id (int): Primary key of the last row, used as a tie-breaker
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    if isinstance(value, datetime.datetime):
+        payload = {'s': sort_by, 't': 'dt', 'v': value.isoformat(), 'id': row_id}
+    else:
+        payload = {'s': sort_by, 'v': value, 'id': row_id}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def cursor_sort(token):
+    """Sort mode a cursor was issued for, or None if it cannot be read"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode('ascii'))).get('s')
+    except Exception:
+        return None
+
+
+def decode_cursor(token, sort_by):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (value, row_id)
+
+    Raises:
+        InvalidCursor: If the token is malformed or was issued for a different sort
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if payload.get('s') != sort_by:
+            raise InvalidCursor('cursor does not match sort_by')
+        value = payload['v']
+        if payload.get('t') == 'dt':
+            value = datetime.datetime.fromisoformat(value)
+        if isinstance(value, list):
+            value = tuple(value)
+        if payload['id'] is None:
+            # Start-of-stream marker (see paginate_featured_first)
+            return None, None
+        return value, int(payload['id'])
+    except InvalidCursor:
+        raise
+    except Exception:
+        raise InvalidCursor('invalid cursor')
+
+
+def keyset_filter(key_column, id_column, value, row_id, descending, nullable=False):
+    """
+    Return the WHERE clause selecting rows strictly after (value, row_id).
+
+    The clause is written as an OR of two range predicates so SQLite can
+    answer it from a composite (..., key, id) index. key_column may be a
+    tuple of columns (with a tuple value), compared lexicographically.
+
+    With nullable=True the clause follows SQLite's NULL ordering (first
+    ascending, last descending) so rows with a NULL key are neither lost
+    nor repeated; it is off by default as the extra IS NULL branches can
+    keep SQLite from using the index for NOT NULL columns.
+    """
+    keys = key_column if isinstance(key_column, tuple) else (key_column,)
+    values = value if isinstance(key_column, tuple) else (value,)
+    clause = id_column < row_id if descending else id_column > row_id
+    for key, key_value in reversed(list(zip(keys, values))):
+        clause = _after(key, key_value, clause, descending, nullable)
+    return clause
+
+
+def _after(key_column, value, tie, descending, nullable):
+    """Rows past value on key_column, or equal to it and past it on the remaining keys (tie)"""
+    if nullable and value is None:
+        nulls = and_(key_column.is_(None), tie)
+        return nulls if descending else or_(nulls, key_column.isnot(None))
+    if descending:
+        clause = or_(key_column < value, and_(key_column == value, tie))
+        return or_(clause, key_column.is_(None)) if nullable else clause
+    return or_(key_column > value, and_(key_column == value, tie))
+
+
+def paginate(query, key_column, id_column, descending, sort_by, cursor=None, limit=DEFAULT_PAGE_SIZE, key_attr=None,
+             row_key=None, nullable=False):
+    """
+    Apply keyset ordering, the cursor predicate and LIMIT to a query.
+
+    Args:
+        query: SQLAlchemy query to page through
+        key_column: Column the page is sorted on, or a tuple of columns
+        id_column: Primary key column used as a tie-breaker
+        descending (bool): Sort direction
+        sort_by (str): Sort mode name embedded in the cursor
+        cursor (str|None): Cursor from the previous page
+        limit (int): Page size
+        key_attr (str|None): Attribute name of the sort key on result rows
+            (defaults to key_column.key)
+        row_key (callable|None): Returns (sort key, id) for a result row, for
+            queries whose rows are tuples rather than model instances
+        nullable (bool): The sort key may be NULL (see keyset_filter)
+
+    Returns:
+        tuple: (rows, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_by)
+        if row_id is not None:
+            query = query.filter(keyset_filter(key_column, id_column, value, row_id, descending, nullable))
+
+    keys = key_column if isinstance(key_column, tuple) else (key_column,)
+    if descending:
+        query = query.order_by(*[key.desc() for key in keys], id_column.desc())
+    else:
+        query = query.order_by(*[key.asc() for key in keys], id_column.asc())
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if row_key is not None:
+            value, row_id = row_key(last)
+        elif isinstance(key_column, tuple):
+            value, row_id = tuple(getattr(last, key.key) for key in key_column), last.id
+        else:
+            value, row_id = getattr(last, key_attr or key_column.key), last.id
+        next_cursor = encode_cursor(sort_by, value, row_id)
+    return rows, next_cursor
+
+
+def paginate_featured_first(featured_query, rest_query, key_column, id_column, descending, sort_by,
+                            cursor=None, limit=DEFAULT_PAGE_SIZE, row_key=None, nullable=False):
+    """
+    Page through boosted rows first, then everything else, as one cursor stream.
+
+    Both segments are sorted by the same key; featured_query and rest_query
+    must be disjoint (e.g. boost_expiry > now and its negation). Cursors
+    issued inside the featured segment carry a ':featured' sort suffix.
+
+    Returns:
+        tuple: (rows, next_cursor)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    featured_sort = f'{sort_by}:featured'
+    if cursor and cursor_sort(cursor) != featured_sort:
+        # Already past the featured segment
+        return paginate(rest_query, key_column, id_column, descending, sort_by,
+                        cursor=cursor, limit=limit, row_key=row_key, nullable=nullable)
+
+    rows, next_cursor = paginate(featured_query, key_column, id_column, descending, featured_sort,
+                                 cursor=cursor, limit=limit, row_key=row_key, nullable=nullable)
+    if next_cursor is not None:
+        return rows, next_cursor
+
+    # Featured rows are exhausted; fill the rest of the page from the other segment
+    if len(rows) < limit:
+        rest_rows, next_cursor = paginate(rest_query, key_column, id_column, descending, sort_by,
+                                          limit=limit - len(rows), row_key=row_key, nullable=nullable)
+        return rows + rest_rows, next_cursor
+    if rest_query.limit(1).first() is not None:
+        return rows, encode_cursor(sort_by, None, None)
+    return rows, None
@@ -0,0 +1,107 @@
+"""
+Pre-serialized listing card cache
+Stores each listing's JSON payload as a ready-made text fragment keyed by
+(listing id, updated_at), so unchanged listings skip to_dict(), the json.loads
+of their media columns and the owner lookup on every marketplace request.
+
+Fragments are stored without their closing brace so fast-moving fields that
+do not bump updated_at (the write-behind view count) can be appended fresh:
+
+    fragment + ',"views":12}'
+"""
+import json
+import threading
+from collections import OrderedDict
+
+
+class PayloadCache:
+    """
+    Size-capped LRU cache of serialized payload fragments.
+
+    Entries are versioned: a lookup with a different version (updated_at)
+    is a miss, so edits, status changes and boosts invalidate implicitly.
+    Changes made elsewhere (owner name or verification) are invalidated
+    explicitly with invalidate_owner().
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # id -> (version, fragment, owner_id)
+        self._by_owner = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, entity_id, version):
+        """Return the cached fragment for this version, or None"""
+        with self._lock:
+            entry = self._entries.get(entity_id)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entity_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, entity_id, version, fragment, owner_id=None):
+        """Store a fragment, evicting least recently used entries to stay under max_bytes"""
+        size = len(fragment)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(entity_id)
+            self._entries[entity_id] = (version, fragment, owner_id)
+            self._by_owner.setdefault(owner_id, set()).add(entity_id)
+            self._size += size
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, entity_id):
+        """Drop one entry (e.g. after a delete)"""
+        with self._lock:
+            self._remove(entity_id)
+
+    def invalidate_owner(self, owner_id):
+        """Drop every entry that embeds this owner's details"""
+        with self._lock:
+            for entity_id in list(self._by_owner.get(owner_id, ())):
+                self._remove(entity_id)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_owner.clear()
+            self._size = 0
+
+    @property
+    def size(self):
+        """Bytes currently held"""
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, entity_id):
+        entry = self._entries.pop(entity_id, None)
+        if entry is None:
+            return
+        self._size -= len(entry[1])
+        owned = self._by_owner.get(entry[2])
+        if owned is not None:
+            owned.discard(entity_id)
+            if not owned:
+                del self._by_owner[entry[2]]
+
+
+def listing_fragment(listing):
+    """Serialize a listing (owner loaded) to a fragment without 'views' or the closing brace"""
+    payload = listing.to_dict()
+    payload.pop('views', None)
+    return json.dumps(payload)[:-1]
+
+
+def complete_fragment(fragment, views):
+    """Close a listing fragment with its current view count"""
+    return f'{fragment},"views":{int(views or 0)}}}'
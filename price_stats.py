@@ -0,0 +1,252 @@
+"""
+Marketplace price statistics
+Keeps a mergeable quantile sketch of active listing prices per
+(listing_type, location_state, price_type) in `listing_price_sketches`,
+maintained by triggers on `listings`. /listings/price-stats reads a few
+hundred sketch bins instead of every listing.
+
+The sketch is a log-bucketed histogram (DDSketch style): a value x > 0 lands
+in bin ceil(ln(x) / ln(GAMMA)), so every bin spans a 2 * RELATIVE_ACCURACY
+wide relative range. Each bin stores its count and the sum of its values;
+quantiles are reported as the mean of the bin they fall in, which is within
+RELATIVE_ACCURACY of the true value (exact when the bin holds one listing).
+Unlike a sampling sketch it supports deletes, so edits, sales and
+deletions just move a listing between bins.
+"""
+import math
+
+from sqlalchemy import func
+
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+
+# Bin for prices <= 0 (ln is undefined there)
+ZERO_BIN = -(2 ** 31)
+
+# Metric name for the listing price itself; per-size-unit metrics are 'per_<unit>'
+PRICE_METRIC = 'price'
+
+# Land area units converted to hectares; other units (plots, ...) are kept as-is
+HECTARES_PER_UNIT = {
+    'hectare': 1.0, 'hectares': 1.0, 'ha': 1.0,
+    'acre': 0.40468564224, 'acres': 0.40468564224,
+    'sqm': 0.0001, 'm2': 0.0001, 'square meters': 0.0001, 'square metres': 0.0001,
+}
+
+QUANTILES = (('p10', 0.10), ('p50', 0.50), ('p90', 0.90))
+
+SKETCH_TABLE = 'listing_price_sketches'
+
+
+def _bin_sql(value):
+    return f'(CASE WHEN {value} > 0 THEN CAST(ceil(ln({value}) / {math.log(GAMMA)!r}) AS INTEGER) ELSE {ZERO_BIN} END)'
+
+
+def _unit_sql(row):
+    unit = f"lower(trim({row}.size_unit))"
+    hectare_units = ', '.join(f"'{name}'" for name in HECTARES_PER_UNIT)
+    return f"(CASE WHEN {unit} IN ({hectare_units}) THEN 'per_hectare' ELSE 'per_' || {unit} END)"
+
+
+def _hectares_sql(row):
+    unit = f"lower(trim({row}.size_unit))"
+    whens = ' '.join(f"WHEN '{name}' THEN {factor!r}" for name, factor in HECTARES_PER_UNIT.items())
+    return f"(CASE {unit} {whens} ELSE 1.0 END)"
+
+
+def _metric_rows(row):
+    """(metric, value, condition) SQL triples for one listings row"""
+    per_unit = f'({row}.price / ({row}.size_value * {_hectares_sql(row)}))'
+    return (
+        (f"'{PRICE_METRIC}'", f'{row}.price', f"{row}.status = 'active'"),
+        (_unit_sql(row), per_unit,
+         f"{row}.status = 'active' AND {row}.size_value > 0 AND trim(COALESCE({row}.size_unit, '')) != ''"),
+    )
+
+
+def _group_sql(row):
+    return (f"COALESCE({row}.listing_type, ''), COALESCE({row}.location_state, ''), "
+            f"COALESCE({row}.price_type, '')")
+
+
+def _increment_sql(row):
+    statements = []
+    for metric, value, condition in _metric_rows(row):
+        statements.append(
+            f"INSERT INTO {SKETCH_TABLE} (listing_type, location_state, price_type, metric, bin, count, total) "
+            f"SELECT {_group_sql(row)}, {metric}, {_bin_sql(value)}, 1, {value} WHERE {condition} "
+            f"ON CONFLICT (listing_type, location_state, price_type, metric, bin) "
+            f"DO UPDATE SET count = count + 1, total = total + excluded.total;"
+        )
+    return '\n        '.join(statements)
+
+
+def _decrement_sql(row):
+    statements = []
+    for metric, value, condition in _metric_rows(row):
+        key = (f"listing_type = COALESCE({row}.listing_type, '') "
+               f"AND location_state = COALESCE({row}.location_state, '') "
+               f"AND price_type = COALESCE({row}.price_type, '') "
+               f"AND metric = {metric} AND bin = {_bin_sql(value)}")
+        statements.append(f"UPDATE {SKETCH_TABLE} SET count = count - 1, total = total - {value} "
+                          f"WHERE {key} AND {condition};")
+        statements.append(f"DELETE FROM {SKETCH_TABLE} WHERE {key} AND count <= 0;")
+    return '\n        '.join(statements)
+
+
+_TRIGGERS = {
+    'listing_price_sketch_ai': f"""CREATE TRIGGER listing_price_sketch_ai AFTER INSERT ON listings BEGIN
+        {_increment_sql('new')}
+    END""",
+    'listing_price_sketch_ad': f"""CREATE TRIGGER listing_price_sketch_ad AFTER DELETE ON listings BEGIN
+        {_decrement_sql('old')}
+    END""",
+    'listing_price_sketch_au': f"""CREATE TRIGGER listing_price_sketch_au
+        AFTER UPDATE OF status, listing_type, location_state, price_type, price, size_value, size_unit
+        ON listings BEGIN
+        {_decrement_sql('old')}
+        {_increment_sql('new')}
+    END""",
+}
+
+
+def rebuild_price_sketches(conn):
+    """Recompute every sketch from the listings table inside an open connection/transaction"""
+    conn.exec_driver_sql(f'DELETE FROM {SKETCH_TABLE}')
+    for metric, value, condition in _metric_rows('listings'):
+        conn.exec_driver_sql(
+            f"INSERT INTO {SKETCH_TABLE} (listing_type, location_state, price_type, metric, bin, count, total) "
+            f"SELECT {_group_sql('listings')}, {metric}, {_bin_sql(value)}, COUNT(*), SUM({value}) "
+            f"FROM listings WHERE {condition} GROUP BY 1, 2, 3, 4, 5"
+        )
+
+
+def ensure_price_sketches(engine):
+    """
+    Install the sketch maintenance triggers and backfill the sketch table.
+
+    Returns:
+        bool: True if sketches are maintained incrementally, False if the
+        endpoint has to fall back to reading listing prices (non-SQLite
+        databases, or SQLite builds without the ln()/ceil() math functions)
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+    try:
+        with engine.begin() as conn:
+            # SQLite accepts a trigger calling an unknown function and only fails
+            # when it fires, on every later listings write; probe them first
+            try:
+                conn.exec_driver_sql('SELECT ln(2), ceil(1.5)').fetchall()
+            except Exception:
+                for name in _TRIGGERS:
+                    conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
+                return False
+            for name, ddl in _TRIGGERS.items():
+                conn.exec_driver_sql(f'DROP TRIGGER IF EXISTS {name}')
+                conn.exec_driver_sql(ddl)
+            active = conn.exec_driver_sql("SELECT COUNT(*) FROM listings WHERE status = 'active'").scalar()
+            counted = conn.exec_driver_sql(
+                f"SELECT COALESCE(SUM(count), 0) FROM {SKETCH_TABLE} WHERE metric = '{PRICE_METRIC}'"
+            ).scalar()
+            if active != counted:
+                rebuild_price_sketches(conn)
+        return True
+    except Exception:
+        return False
+
+
+def value_bin(value):
+    """Python twin of the trigger's bin expression"""
+    if value <= 0:
+        return ZERO_BIN
+    return math.ceil(math.log(value) / math.log(GAMMA))
+
+
+def sketch_bins(session, sketch_model, args):
+    """
+    Merged sketch bins for the requested filters.
+
+    Sketches merge by adding bins, so leaving out state or price type just
+    sums over them.
+
+    Returns:
+        dict: {metric: [(bin, count, total), ...]} sorted by bin
+    """
+    query = session.query(sketch_model.metric, sketch_model.bin,
+                          func.sum(sketch_model.count), func.sum(sketch_model.total))
+    for name in ('listing_type', 'location_state', 'price_type'):
+        if args.get(name):
+            query = query.filter(getattr(sketch_model, name) == args.get(name))
+    query = query.group_by(sketch_model.metric, sketch_model.bin).order_by(sketch_model.metric, sketch_model.bin)
+
+    bins = {}
+    for metric, bin_index, count, total in query.all():
+        if count:
+            bins.setdefault(metric, []).append((bin_index, int(count), float(total)))
+    return bins
+
+
+def bins_from_values(rows):
+    """
+    Build sketch bins from (price, size_value, size_unit) rows in Python.
+
+    Used when the database can't maintain sketches; the result has the same
+    shape as sketch_bins().
+    """
+    grouped = {}
+    for price, size_value, size_unit in rows:
+        if price is None:
+            continue
+        values = [(PRICE_METRIC, price)]
+        unit = (size_unit or '').strip().lower()
+        if size_value and size_value > 0 and unit:
+            if unit in HECTARES_PER_UNIT:
+                values.append(('per_hectare', price / (size_value * HECTARES_PER_UNIT[unit])))
+            else:
+                values.append((f'per_{unit}', price / size_value))
+        for metric, value in values:
+            entry = grouped.setdefault(metric, {}).setdefault(value_bin(value), [0, 0.0])
+            entry[0] += 1
+            entry[1] += value
+    return {metric: sorted((b, c, t) for b, (c, t) in by_bin.items()) for metric, by_bin in grouped.items()}
+
+
+def summarize(bins):
+    """count/min/max/mean/p10/p50/p90 from one metric's sorted bins"""
+    count = sum(c for _, c, _ in bins)
+    if not count:
+        return {'count': 0, 'min': None, 'max': None, 'mean': None, 'p10': None, 'p50': None, 'p90': None}
+
+    def representative(entry):
+        return round(entry[2] / entry[1], 2)
+
+    result = {
+        'count': count,
+        'min': representative(bins[0]),
+        'max': representative(bins[-1]),
+        'mean': round(sum(t for _, _, t in bins) / count, 2),
+    }
+    for name, q in QUANTILES:
+        rank = q * (count - 1)
+        seen = 0
+        for entry in bins:
+            seen += entry[1]
+            if seen > rank:
+                result[name] = representative(entry)
+                break
+    return result
+
+
+def format_price_stats(bins, args):
+    """Shape merged bins into the /listings/price-stats response"""
+    result = {name: args.get(name) or None for name in ('listing_type', 'location_state', 'price_type')}
+    result.update(summarize(bins.get(PRICE_METRIC, [])))
+    result['price_per_unit'] = {
+        metric[len('per_'):]: summarize(metric_bins)
+        for metric, metric_bins in sorted(bins.items())
+        if metric.startswith('per_')
+    }
+    result['relative_accuracy'] = RELATIVE_ACCURACY
+    return result
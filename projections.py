@@ -0,0 +1,233 @@
+"""
+Sparse fieldsets for list endpoints
+`?fields=` picks the fields a client needs, either by name
+(`fields=id,title,price`) or through a named projection (`fields=card`),
+and the list is then read with a SELECT of just the columns behind those
+fields. Related rows (listing owner, worker user, job employer) are joined
+only when a requested field reads from them. `fields=full` (or no
+parameter) keeps the regular to_dict() payload.
+"""
+import json
+
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+
+
+# Characters of description returned by the 'summary' field
+SUMMARY_LENGTH = 160
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _json_list(empty):
+    def render(value):
+        if not value:
+            return empty
+        try:
+            return json.loads(value)
+        except ValueError:
+            return []
+    return render
+
+
+def _first_image(value):
+    images = _json_list(None)(value)
+    return images[0] if images else None
+
+
+def _default(fallback):
+    return lambda value: fallback if value is None else value
+
+
+class Field:
+    """One output field: the SQL expression it is read from and how to render it"""
+
+    def __init__(self, select, render=None, relation=None):
+        self.select = select  # callable(model or related alias) -> SQL expression
+        self.render = render or (lambda value: value)
+        self.relation = relation  # Relationship the expression reads from, None for own columns
+
+
+def column(name, render=None):
+    return Field(lambda model: getattr(model, name), render)
+
+
+def related(relation, name, render=None):
+    return Field(lambda model: getattr(model, name), render, relation=relation)
+
+
+def summary(name):
+    return Field(lambda model: func.substr(getattr(model, name), 1, SUMMARY_LENGTH))
+
+
+class FieldSet:
+    """Selectable fields of one model plus its named projections"""
+
+    def __init__(self, fields, projections):
+        self.fields = fields
+        self.projections = projections
+
+    def parse(self, raw):
+        """
+        Resolve a ?fields= value into field names.
+
+        Returns:
+            list|None: Field names in request order ('id' always first), or
+            None for the full payload
+
+        Raises:
+            ValueError: If a name is neither a field nor a projection
+        """
+        if not raw:
+            return None
+        names = ['id']
+        for token in raw.split(','):
+            token = token.strip()
+            if not token:
+                continue
+            if token == 'full':
+                return None
+            if token in self.projections:
+                names.extend(self.projections[token])
+            elif token in self.fields:
+                names.append(token)
+            else:
+                raise ValueError(f'unknown field: {token}')
+        return list(dict.fromkeys(names))
+
+    def select(self, query, model, names, required=()):
+        """
+        Narrow a query on model (filters and joins already applied) to the
+        columns behind the given fields.
+
+        Args:
+            required: Extra model attributes the caller needs on each row
+                (e.g. pagination sort keys); selected but not rendered
+
+        Returns:
+            Query whose rows expose every field and required attribute by name
+        """
+        aliases = {}
+        columns = []
+        for name in names:
+            field = self.fields[name]
+            source = model
+            if field.relation:
+                if field.relation not in aliases:
+                    target = getattr(model, field.relation).property.mapper.class_
+                    aliases[field.relation] = aliased(target)
+                source = aliases[field.relation]
+            columns.append(field.select(source).label(name))
+        for attr in required:
+            if attr not in names:
+                columns.append(getattr(model, attr).label(attr))
+
+        query = query.with_entities(*columns)
+        for relation, alias in aliases.items():
+            query = query.outerjoin(alias, getattr(model, relation))
+        return query
+
+    def render(self, names, rows):
+        """Rows from select() as a list of dicts holding just the requested fields"""
+        renderers = [(name, self.fields[name].render) for name in names]
+        return [{name: render(getattr(row, name)) for name, render in renderers} for row in rows]
+
+
+LISTING_FIELDS = FieldSet(
+    fields={
+        'id': column('id'),
+        'owner_id': column('owner_id'),
+        'listing_type': column('listing_type'),
+        'title': column('title'),
+        'description': column('description'),
+        'summary': summary('description'),
+        'location_state': column('location_state'),
+        'location_area': column('location_area'),
+        'location_address': column('location_address'),
+        'latitude': column('latitude'),
+        'longitude': column('longitude'),
+        'size_value': column('size_value'),
+        'size_unit': column('size_unit'),
+        'price': column('price'),
+        'price_type': column('price_type'),
+        'images': column('images', _json_list(None)),
+        'cover_image': column('images', _first_image),
+        'videos': column('videos', _json_list(None)),
+        'model_3d_url': column('model_3d_url'),
+        'status': column('status'),
+        'featured': column('featured'),
+        'boost_expiry': column('boost_expiry', _isoformat),
+        'created_at': column('created_at', _isoformat),
+        'updated_at': column('updated_at', _isoformat),
+        'views': column('views'),
+        'owner_name': related('owner', 'full_name', _default('Unknown')),
+        'owner_verified': related('owner', 'verified', _default(False)),
+    },
+    projections={
+        'card': ('owner_id', 'listing_type', 'title', 'summary', 'location_state', 'location_area',
+                 'size_value', 'size_unit', 'price', 'price_type', 'cover_image', 'status', 'featured',
+                 'boost_expiry', 'created_at', 'owner_name', 'owner_verified'),
+    },
+)
+
+WORKER_FIELDS = FieldSet(
+    fields={
+        'id': column('id'),
+        'user_id': column('user_id'),
+        'name': related('user', 'full_name', _default('Unknown')),
+        'verified': related('user', 'verified', _default(False)),
+        'specialization': column('specialization'),
+        'bio': column('bio'),
+        'summary': summary('bio'),
+        'experience_years': column('experience_years'),
+        'skills': column('skills', _json_list([])),
+        'available': column('available'),
+        'hourly_rate': column('hourly_rate'),
+        'daily_rate': column('daily_rate'),
+        'location_state': column('location_state'),
+        'location_area': column('location_area'),
+        'willing_to_travel': column('willing_to_travel'),
+        'certifications': column('certifications', _json_list([])),
+        'portfolio_images': column('portfolio_images', _json_list([])),
+        'rating': column('rating'),
+        'total_jobs': column('total_jobs'),
+        'is_boosted': column('is_boosted'),
+        'boost_expiry': column('boost_expiry', _isoformat),
+        'created_at': column('created_at', _isoformat),
+        'updated_at': column('updated_at', _isoformat),
+    },
+    projections={
+        'card': ('user_id', 'name', 'verified', 'specialization', 'summary', 'skills', 'available',
+                 'hourly_rate', 'daily_rate', 'location_state', 'location_area', 'rating', 'total_jobs',
+                 'is_boosted', 'boost_expiry'),
+    },
+)
+
+JOB_FIELDS = FieldSet(
+    fields={
+        'id': column('id'),
+        'employer_id': column('employer_id'),
+        'title': column('title'),
+        'description': column('description'),
+        'summary': summary('description'),
+        'requirements': column('requirements'),
+        'location': column('location'),
+        'salary_range': column('salary_range'),
+        'salary_min': column('salary_min'),
+        'salary_max': column('salary_max'),
+        'applications_count': column('applications_count', _default(0)),
+        'pending_count': column('pending_count', _default(0)),
+        'status': column('status'),
+        'is_boosted': column('is_boosted'),
+        'boost_expiry': column('boost_expiry', _isoformat),
+        'created_at': column('created_at', _isoformat),
+        'employer_name': related('employer', 'full_name', _default('Unknown')),
+        'employer_verified': related('employer', 'verified', _default(False)),
+    },
+    projections={
+        'card': ('employer_id', 'title', 'summary', 'location', 'salary_range', 'salary_min', 'salary_max', 'status',
+                 'is_boosted', 'boost_expiry', 'created_at', 'employer_name', 'employer_verified'),
+    },
+)
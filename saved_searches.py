@@ -0,0 +1,183 @@
+"""
+Saved searches with incremental matching
+A saved search is a standing /listings query (listing type, state, price
+range, keywords). Instead of users re-polling /listings, each listing is
+matched against the saved searches when it is created or edited and every
+match becomes a notification.
+
+Keywords match like /listings?q=: each keyword must be a prefix of a word
+of the listing ("irrig kadu" matches "Irrigated plot in Kaduna"), case- and
+diacritic-insensitively.
+
+Each search is compiled into one key of an inverted index, the indexed
+`saved_searches.match_key` column:
+
+    <listing_type or *>|<state or *>|<first PREFIX_LENGTH letters of a keyword, or *>
+
+A listing expands into every key that can describe it (its type or *, its
+state or *, the first one to PREFIX_LENGTH letters of each of its words or
+*), so a single indexed IN lookup returns just the searches whose type,
+state and indexed keyword prefix all match, however many searches exist (a
+long description is looked up in batches of KEY_BATCH keys, under SQLite's
+bound-parameter limit). The candidates' price range and full keywords are
+then checked on those few rows. The keyword indexed is the search's longest
+one, as longer words tend to be rarer and give fewer candidates.
+"""
+import bisect
+import re
+import unicodedata
+
+from sqlalchemy import or_
+
+
+WILDCARD = '*'
+
+# Letters of a keyword kept in its index key; keywords match as word prefixes
+PREFIX_LENGTH = 3
+
+# Keys (or ids) bound per IN lookup; SQLite builds before 3.32 allow 999 parameters
+KEY_BATCH = 500
+
+
+def tokenize(text):
+    """Lowercased words of a text without diacritics, as used for keywords on both sides"""
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.findall(r'\w+', text, flags=re.UNICODE)
+
+
+def _normalize(value):
+    value = (value or '').strip().lower()
+    return value or None
+
+
+def match_key(listing_type=None, location_state=None, keywords=None):
+    """Index key of a saved search"""
+    words = sorted(set(tokenize(keywords)), key=lambda word: (-len(word), word))
+    return '|'.join((_normalize(listing_type) or WILDCARD, _normalize(location_state) or WILDCARD,
+                     words[0][:PREFIX_LENGTH] if words else WILDCARD))
+
+
+def listing_keys(listing, words):
+    """Every saved-search key a listing with the given words can satisfy"""
+    types = {WILDCARD, _normalize(listing.listing_type) or WILDCARD}
+    states = {WILDCARD, _normalize(listing.location_state) or WILDCARD}
+    prefixes = {word[:size] for word in words for size in range(1, PREFIX_LENGTH + 1)} | {WILDCARD}
+    return sorted(f'{t}|{s}|{p}' for t in types for s in states for p in prefixes)
+
+
+def has_prefixes(keywords, words):
+    """Whether every keyword starts some word of a sorted word list"""
+    for keyword in keywords:
+        at = bisect.bisect_left(words, keyword)
+        if at == len(words) or not words[at].startswith(keyword):
+            return False
+    return True
+
+
+def _batches(values, size=KEY_BATCH):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def listing_words(listing):
+    """Words a search's keywords are matched against"""
+    return set(tokenize(' '.join(filter(None, (listing.title, listing.description,
+                                                listing.location_state, listing.location_area)))))
+
+
+class SearchMatcher:
+    """
+    Indexes saved searches and matches listings against them.
+
+        matcher = SearchMatcher(SavedSearch, SearchNotification)
+        matcher.index(session, search)        # after creating a search
+        matcher.notify(session, listing)      # after a listing is created/edited
+        matcher.notify_many(session, listings)  # after a batch of listings is imported
+
+    Both work in the caller's session and leave committing to it.
+    """
+
+    def __init__(self, search_model, notification_model):
+        self.search_model = search_model
+        self.notification_model = notification_model
+
+    def index(self, session, search):
+        """Compile a saved search's index key (call again after editing it)"""
+        search.match_key = match_key(search.listing_type, search.location_state, search.keywords)
+
+    def remove(self, session, search):
+        """Delete a saved search with its notifications"""
+        session.query(self.notification_model).filter_by(saved_search_id=search.id).delete(synchronize_session=False)
+        session.delete(search)
+
+    def match(self, session, listing):
+        """Active saved searches of other users that the listing satisfies"""
+        return self.match_many(session, [listing])[0]
+
+    def match_many(self, session, listings):
+        """
+        Match several listings in one pass, e.g. a batch of imported rows.
+
+        The keys of all the listings are looked up together, so a batch costs
+        about as many queries as its largest listing.
+
+        Returns:
+            list: For each listing, the saved searches it satisfies
+        """
+        search_model = self.search_model
+        words = [sorted(listing_words(listing)) for listing in listings]
+        keys = [set(listing_keys(listing, found)) for listing, found in zip(listings, words)]
+        prices = [listing.price for listing in listings]
+        owners = {listing.owner_id for listing in listings}
+        filters = [search_model.active == True,  # noqa: E712
+                   or_(search_model.min_price.is_(None), search_model.min_price <= max(prices, default=0)),
+                   or_(search_model.max_price.is_(None), search_model.max_price >= min(prices, default=0))]
+        if len(owners) == 1:
+            filters.append(search_model.user_id != next(iter(owners)))
+        candidates = []
+        for batch in _batches(sorted(set().union(*keys))):
+            candidates.extend(session.query(search_model).filter(search_model.match_key.in_(batch), *filters))
+
+        matches = []
+        for listing, found, allowed in zip(listings, words, keys):
+            price = listing.price
+            # The key covers the start of one keyword; every keyword must start a word
+            matches.append([search for search in candidates
+                            if search.match_key in allowed
+                            and search.user_id != listing.owner_id
+                            and (search.min_price is None or search.min_price <= price)
+                            and (search.max_price is None or search.max_price >= price)
+                            and has_prefixes(tokenize(search.keywords), found)])
+        return matches
+
+    def notify(self, session, listing):
+        """
+        Record a notification for each saved search the listing newly matches.
+
+        A listing edited back and forth notifies each search only once.
+
+        Returns:
+            list: The new notifications
+        """
+        return self.notify_many(session, [listing])
+
+    def notify_many(self, session, listings):
+        """Like notify(), for a batch of listings matched in one pass"""
+        listings = [listing for listing in listings if listing.status == 'active']
+        if not listings:
+            return []
+        matched = [(listing, search) for listing, searches in zip(listings, self.match_many(session, listings))
+                   for search in searches]
+        if not matched:
+            return []
+        notification_model = self.notification_model
+        notified = set()
+        for listing_ids in _batches({listing.id for listing, _ in matched}):
+            notified.update(session.query(notification_model.listing_id, notification_model.saved_search_id)
+                            .filter(notification_model.listing_id.in_(listing_ids)))
+        created = [notification_model(saved_search_id=search.id, user_id=search.user_id, listing_id=listing.id)
+                   for listing, search in matched if (listing.id, search.id) not in notified]
+        session.add_all(created)
+        return created
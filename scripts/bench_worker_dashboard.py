@@ -0,0 +1,158 @@
+"""
+Benchmark /api/worker-dashboard-stats: queries and latency per request for
+the previous per-application lookups, the joined query (cache cold) and a
+cached hit. Runs against a throwaway SQLite database:
+
+    python scripts/bench_worker_dashboard.py [--workers 500] [--applications 40] [--runs 200]
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config  # noqa: E402
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--workers', type=int, default=500)
+parser.add_argument('--jobs', type=int, default=2000)
+parser.add_argument('--applications', type=int, default=40, help='applications per worker')
+parser.add_argument('--runs', type=int, default=200)
+args = parser.parse_args()
+
+db_fd, db_path = tempfile.mkstemp(suffix='.db')
+config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+
+from flask import jsonify  # noqa: E402
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app import create_app  # noqa: E402
+from models import Job, JobApplication, User, Wallet, WorkerProfile  # noqa: E402
+
+app = create_app()
+app.testing = True
+for limiter in app.extensions.get('limiter', ()):
+    limiter.enabled = False  # every request comes from one address
+client = app.test_client()
+engine = create_engine(config.SQLALCHEMY_DATABASE_URI)
+Session = sessionmaker(bind=engine)
+
+print(f'Seeding {args.workers} workers, {args.jobs} jobs, {args.workers * args.applications} applications...')
+session = Session()
+now = datetime.datetime.now(datetime.timezone.utc)
+employer = User(full_name='Bench Employer', email='bench.employer@test.com', password_hash='x', account_type='farmer')
+session.add(employer)
+session.flush()
+session.bulk_save_objects([
+    Job(employer_id=employer.id, title=f'Job {i}', description='Farm work', location=f'Town {i % 37}, Kano State')
+    for i in range(args.jobs)
+])
+users = [User(full_name=f'Worker {i}', email=f'bench.worker{i}@test.com', password_hash='x', account_type='worker')
+         for i in range(args.workers)]
+session.add_all(users)
+session.flush()
+job_ids = [job_id for job_id, in session.query(Job.id)]
+session.bulk_save_objects([WorkerProfile(user_id=u.id, specialization='labor', total_jobs=i % 50, rating=40)
+                           for i, u in enumerate(users)])
+session.bulk_save_objects([Wallet(user_id=u.id, balance=1000.0 + i) for i, u in enumerate(users)])
+session.bulk_save_objects([
+    JobApplication(job_id=job_ids[(i * 7919 + n) % len(job_ids)], applicant_id=u.id,
+                   created_at=now - datetime.timedelta(minutes=n))
+    for i, u in enumerate(users) for n in range(args.applications)
+])
+session.commit()
+user_ids = [u.id for u in users]
+session.close()
+
+
+def legacy_stats(user_id):
+    """The endpoint before the joined query: profile, wallet, applications, then one job lookup each"""
+    session = Session()
+    try:
+        worker_profile = session.query(WorkerProfile).filter_by(user_id=user_id).first()
+        wallet = session.query(Wallet).filter_by(user_id=user_id).first()
+        recent_applications = session.query(JobApplication).filter_by(applicant_id=user_id)\
+            .order_by(JobApplication.created_at.desc()).limit(5).all()
+        applications_data = []
+        for appn in recent_applications:
+            job = session.get(Job, appn.job_id)
+            applications_data.append({
+                'id': appn.id,
+                'job_title': job.title if job else 'Unknown Job',
+                'status': appn.status,
+                'date': appn.created_at.isoformat() if appn.created_at else None,
+                'location': job.location if job else ''
+            })
+        return {
+            'jobsCompleted': worker_profile.total_jobs if worker_profile else 0,
+            'totalEarnings': wallet.balance if wallet else 0.0,
+            'rating': worker_profile.rating if worker_profile else 0.0,
+            'recentApplications': applications_data
+        }
+    finally:
+        session.close()
+
+
+# Served through Flask as well, so both paths pay the same request overhead
+app.add_url_rule('/bench/legacy-dashboard-stats/<int:user_id>', 'bench_legacy_dashboard_stats',
+                 lambda user_id: jsonify(legacy_stats(user_id)))
+
+
+def get(url):
+    response = client.get(url)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+
+def before(user_id):
+    return get(f'/bench/legacy-dashboard-stats/{user_id}')
+
+
+def endpoint(user_id):
+    return get(f'/api/worker-dashboard-stats?user_id={user_id}')
+
+
+def cold(user_id):
+    app.dashboard_stats.clear()
+    return endpoint(user_id)
+
+
+queries = [0]
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def count(conn, cursor, statement, *rest):
+    queries[0] += 1
+
+
+def measure(name, fn):
+    timings = []
+    queries[0] = 0
+    for run in range(args.runs):
+        user_id = user_ids[run % len(user_ids)]
+        start = time.perf_counter()
+        fn(user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    print(f'{name:<22} {queries[0] / args.runs:>8.1f} {statistics.median(timings):>10.3f} '
+          f'{timings[int(len(timings) * 0.95) - 1]:>10.3f}')
+
+
+for user_id in user_ids[:20]:
+    assert cold(user_id) == before(user_id)
+
+print(f'{"":<22} {"queries":>8} {"p50 ms":>10} {"p95 ms":>10}')
+measure('before (N+1 lookups)', before)
+measure('joined query, cold', cold)
+for user_id in user_ids:
+    endpoint(user_id)
+measure('cached', endpoint)
+
+os.close(db_fd)
+os.unlink(db_path)
@@ -0,0 +1,102 @@
+"""
+Marketplace full-text search
+Maintains an SQLite FTS5 index that mirrors the searchable listing columns.
+The index is an external-content table over `listings`, kept in sync by
+triggers, so every write path (create, update, owner delete, admin delete)
+updates it in the same transaction as the listing row itself.
+"""
+import re
+
+from sqlalchemy import Float, Integer, text
+
+
+LISTINGS_FTS_TABLE = 'listings_fts'
+
+# bm25() column weights, in index column order: title, description, state, area
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 4.0)
+
+_FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {LISTINGS_FTS_TABLE} USING fts5(
+        title, description, location_state, location_area,
+        content='listings', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS listings_fts_ai AFTER INSERT ON listings BEGIN
+        INSERT INTO {LISTINGS_FTS_TABLE}(rowid, title, description, location_state, location_area)
+        VALUES (new.id, new.title, new.description, new.location_state, new.location_area);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS listings_fts_ad AFTER DELETE ON listings BEGIN
+        INSERT INTO {LISTINGS_FTS_TABLE}({LISTINGS_FTS_TABLE}, rowid, title, description, location_state, location_area)
+        VALUES ('delete', old.id, old.title, old.description, old.location_state, old.location_area);
+    END""",
+    # Only re-index when a searchable column changes, not on view counts or boosts
+    f"""CREATE TRIGGER IF NOT EXISTS listings_fts_au
+        AFTER UPDATE OF title, description, location_state, location_area ON listings BEGIN
+        INSERT INTO {LISTINGS_FTS_TABLE}({LISTINGS_FTS_TABLE}, rowid, title, description, location_state, location_area)
+        VALUES ('delete', old.id, old.title, old.description, old.location_state, old.location_area);
+        INSERT INTO {LISTINGS_FTS_TABLE}(rowid, title, description, location_state, location_area)
+        VALUES (new.id, new.title, new.description, new.location_state, new.location_area);
+    END""",
+]
+
+
+def ensure_listing_fts(engine):
+    """
+    Create the listings FTS5 table and its sync triggers if they are missing.
+
+    A freshly created index is rebuilt from the existing listings rows.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        bool: True if full-text search is available, False if the database
+        is not SQLite or was built without FTS5
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+    try:
+        with engine.begin() as conn:
+            existed = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (LISTINGS_FTS_TABLE,)
+            ).first() is not None
+            for statement in _FTS_DDL:
+                conn.exec_driver_sql(statement)
+            if not existed:
+                conn.exec_driver_sql(
+                    f"INSERT INTO {LISTINGS_FTS_TABLE}({LISTINGS_FTS_TABLE}) VALUES ('rebuild')"
+                )
+        return True
+    except Exception:
+        return False
+
+
+def build_match_query(raw):
+    """
+    Turn free text from ?q= into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term and terms are AND'ed, so
+    "kadu farm" matches "Kaduna farmland". Quoting keeps FTS5 operators
+    typed by users from being interpreted.
+
+    Returns:
+        str|None: MATCH expression, or None if the input has no searchable words
+    """
+    terms = re.findall(r'\w+', raw or '', flags=re.UNICODE)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def listing_match_subquery(match):
+    """
+    Subquery of (listing_id, rank) for listings matching an FTS5 expression.
+
+    Lower rank is a better match (SQLite's bm25() returns negative scores).
+    """
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    stmt = text(
+        f"SELECT rowid AS listing_id, bm25({LISTINGS_FTS_TABLE}, {weights}) AS rank "
+        f"FROM {LISTINGS_FTS_TABLE} WHERE {LISTINGS_FTS_TABLE} MATCH :match"
+    ).bindparams(match=match).columns(listing_id=Integer, rank=Float)
+    return stmt.subquery('listing_matches')
@@ -0,0 +1,497 @@
+"""
+Search-box suggestions
+One prefix trie per scope (workers, listings, jobs) over the phrases people
+type into the search boxes: worker names, specializations, states and
+areas, listing titles, job titles and locations. Every trie node caches the
+top-k phrases of its subtree, so a keystroke is a walk down the typed prefix
+and a slice of that cache - no database query and no subtree traversal.
+
+A phrase is reachable from the start of each of its first few words, so
+"oke" suggests "Ada Okeke" and "kad" suggests "Kaduna North". Popularity
+is the sum of the weights of the records carrying the phrase (100 per record,
+more for viewed listings and experienced workers), so a state with five
+hundred workers outranks a single name.
+
+The tries are built at startup on a background thread and kept current by
+the write endpoints passing each changed record to update(); changed
+phrases re-rank only the nodes on their own paths. A periodic full rebuild
+picks up writes made outside the API (imports, migrations). Each scope's
+trie gets an even share of a memory budget: when it is full the least
+popular phrases are left out until they outrank what is indexed.
+"""
+import heapq
+import logging
+import math
+import re
+import threading
+
+from sqlalchemy import or_, select
+
+
+logger = logging.getLogger(__name__)
+
+
+SCOPES = ('workers', 'listings', 'jobs')
+
+DEFAULT_SUGGESTIONS = 10
+
+# A phrase is indexed from the start of at most this many of its words
+MAX_WORD_STARTS = 4
+
+# Keys are cut here; longer prefixes share the node of their first MAX_KEY_LENGTH characters
+MAX_KEY_LENGTH = 40
+
+# Approximate CPython footprint of a trie node and of a phrase entry
+NODE_BYTES = 350
+PHRASE_BYTES = 500
+
+
+def normalize(text):
+    """Lowercased words joined by single spaces, the form phrases and prefixes are matched in"""
+    return ' '.join(re.findall(r'\w+', (text or '').lower(), flags=re.UNICODE))
+
+
+def _keys(key):
+    """Trie keys of a normalized phrase: the phrase from the start of each of its first words"""
+    keys = [key[:MAX_KEY_LENGTH]]
+    start = 0
+    for _ in range(MAX_WORD_STARTS - 1):
+        start = key.find(' ', start) + 1
+        if not start:
+            break
+        keys.append(key[start:start + MAX_KEY_LENGTH])
+    return list(dict.fromkeys(keys))
+
+
+# ---------- record -> phrases ----------
+
+def _phrases(*pairs):
+    return tuple((kind, ' '.join(text.split())) for kind, text in pairs if text and text.strip())
+
+
+def worker_entry(profile, full_name):
+    """(phrases, weight) a worker profile contributes to the workers scope"""
+    weight = 100 + round(100 * math.log10(1 + (profile.total_jobs or 0)))
+    return _phrases(('name', full_name), ('specialization', profile.specialization),
+                    ('state', profile.location_state), ('area', profile.location_area)), weight
+
+
+def listing_entry(listing):
+    """(phrases, weight) an active listing contributes to the listings scope, None otherwise"""
+    if listing.status != 'active':
+        return None
+    weight = 100 + round(100 * math.log10(1 + (listing.views or 0)))
+    return _phrases(('title', listing.title), ('state', listing.location_state),
+                    ('area', listing.location_area)), weight
+
+
+def job_entry(job):
+    """(phrases, weight) an open job contributes to the jobs scope, None otherwise"""
+    if (job.status or 'open') != 'open':
+        return None
+    return _phrases(('title', job.title), ('location', job.location)), 100
+
+
+# ---------- trie ----------
+
+class _Node:
+    __slots__ = ('label', 'children', 'phrases', 'top')
+
+    def __init__(self, label=''):
+        self.label = label   # edge from the parent; chains of single children are merged into one label
+        self.children = {}   # first character of a child's label -> child
+        self.phrases = ()    # phrase ids whose key ends here
+        self.top = ()        # best k phrase ids of the subtree, best first
+
+
+def _common(label, key, start):
+    """Length of the common prefix of label and key[start:]"""
+    n = 0
+    for a, b in zip(label, key[start:start + len(label)]):
+        if a != b:
+            break
+        n += 1
+    return n
+
+
+class PrefixTrie:
+    """
+    Weighted phrases with top-k-by-weight prefix lookup, as a radix trie.
+
+    Phrases are identified by (kind, normalized text); set() changes a
+    phrase's weight (0 removes it) and re-ranks only the nodes on its paths.
+    """
+
+    def __init__(self, k=DEFAULT_SUGGESTIONS, max_bytes=None):
+        self.k = k
+        self.max_bytes = max_bytes
+        self.root = _Node()
+        self.nodes = 1
+        self._ids = {}        # (kind, key) -> phrase id
+        self._phrases = {}    # phrase id -> [text, kind, weight, key]
+        self._ranks = {}      # phrase id -> sort key, most popular first
+        self._next_id = 0
+        self._smallest = []   # (weight, id) heap, stale entries skipped
+
+    @property
+    def nbytes(self):
+        return self.nodes * NODE_BYTES + len(self._phrases) * PHRASE_BYTES
+
+    def __len__(self):
+        return len(self._phrases)
+
+    def suggest(self, prefix, limit=None):
+        """[(text, kind, weight)] for the most popular phrases under a normalized prefix"""
+        prefix = prefix[:MAX_KEY_LENGTH]
+        node = self.root
+        i = 0
+        while i < len(prefix):
+            node = node.children.get(prefix[i])
+            # The prefix may end part way along an edge
+            if node is None or not node.label.startswith(prefix[i:i + len(node.label)]):
+                return []
+            i += len(node.label)
+        return [tuple(self._phrases[pid][:3]) for pid in node.top[:limit or self.k]]
+
+    def set(self, kind, text, weight):
+        """
+        Give a phrase a weight, adding it if new and removing it at 0.
+
+        Returns:
+            bool: Whether the phrase is in the trie afterwards (a new phrase
+            is refused when the budget is full of more popular ones)
+        """
+        key = normalize(text)
+        if not key:
+            return False
+        pid = self._ids.get((kind, key))
+        if weight <= 0:
+            if pid is not None:
+                self._remove(pid)
+            return False
+        if pid is None:
+            if not self._make_room(weight):
+                return False
+            pid = self._add(kind, text, key, weight)
+            for trie_key in _keys(key):
+                self._attach(self._path(trie_key, create=True)[-1], pid)
+            self._settle(key, pid)
+        else:
+            dropped = weight < self._phrases[pid][2]
+            self._phrases[pid][2] = weight
+            self._ranks[pid] = (-weight, key, kind)
+            self._settle(key, pid, dropped=dropped)
+        heapq.heappush(self._smallest, (weight, pid))
+        return True
+
+    def load(self, weights):
+        """
+        Bulk-load {(kind, text): weight} into an empty trie, most popular first
+        while the budget lasts, ranking every node once at the end.
+        """
+        for (kind, text), weight in sorted(weights.items(), key=lambda item: -item[1]):
+            key = normalize(text)
+            if not key or weight <= 0 or (kind, key) in self._ids:
+                continue
+            if self.max_bytes is not None and self.nbytes >= self.max_bytes:
+                break
+            pid = self._add(kind, text, key, weight)
+            self._smallest.append((weight, pid))
+            for trie_key in _keys(key):
+                self._attach(self._path(trie_key, create=True)[-1], pid)
+        heapq.heapify(self._smallest)
+        # Iterative post-order: rank children before their parent
+        stack = [(self.root, False)]
+        while stack:
+            node, children_ranked = stack.pop()
+            if children_ranked:
+                self._rerank(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+
+    def _add(self, kind, text, key, weight):
+        pid = self._next_id
+        self._next_id += 1
+        self._ids[(kind, key)] = pid
+        self._phrases[pid] = [text, kind, weight, key]
+        self._ranks[pid] = (-weight, key, kind)
+        return pid
+
+    @staticmethod
+    def _attach(node, pid):
+        if pid not in node.phrases:
+            node.phrases += (pid,)
+
+    def _path(self, key, create=False):
+        """Nodes from the root to the one ending at key (splitting edges if create), or None"""
+        node = self.root
+        path = [node]
+        i = 0
+        while i < len(key):
+            child = node.children.get(key[i])
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[key[i]] = _Node(key[i:])
+                self.nodes += 1
+                path.append(child)
+                return path
+            common = _common(child.label, key, i)
+            if common < len(child.label):
+                if not create:
+                    return None
+                # Split the edge; the new middle node covers the same subtree
+                middle = _Node(child.label[:common])
+                middle.top = child.top
+                child.label = child.label[common:]
+                middle.children[child.label[0]] = child
+                node.children[key[i]] = middle
+                self.nodes += 1
+                child = middle
+            node = child
+            path.append(node)
+            i += common
+        return path
+
+    def _rerank(self, node):
+        candidates = set(node.phrases)
+        for child in node.children.values():
+            candidates.update(child.top)
+        # A phrase being removed can linger in the tops along its other keys' paths
+        live = [pid for pid in candidates if pid in self._ranks]
+        node.top = tuple(heapq.nsmallest(self.k, live, key=self._ranks.__getitem__))
+
+    def _trace(self, key):
+        """Nodes from the root whose whole edge lies along key, deepest last"""
+        node = self.root
+        path = [node]
+        i = 0
+        while i < len(key):
+            node = node.children.get(key[i])
+            if node is None or key[i:i + len(node.label)] != node.label:
+                break
+            path.append(node)
+            i += len(node.label)
+        return path
+
+    def _settle(self, key, pid, dropped=False):
+        """
+        Re-rank the nodes on the phrase's key paths whose top-k it is, was or
+        should be in.
+
+        The paths share ancestors, so their nodes are gathered first and each
+        re-ranked once, deepest first, after every child below it. When the
+        phrase dropped (weight lowered or removed) all of them are re-ranked:
+        a node's top may be out of date even where the phrase is no longer in
+        it, since its children have just changed.
+        """
+        nodes = {}
+        for trie_key in _keys(key):
+            for depth, node in enumerate(self._trace(trie_key)):
+                nodes[id(node)] = (depth, node)
+        rank = self._ranks.get(pid)
+        for _, node in sorted(nodes.values(), key=lambda entry: -entry[0]):
+            if dropped or pid in node.top or (rank is not None and (
+                    len(node.top) < self.k or rank < self._ranks[node.top[-1]])):
+                self._rerank(node)
+
+    def _remove(self, pid):
+        text, kind, weight, key = self._phrases.pop(pid)
+        del self._ranks[pid]
+        del self._ids[(kind, key)]
+        for trie_key in _keys(key):
+            path = self._path(trie_key)
+            if path is None:
+                continue
+            path[-1].phrases = tuple(other for other in path[-1].phrases if other != pid)
+            # Drop the node if it is now empty, and merge single children back into their parent's edge
+            for depth in range(len(path) - 1, 0, -1):
+                node, parent = path[depth], path[depth - 1]
+                if node.phrases:
+                    break
+                if not node.children:
+                    del parent.children[node.label[0]]
+                    self.nodes -= 1
+                    path.pop()
+                    continue
+                if len(node.children) == 1:
+                    (child,) = node.children.values()
+                    child.label = node.label + child.label
+                    parent.children[child.label[0]] = child
+                    self.nodes -= 1
+                    path[depth:] = [child]
+                break
+        self._settle(key, pid, dropped=True)
+
+    def _make_room(self, weight):
+        """Evict less popular phrases until a new one fits; False if it doesn't deserve the room"""
+        if self.max_bytes is None:
+            return True
+        # Each key of a new phrase adds at most a leaf and an edge split
+        needed = PHRASE_BYTES + 2 * MAX_WORD_STARTS * NODE_BYTES
+        while self.nbytes + needed > self.max_bytes:
+            while self._smallest and self._phrases.get(self._smallest[0][1], (0, 0, None))[2] != self._smallest[0][0]:
+                heapq.heappop(self._smallest)
+            if not self._smallest or self._smallest[0][0] >= weight:
+                return False
+            self._remove(heapq.heappop(self._smallest)[1])
+        return True
+
+
+# ---------- scopes ----------
+
+class _Scope:
+    """A scope's trie plus the phrases and weight each record contributes to it"""
+
+    def __init__(self, k, max_bytes):
+        self.trie = PrefixTrie(k, max_bytes)
+        self.records = {}   # record id -> (phrases, weight)
+        self.weights = {}   # (kind, normalized text) -> [total weight across records, display text]
+
+    def load(self, entries):
+        for record_id, entry in entries:
+            if entry is not None:
+                self.records[record_id] = entry
+                phrases, weight = entry
+                for kind, text in phrases:
+                    self.weights.setdefault((kind, normalize(text)), [0, text])[0] += weight
+        self.trie.load({(kind, text): weight for (kind, _), (weight, text) in self.weights.items()})
+
+    def update(self, record_id, entry):
+        old_phrases, old_weight = self.records.pop(record_id, ((), 0))
+        new_phrases, new_weight = entry if entry is not None else ((), 0)
+        if entry is not None:
+            self.records[record_id] = entry
+        changes = {}
+        for kind, text in old_phrases:
+            changes[(kind, normalize(text))] = changes.get((kind, normalize(text)), 0) - old_weight
+        for kind, text in new_phrases:
+            key = (kind, normalize(text))
+            changes[key] = changes.get(key, 0) + new_weight
+            self.weights.setdefault(key, [0, text])
+        for key, change in changes.items():
+            if not change or key not in self.weights:
+                continue
+            total = self.weights[key]
+            total[0] += change
+            self.trie.set(key[0], total[1], max(total[0], 0))
+            if total[0] <= 0:
+                del self.weights[key]
+
+
+class SearchSuggester:
+    """
+    Prefix suggestions for the worker, listing and job search boxes.
+
+        suggester = SearchSuggester(engine, User.__table__, WorkerProfile.__table__,
+                                    Listing.__table__, Job.__table__, interval=3600)
+        suggester.start()                                  # or suggester.rebuild() inline
+        suggester.suggest('workers', 'kan')                # [{'text': 'Kano', 'kind': 'state'}, ...]
+        suggester.update('listings', listing.id, listing_entry(listing))
+    """
+
+    def __init__(self, engine, user_table, worker_table, listing_table, job_table, k=DEFAULT_SUGGESTIONS,
+                 max_bytes=None, interval=3600.0):
+        self.engine = engine
+        self.users = user_table
+        self.workers = worker_table
+        self.listings = listing_table
+        self.jobs = job_table
+        self.k = k
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._scopes = None
+        self._pending = None    # writes seen while a rebuild is reading, replayed onto it
+        self._lock = threading.Lock()
+        self._rebuilding = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def built(self):
+        return self._scopes is not None
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            return sum(scope.trie.nbytes for scope in (self._scopes or {}).values())
+
+    def suggest(self, scope, prefix, limit=None):
+        """
+        Most popular phrases of a scope starting with (a word starting with) prefix.
+
+        Returns:
+            list: [{'text', 'kind'}], most popular first; empty until built
+        """
+        key = normalize(prefix)
+        with self._lock:
+            if self._scopes is None:
+                return []
+            found = self._scopes[scope].trie.suggest(key, limit or self.k)
+        return [{'text': text, 'kind': kind} for text, kind, _ in found]
+
+    def update(self, scope, record_id, entry):
+        """Set the (phrases, weight) a record contributes (None to drop it), e.g. worker_entry(...)"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((scope, record_id, entry))
+            if self._scopes is not None:
+                self._scopes[scope].update(record_id, entry)
+
+    def _entries(self, conn):
+        u, w, l, j = self.users, self.workers, self.listings, self.jobs
+        workers = conn.execute(select(w.c.id, w.c.specialization, w.c.location_state, w.c.location_area,
+                                      w.c.total_jobs, u.c.full_name).join(u, u.c.id == w.c.user_id))
+        listings = conn.execute(select(l.c.id, l.c.title, l.c.location_state, l.c.location_area, l.c.status,
+                                       l.c.views).where(l.c.status == 'active'))
+        jobs = conn.execute(select(j.c.id, j.c.title, j.c.location, j.c.status)
+                            .where(or_(j.c.status == 'open', j.c.status.is_(None))))
+        return {
+            'workers': [(row.id, worker_entry(row, row.full_name)) for row in workers],
+            'listings': [(row.id, listing_entry(row)) for row in listings],
+            'jobs': [(row.id, job_entry(row)) for row in jobs],
+        }
+
+    def rebuild(self):
+        """Rebuild every scope from the database, aside from the tries being served"""
+        with self._rebuilding:
+            with self._lock:
+                self._pending = []
+            try:
+                with self.engine.connect() as conn:
+                    entries = self._entries(conn)
+                budget = self.max_bytes / len(SCOPES) if self.max_bytes else None
+                scopes = {}
+                for name in SCOPES:
+                    scopes[name] = _Scope(self.k, budget)
+                    scopes[name].load(entries[name])
+                with self._lock:
+                    for scope, record_id, entry in self._pending:
+                        scopes[scope].update(record_id, entry)
+                    self._scopes = scopes
+            finally:
+                with self._lock:
+                    self._pending = None
+            return {name: len(scope.trie) for name, scope in scopes.items()}
+
+    # ---------- background rebuild ----------
+
+    def start(self):
+        """Build and periodically rebuild on a background thread"""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name='search-suggest', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('Search suggestion rebuild failed')
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,407 @@
+"""
+"Similar listings" index
+Every active listing is a TF-IDF vector over its title (counted twice),
+description, state and price band, L2-normalised so a dot product is the
+cosine similarity. Vectors live in memory as a NumPy sparse matrix stored
+column-wise (per term: the rows containing it and their weights), so the
+similarity of one listing to all others is a gather over the postings of
+its terms plus one np.bincount. Only listings of the same type are
+compared.
+
+The top neighbours of every listing are precomputed, so /listings/<id>/similar
+is a dictionary lookup that never touches the database. The index follows
+writes incrementally: a background refresh picks up listings whose
+updated_at moved (and notices deletions), scores each changed listing once
+against the whole matrix, and uses those scores to update every other
+listing's neighbour list in place. Changed listings are kept in a small
+delta segment; once it grows past a fraction of the matrix the whole index
+is rebuilt so document frequencies stay current.
+"""
+import datetime
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import func, select
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_NEIGHBOURS = 12
+
+# Terms in more than this share of listings carry no signal and are dropped
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+# Rebuild once the delta segment holds this share of the matrix (or 500 listings)
+REBUILD_RATIO = 0.1
+MIN_REBUILD_DELTA = 500
+
+# How far behind the newest updated_at seen a refresh looks for changes
+SETTLE_SECONDS = 5
+
+STOP_WORDS = frozenset('a an and are as at be by for from in is it of on or the to with this that'.split())
+
+SUMMARY_COLUMNS = ('id', 'title', 'listing_type', 'location_state', 'location_area', 'price', 'price_type')
+
+
+def tokenize(text):
+    return [word for word in re.findall(r'\w+', (text or '').lower(), flags=re.UNICODE)
+            if len(word) > 1 and word not in STOP_WORDS]
+
+
+def listing_terms(row):
+    """Term frequencies of one listing row"""
+    counts = Counter()
+    for word in tokenize(row.title):
+        counts[word] += 2
+    counts.update(tokenize(row.description))
+    if row.location_state:
+        counts[f'state:{row.location_state.strip().lower()}'] += 2
+    if row.price and row.price > 0:
+        # Half-decade bands; neighbouring bands overlap a little
+        band = int(math.log10(row.price) * 2)
+        counts[f'price:{band}'] += 2
+        counts[f'price:{band - 1}'] += 1
+        counts[f'price:{band + 1}'] += 1
+    return counts
+
+
+def _summary(row):
+    summary = {name: getattr(row, name) for name in SUMMARY_COLUMNS}
+    try:
+        images = json.loads(row.images) if row.images else []
+    except ValueError:
+        images = []
+    summary['cover_image'] = images[0] if images else None
+    return summary
+
+
+class _Matrix:
+    """Column-major sparse matrix of one listing type's vectors as of the last rebuild"""
+
+    def __init__(self, ids, vectors, n_terms):
+        self.ids = np.array(ids, dtype=np.int64)
+        self.position = {listing_id: i for i, listing_id in enumerate(ids)}
+        self.alive = np.ones(len(ids), dtype=bool)
+        # Per row: the score another listing must beat to enter its neighbours
+        self.kth = np.zeros(len(ids))
+        cols = np.concatenate([c for c, _ in vectors]) if vectors else np.zeros(0, dtype=np.int64)
+        rows = np.repeat(np.arange(len(ids)), [len(c) for c, _ in vectors]) if vectors else np.zeros(0, dtype=np.int64)
+        vals = np.concatenate([v for _, v in vectors]) if vectors else np.zeros(0, dtype=np.float32)
+        order = np.argsort(cols, kind='stable')
+        self.col_ptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=n_terms), out=self.col_ptr[1:])
+        self.rows = rows[order]
+        self.vals = vals[order]
+
+    def scores(self, cols, vals):
+        """Dot product of a vector with every row (zero for removed rows)"""
+        n = len(self.ids)
+        known = cols < len(self.col_ptr) - 1
+        cols, vals = cols[known], vals[known]
+        if not len(cols):
+            return np.zeros(n)
+        # Gather the postings of every query term at once
+        starts = self.col_ptr[cols]
+        lengths = self.col_ptr[cols + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        scores = np.bincount(self.rows[offsets], weights=self.vals[offsets] * np.repeat(vals, lengths), minlength=n)
+        scores[~self.alive] = 0
+        return scores
+
+
+class _Index:
+    """Vectors and neighbour lists of one build, updated in place until the next rebuild"""
+
+    def __init__(self, rows, k):
+        self.k = k
+        terms = [listing_terms(row) for row in rows]
+        df = Counter()
+        for counts in terms:
+            df.update(counts.keys())
+        n = len(rows)
+        limit = max(2, MAX_DOCUMENT_FREQUENCY * n)
+        self.dropped = {term for term, count in df.items() if count > limit}
+        kept = sorted(term for term in df if term not in self.dropped)
+        self.vocab = {term: col for col, term in enumerate(kept)}
+        self.idf = [math.log((1 + n) / (1 + df[term])) + 1 for term in kept]
+        # Terms first seen after the build are treated as the rarest possible
+        self.new_term_idf = math.log((1 + n) / 2) + 1
+
+        self.vectors = {}      # id -> (cols, vals, listing type)
+        self.summaries = {}
+        self.versions = {}     # id -> updated_at as last indexed
+        self.delta = {}        # listing type -> {col: {id: weight}} for listings changed since the build
+        self.delta_ids = set()
+        self.neighbours = {}   # id -> [(score, id)], best first
+        self.referrers = {}    # id -> ids whose neighbour lists include it
+        self.dirty = set()
+        self.watermark = None
+
+        by_type = {}
+        for row, counts in zip(rows, terms):
+            cols, vals = self.weights(counts)
+            self.vectors[row.id] = (cols, vals, row.listing_type)
+            self.summaries[row.id] = _summary(row)
+            self.seen(row.id, row.updated_at)
+            by_type.setdefault(row.listing_type, []).append(row.id)
+        self.matrices = {listing_type: _Matrix(ids, [self.vectors[i][:2] for i in ids], len(kept))
+                         for listing_type, ids in by_type.items()}
+        for listing_id in self.vectors:
+            self.recompute(listing_id)
+
+    def weights(self, counts):
+        cols, vals = [], []
+        for term, tf in counts.items():
+            if term in self.dropped:
+                continue
+            col = self.vocab.get(term)
+            if col is None:
+                col = self.vocab[term] = len(self.vocab)
+                self.idf.append(self.new_term_idf)
+            cols.append(col)
+            vals.append((1 + math.log(tf)) * self.idf[col])
+        cols = np.array(cols, dtype=np.int64)
+        vals = np.array(vals, dtype=np.float32)
+        norm = float(np.linalg.norm(vals))
+        if norm:
+            vals /= norm
+        return cols, vals
+
+    def seen(self, listing_id, updated_at):
+        self.versions[listing_id] = updated_at
+        if updated_at is not None and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def scores(self, listing_id):
+        """
+        Cosine similarity of one indexed listing to the others of its type.
+
+        Returns:
+            tuple: (matrix, dense scores against its rows, {id: score} of delta listings);
+            matrix and scores are None if the type had no listings at the build
+        """
+        cols, vals, listing_type = self.vectors[listing_id]
+        matrix = self.matrices.get(listing_type)
+        main = None
+        if matrix is not None:
+            main = matrix.scores(cols, vals)
+            position = matrix.position.get(listing_id)
+            if position is not None:
+                main[position] = 0
+        delta = {}
+        postings = self.delta.get(listing_type, {})
+        for col, weight in zip(cols.tolist(), vals.tolist()):
+            for other, other_weight in postings.get(col, {}).items():
+                if other != listing_id:
+                    delta[other] = delta.get(other, 0.0) + weight * other_weight
+        return matrix, main, delta
+
+    def top(self, matrix, main, delta):
+        candidates = [(score, other) for other, score in delta.items() if score > 0]
+        if matrix is not None and len(main):
+            best = np.argpartition(-main, self.k - 1)[:self.k] if len(main) > self.k else np.arange(len(main))
+            best = best[main[best] > 0]
+            candidates += zip(main[best].tolist(), matrix.ids[best].tolist())
+        candidates.sort(key=lambda pair: (-pair[0], pair[1]))
+        return candidates[:self.k]
+
+    def threshold(self, listing_id):
+        neighbours = self.neighbours.get(listing_id, ())
+        return neighbours[-1][0] if len(neighbours) >= self.k else 0.0
+
+    def set_neighbours(self, listing_id, neighbours):
+        for _, other in self.neighbours.get(listing_id, ()):
+            self.referrers.get(other, set()).discard(listing_id)
+        self.neighbours[listing_id] = neighbours
+        for _, other in neighbours:
+            self.referrers.setdefault(other, set()).add(listing_id)
+        matrix = self.matrices.get(self.vectors[listing_id][2])
+        position = matrix.position.get(listing_id) if matrix is not None else None
+        if position is not None:
+            matrix.kth[position] = self.threshold(listing_id)
+
+    def recompute(self, listing_id):
+        self.dirty.discard(listing_id)
+        self.set_neighbours(listing_id, self.top(*self.scores(listing_id)))
+
+    def detach(self, listing_id):
+        """Drop a listing's vector; neighbour lists that held it are recomputed when next read"""
+        if listing_id not in self.vectors:
+            return
+        self.set_neighbours(listing_id, [])
+        cols, _, listing_type = self.vectors.pop(listing_id)
+        matrix = self.matrices.get(listing_type)
+        position = matrix.position.get(listing_id) if matrix is not None else None
+        if position is not None:
+            matrix.alive[position] = False
+        if listing_id in self.delta_ids:
+            self.delta_ids.discard(listing_id)
+            postings = self.delta[listing_type]
+            for col in cols.tolist():
+                postings[col].pop(listing_id, None)
+        self.dirty.update(self.referrers.pop(listing_id, ()))
+        self.dirty.discard(listing_id)
+        del self.neighbours[listing_id]
+        del self.summaries[listing_id]
+
+    def upsert(self, row):
+        self.detach(row.id)
+        cols, vals = self.weights(listing_terms(row))
+        self.vectors[row.id] = (cols, vals, row.listing_type)
+        self.summaries[row.id] = _summary(row)
+        self.seen(row.id, row.updated_at)
+        self.delta_ids.add(row.id)
+        postings = self.delta.setdefault(row.listing_type, {})
+        for col, weight in zip(cols.tolist(), vals.tolist()):
+            postings.setdefault(col, {})[row.id] = weight
+
+        # Similarity is symmetric: this listing's scores also tell every other
+        # listing whether it now belongs among their neighbours
+        matrix, main, delta = self.scores(row.id)
+        self.set_neighbours(row.id, self.top(matrix, main, delta))
+        closer = [(other, score) for other, score in delta.items() if score > self.threshold(other)]
+        if matrix is not None:
+            rows = np.flatnonzero(main > matrix.kth)
+            closer += zip(matrix.ids[rows].tolist(), main[rows].tolist())
+        for other, score in closer:
+            if other in self.dirty:
+                continue
+            neighbours = self.neighbours[other] + [(score, row.id)]
+            neighbours.sort(key=lambda pair: (-pair[0], pair[1]))
+            self.set_neighbours(other, neighbours[:self.k])
+
+
+class SimilarListings:
+    """
+    In-memory nearest-neighbour index over active listings.
+
+        index = SimilarListings(engine, Listing.__table__, interval=30)
+        index.refresh()            # or index.start() to refresh in the background
+        index.similar(listing_id)  # [{'id', 'title', ..., 'score'}, ...]
+    """
+
+    def __init__(self, engine, table, k=DEFAULT_NEIGHBOURS, interval=30.0):
+        self.engine = engine
+        self.table = table
+        self.k = k
+        self.interval = interval
+        self._index = None
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def built(self):
+        return self._index is not None
+
+    def similar(self, listing_id, limit=None):
+        """
+        Precomputed neighbours of a listing.
+
+        Returns:
+            list|None: Summaries with a 'score', best first; None if the
+            listing is not indexed (unknown or inactive)
+        """
+        with self._lock:
+            index = self._index
+            if index is None or listing_id not in index.vectors:
+                return None
+            if listing_id in index.dirty:
+                index.recompute(listing_id)
+            neighbours = index.neighbours[listing_id][:limit or self.k]
+            return [dict(index.summaries[other], score=round(score, 4)) for score, other in neighbours]
+
+    def _select(self):
+        t = self.table
+        columns = [t.c[name] for name in SUMMARY_COLUMNS] + [t.c.description, t.c.images, t.c.updated_at]
+        return select(*columns).where(t.c.status == 'active')
+
+    def rebuild(self):
+        """Recompute document frequencies, vectors and every neighbour list from scratch"""
+        with self.engine.connect() as conn:
+            rows = conn.execute(self._select()).fetchall()
+        # Built aside; readers keep using the previous index meanwhile
+        index = _Index(rows, self.k)
+        with self._lock:
+            self._index = index
+        return len(rows)
+
+    def refresh(self):
+        """
+        Bring the index up to date with the listings table.
+
+        Returns:
+            str: 'rebuilt', 'updated' or 'unchanged'
+        """
+        with self._refreshing:
+            return self._refresh()
+
+    def _refresh(self):
+        index = self._index
+        if index is None:
+            self.rebuild()
+            return 'rebuilt'
+        t = self.table
+        with self.engine.connect() as conn:
+            query = select(t.c.id, t.c.status, t.c.updated_at)
+            if index.watermark is not None:
+                # updated_at is stamped before commit, so a slow transaction can
+                # commit a timestamp below the watermark; look back a little
+                query = query.where(t.c.updated_at >= index.watermark - datetime.timedelta(seconds=SETTLE_SECONDS))
+            changed = [row for row in conn.execute(query) if index.versions.get(row.id) != row.updated_at]
+            active = conn.execute(select(func.count()).select_from(t).where(t.c.status == 'active')).scalar()
+
+        with self._lock:
+            remaining = len(index.vectors) - sum(1 for row in changed if row.id in index.vectors)
+        if not changed and active == remaining:
+            return 'unchanged'
+        reindex = [row.id for row in changed if row.status == 'active']
+        if len(index.delta_ids) + len(reindex) > max(MIN_REBUILD_DELTA, REBUILD_RATIO * len(index.vectors)):
+            self.rebuild()
+            return 'rebuilt'
+
+        with self.engine.connect() as conn:
+            rows = conn.execute(self._select().where(t.c.id.in_(reindex))).fetchall() if reindex else []
+            ids = None
+            if remaining + len(rows) != active:
+                # Listings were deleted outright, which leaves no updated_at behind
+                ids = {listing_id for (listing_id,) in conn.execute(select(t.c.id).where(t.c.status == 'active'))}
+
+        with self._lock:
+            for row in changed:
+                if row.status != 'active':
+                    index.detach(row.id)
+                    index.seen(row.id, row.updated_at)
+            for row in rows:
+                index.upsert(row)
+            if ids is not None:
+                for listing_id in set(index.vectors) - ids:
+                    index.detach(listing_id)
+                    index.versions.pop(listing_id, None)
+        return 'updated'
+
+    def start(self):
+        """Build and keep refreshing on a background thread"""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name='similar-listings', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Similar listings refresh failed')
+            if self._stop.wait(self.interval):
+                return
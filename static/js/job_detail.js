@@ -13,6 +13,10 @@ function jobDetail() {
         showApplicationsModal: false,
         applications: [],
         isLoadingApplications: false,
+        applicationsCursor: null,
+        isLoadingMoreApplications: false,
+        selectedApplications: [],
+        isUpdatingApplications: false,
 
         async init() {
             const userStr = localStorage.getItem('flb_user');
@@ -92,13 +96,20 @@ function jobDetail() {
             }
         },
 
+        applicationsUrl(cursor) {
+            const params = new URLSearchParams({ employer_id: this.currentUser.id });
+            if (cursor) params.set('cursor', cursor);
+            return `/api/jobs/${this.job.id}/applications?${params.toString()}`;
+        },
+
         async openApplicationsModal() {
             this.showApplicationsModal = true;
             this.isLoadingApplications = true;
             try {
-                const response = await fetch(`/api/jobs/${this.job.id}/applications?employer_id=${this.currentUser.id}`);
+                const response = await fetch(this.applicationsUrl());
                 if (response.ok) {
                     this.applications = await response.json();
+                    this.applicationsCursor = response.headers.get('X-Next-Cursor');
                 } else {
                     alert('Failed to fetch applications.');
                 }
@@ -109,6 +120,51 @@ function jobDetail() {
             }
         },
 
+        async loadMoreApplications() {
+            if (!this.applicationsCursor || this.isLoadingMoreApplications) return;
+            this.isLoadingMoreApplications = true;
+            try {
+                const response = await fetch(this.applicationsUrl(this.applicationsCursor));
+                if (response.ok) {
+                    this.applications = this.applications.concat(await response.json());
+                    this.applicationsCursor = response.headers.get('X-Next-Cursor');
+                } else {
+                    console.error('Failed to fetch more applications');
+                }
+            } catch (error) {
+                console.error('Error fetching applications:', error);
+            } finally {
+                this.isLoadingMoreApplications = false;
+            }
+        },
+
+        async updateSelectedApplications(action) {
+            if (this.selectedApplications.length === 0 || this.isUpdatingApplications) return;
+            this.isUpdatingApplications = true;
+            try {
+                const ids = this.selectedApplications.map(Number);
+                const response = await fetch(`/api/jobs/${this.job.id}/applications/bulk`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ employer_id: this.currentUser.id, [action]: ids })
+                });
+                const data = await response.json();
+                if (response.ok) {
+                    const status = action === 'accept' ? 'accepted' : 'rejected';
+                    this.applications.forEach(app => {
+                        if (ids.includes(app.id)) app.status = status;
+                    });
+                    this.selectedApplications = [];
+                } else {
+                    alert(data.error || 'Failed to update applications.');
+                }
+            } catch (error) {
+                console.error('Error updating applications:', error);
+            } finally {
+                this.isUpdatingApplications = false;
+            }
+        },
+
         formatDate(dateString) {
             if (!dateString) return '';
             const date = new Date(dateString);
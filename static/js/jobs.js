@@ -2,45 +2,67 @@ function jobsDirectory() {
     return {
         jobs: [],
         loading: true,
+        loadingMore: false,
+        nextCursor: null,
         searchQuery: '',
         sortBy: 'recent',
 
+        buildUrl(cursor) {
+            const params = new URLSearchParams({ fields: 'card' });
+            if (this.searchQuery) params.set('q', this.searchQuery);
+            if (this.sortBy) params.set('sort_by', this.sortBy);
+            if (cursor) params.set('cursor', cursor);
+            return '/api/jobs/list?' + params.toString();
+        },
+
         async fetchJobs() {
             this.loading = true;
+            this.nextCursor = null;
             try {
-                let url = '/api/jobs/list?'; // We need to create this endpoint or use existing
-                if (this.searchQuery) {
-                    url += 'q=' + encodeURIComponent(this.searchQuery) + '&';
-                }
-                if (this.sortBy) {
-                    url += 'sort_by=' + encodeURIComponent(this.sortBy);
-                }
-
-                const response = await fetch(url);
+                const response = await fetch(this.buildUrl());
                 if (response.ok) {
                     this.jobs = await response.json();
+                    this.nextCursor = response.headers.get('X-Next-Cursor');
                 } else {
                     // Mock data if API fails or doesn't exist yet
                     console.warn('Failed to fetch jobs, using mock data');
                     this.jobs = [
-                        { id: 1, title: 'Farm Manager', location: 'Lagos', salary_range: '₦150k - ₦200k', description: 'Experienced farm manager needed for a poultry farm.', created_at: new Date().toISOString() },
-                        { id: 2, title: 'Tractor Operator', location: 'Ogun', salary_range: '₦80k - ₦120k', description: 'Licensed tractor operator for land preparation.', created_at: new Date().toISOString() },
-                        { id: 3, title: 'Harvester', location: 'Oyo', salary_range: 'Daily Pay', description: 'Seasonal harvesters needed for maize farm.', created_at: new Date().toISOString() }
+                        { id: 1, title: 'Farm Manager', location: 'Lagos', salary_range: '₦150k - ₦200k', summary: 'Experienced farm manager needed for a poultry farm.', created_at: new Date().toISOString() },
+                        { id: 2, title: 'Tractor Operator', location: 'Ogun', salary_range: '₦80k - ₦120k', summary: 'Licensed tractor operator for land preparation.', created_at: new Date().toISOString() },
+                        { id: 3, title: 'Harvester', location: 'Oyo', salary_range: 'Daily Pay', summary: 'Seasonal harvesters needed for maize farm.', created_at: new Date().toISOString() }
                     ];
                 }
             } catch (error) {
                 console.error('Error fetching jobs:', error);
                 // Mock data fallback
                  this.jobs = [
-                        { id: 1, title: 'Farm Manager', location: 'Lagos', salary_range: '₦150k - ₦200k', description: 'Experienced farm manager needed for a poultry farm.', created_at: new Date().toISOString() },
-                        { id: 2, title: 'Tractor Operator', location: 'Ogun', salary_range: '₦80k - ₦120k', description: 'Licensed tractor operator for land preparation.', created_at: new Date().toISOString() },
-                        { id: 3, title: 'Harvester', location: 'Oyo', salary_range: 'Daily Pay', description: 'Seasonal harvesters needed for maize farm.', created_at: new Date().toISOString() }
+                        { id: 1, title: 'Farm Manager', location: 'Lagos', salary_range: '₦150k - ₦200k', summary: 'Experienced farm manager needed for a poultry farm.', created_at: new Date().toISOString() },
+                        { id: 2, title: 'Tractor Operator', location: 'Ogun', salary_range: '₦80k - ₦120k', summary: 'Licensed tractor operator for land preparation.', created_at: new Date().toISOString() },
+                        { id: 3, title: 'Harvester', location: 'Oyo', salary_range: 'Daily Pay', summary: 'Seasonal harvesters needed for maize farm.', created_at: new Date().toISOString() }
                     ];
             } finally {
                 this.loading = false;
             }
         },
 
+        async loadMore() {
+            if (!this.nextCursor || this.loadingMore) return;
+            this.loadingMore = true;
+            try {
+                const response = await fetch(this.buildUrl(this.nextCursor));
+                if (response.ok) {
+                    this.jobs = this.jobs.concat(await response.json());
+                    this.nextCursor = response.headers.get('X-Next-Cursor');
+                } else {
+                    console.error('Failed to fetch more jobs');
+                }
+            } catch (error) {
+                console.error('Error fetching jobs:', error);
+            } finally {
+                this.loadingMore = false;
+            }
+        },
+
         formatDate(dateString) {
             if (!dateString) return '';
             return new Date(dateString).toLocaleDateString();
@@ -3,6 +3,7 @@ function workersDirectory() {
         workers: [],
         loading: true,
         searchQuery: '',
+        suggestions: [],
         sortBy: 'rating',
 
         async fetchWorkers() {
@@ -29,6 +30,22 @@ function workersDirectory() {
             }
         },
 
+        async fetchSuggestions() {
+            const q = this.searchQuery.trim();
+            if (!q) {
+                this.suggestions = [];
+                return;
+            }
+            try {
+                const response = await fetch('/search/suggest?scope=workers&q=' + encodeURIComponent(q));
+                if (response.ok) {
+                    this.suggestions = (await response.json()).suggestions;
+                }
+            } catch (error) {
+                console.error('Error fetching suggestions:', error);
+            }
+        },
+
         init() {
             this.fetchWorkers();
         }
@@ -0,0 +1,65 @@
+"""
+Short-lived per-user stats cache
+Dashboard figures are read on every page load but change only on a few
+events (a wallet movement, an application, a rating). Each user's payload
+is kept for a few seconds; the endpoints behind those events drop it
+explicitly after committing, so the TTL only bounds staleness from writes
+that skip that hook (admin scripts, other processes).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Entry-capped LRU cache whose entries expire ttl_seconds after being stored.
+
+    A ttl of 0 or less disables caching: get() always misses and put() is a
+    no-op.
+    """
+
+    def __init__(self, ttl_seconds, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value, or None if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """Store a value, evicting least recently used entries past max_entries"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        """Drop entries (e.g. for the users a committed write touched)"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
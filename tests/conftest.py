@@ -1,5 +1,6 @@
 import pytest
 import os
+import shutil
 import tempfile
 from app import create_app
 
@@ -12,14 +13,36 @@ def app():
     import config
     old_uri = config.SQLALCHEMY_DATABASE_URI
     config.SQLALCHEMY_DATABASE_URI = f'sqlite:///{db_path}'
+    old_media_root = config.MEDIA_ROOT
+    config.MEDIA_ROOT = tempfile.mkdtemp()
+    old_upload_dir = config.CHUNKED_UPLOAD_DIR
+    config.CHUNKED_UPLOAD_DIR = tempfile.mkdtemp()
     
     app = create_app()
     app.testing = True
     
     yield app
     
+    # Flush buffered view counts while the database still exists
+    if hasattr(app, 'view_counter'):
+        app.view_counter.close()
+    if hasattr(app, 'boost_sweeper'):
+        app.boost_sweeper.close()
+    if hasattr(app, 'similar_listings'):
+        app.similar_listings.close()
+    if hasattr(app, 'worker_matcher'):
+        app.worker_matcher.close()
+    if hasattr(app, 'search_suggester'):
+        app.search_suggester.close()
+    if hasattr(app, 'media_pipeline'):
+        app.media_pipeline.close()
+
     # Cleanup
     config.SQLALCHEMY_DATABASE_URI = old_uri
+    shutil.rmtree(config.MEDIA_ROOT, ignore_errors=True)
+    config.MEDIA_ROOT = old_media_root
+    shutil.rmtree(config.CHUNKED_UPLOAD_DIR, ignore_errors=True)
+    config.CHUNKED_UPLOAD_DIR = old_upload_dir
     os.close(db_fd)
     os.unlink(db_path)
 
@@ -127,3 +127,63 @@ def test_boost_worker_profile(client):
     assert workers[0]['id'] == worker_id
     assert workers[0]['is_boosted'] == True
     assert workers[0]['boost_expiry'] is not None
+
+
+def _set_listing_boost(listing_id, featured, expiry):
+    import config
+    from sqlalchemy import create_engine
+    from models import Listing
+    engine = create_engine(config.SQLALCHEMY_DATABASE_URI)
+    with engine.begin() as conn:
+        conn.execute(Listing.__table__.update().where(Listing.__table__.c.id == listing_id)
+                     .values(featured=featured, boost_expiry=expiry))
+    engine.dispose()
+
+
+def test_expired_boosts_rank_normally_and_are_swept(app, client):
+    import datetime
+    user_res = client.post('/register', json={
+        'full_name': 'Sweep User',
+        'email': 'sweep@example.com',
+        'password': 'Password123!',
+        'account_type': 'realtor'
+    })
+    user_id = user_res.json['id']
+
+    ids = []
+    for i in range(4):
+        res = client.post('/listings/create', json={
+            'owner_id': user_id,
+            'title': f'Plot {i}',
+            'price': 1000 * (i + 1),
+            'listing_type': 'land_sale',
+            'category': 'land_sale'
+        })
+        ids.append(res.json['id'])
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    _set_listing_boost(ids[0], True, now + datetime.timedelta(days=1))   # live boost
+    _set_listing_boost(ids[1], True, now - datetime.timedelta(days=1))   # expired, not yet swept
+
+    # Live boost first, the expired one ranks by price like everything else
+    listings = client.get('/listings?sort_by=price_high').json
+    assert [l['id'] for l in listings] == [ids[0], ids[3], ids[2], ids[1]]
+
+    featured = client.get('/listings?featured=true').json
+    assert [l['id'] for l in featured] == [ids[0]]
+
+    # Featured-first ordering holds across cursor pages
+    seen = []
+    url = '/listings?sort_by=price_high&limit=1'
+    while url:
+        res = client.get(url)
+        seen.extend(l['id'] for l in res.json)
+        cursor = res.headers.get('X-Next-Cursor')
+        url = f'/listings?sort_by=price_high&limit=1&cursor={cursor}' if cursor else None
+    assert seen == [ids[0], ids[3], ids[2], ids[1]]
+
+    expired = app.boost_sweeper.sweep()
+    assert expired['listings'] == 1
+    listing = client.get(f'/listings/{ids[1]}').json
+    assert listing['featured'] is False
+    assert client.get(f'/listings/{ids[0]}').json['featured'] is True
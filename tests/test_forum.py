@@ -162,3 +162,31 @@ class TestForum:
         })
         assert response.status_code == 403
         assert 'account is banned' in response.get_json()['error']
+
+    def test_posts_conditional_get(self, client):
+        user = client.post('/register', json={
+            'full_name': 'Etag Forum User',
+            'email': 'etag_forum@test.com',
+            'password': 'Password123!',
+            'account_type': 'farmer'
+        }).get_json()
+        response = client.post('/forum/posts', json={
+            'author_id': user['id'],
+            'title': 'Cassava spacing',
+            'content': 'What spacing do you use?',
+            'category': 'planting_advice'
+        })
+        post_id = response.get_json()['id']
+
+        response = client.get('/forum/posts')
+        etag = response.headers['ETag']
+        assert client.get('/forum/posts', headers={'If-None-Match': etag}).status_code == 304
+
+        # New comments change comments_count, so the list is stale
+        client.post(f'/forum/posts/{post_id}/comments', json={
+            'author_id': user['id'],
+            'content': 'One metre by one metre'
+        })
+        response = client.get('/forum/posts', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()[0]['comments_count'] == 1
@@ -419,3 +419,982 @@ def test_get_user_listings(client):
     data = r.get_json()
     assert len(data) == 3
     assert all(l['owner_id'] == user_id for l in data)
+
+
+def test_get_listings_cursor_pagination(client):
+    """Test paging through listings with opaque cursors"""
+    user_data = {
+        "full_name": "Paula Pager",
+        "email": "paula.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+
+    for i in range(5):
+        client.post('/listings/create', json={
+            "owner_id": user_id,
+            "listing_type": "land_sale",
+            "title": f"Plot {i}",
+            "price": 1000 * (i + 1),
+            "category": "land_sale"
+        })
+
+    # Walk every page for each sort order and make sure nothing is skipped or repeated
+    for sort_by, expected in [('price_low', [1000, 2000, 3000, 4000, 5000]),
+                              ('price_high', [5000, 4000, 3000, 2000, 1000])]:
+        seen = []
+        url = f'/listings?sort_by={sort_by}&limit=2'
+        while url:
+            r = client.get(url)
+            assert r.status_code == 200
+            seen.extend(l['price'] for l in r.get_json())
+            cursor = r.headers.get('X-Next-Cursor')
+            url = f'/listings?sort_by={sort_by}&limit=2&cursor={cursor}' if cursor else None
+        assert seen == expected
+
+    seen_ids = []
+    url = '/listings?limit=2'
+    while url:
+        r = client.get(url)
+        seen_ids.extend(l['id'] for l in r.get_json())
+        cursor = r.headers.get('X-Next-Cursor')
+        url = f'/listings?limit=2&cursor={cursor}' if cursor else None
+    assert len(seen_ids) == 5
+    assert len(set(seen_ids)) == 5
+
+
+def test_get_listings_invalid_cursor(client):
+    """Test that a malformed or mismatched cursor is rejected"""
+    r = client.get('/listings?cursor=not-a-cursor')
+    assert r.status_code == 400
+
+    from pagination import encode_cursor
+    r = client.get(f'/listings?sort_by=recent&cursor={encode_cursor("price_low", 10.0, 1)}')
+    assert r.status_code == 400
+
+
+def test_search_listings_full_text(client):
+    """Test ?q= search ranking, prefix matching and index sync on update/delete"""
+    user_data = {
+        "full_name": "Sam Searcher",
+        "email": "sam.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+
+    def create(title, description, state, price):
+        r = client.post('/listings/create', json={
+            "owner_id": user_id,
+            "listing_type": "land_sale",
+            "category": "land_sale",
+            "title": title,
+            "description": description,
+            "location_state": state,
+            "price": price
+        })
+        return r.get_json()['id']
+
+    cassava_id = create("Cassava farmland", "Fertile plot near the river", "Ogun", 500000)
+    mention_id = create("Dry plot", "Previously used for cassava", "Kaduna", 300000)
+    create("Yam farm", "Good drainage", "Kaduna", 400000)
+
+    # Title matches outrank description matches
+    r = client.get('/listings?q=cassava')
+    assert r.status_code == 200
+    assert [l['id'] for l in r.get_json()] == [cassava_id, mention_id]
+
+    # Prefix matching and filters still apply
+    r = client.get('/listings?q=kadu&max_price=350000')
+    assert [l['id'] for l in r.get_json()] == [mention_id]
+
+    # Updates and deletes are reflected in the index
+    client.put(f'/listings/{cassava_id}/update', json={"title": "Maize farmland", "description": "Fertile plot"})
+    r = client.get('/listings?q=cassava')
+    assert [l['id'] for l in r.get_json()] == [mention_id]
+    r = client.get('/listings?q=maize')
+    assert [l['id'] for l in r.get_json()] == [cassava_id]
+
+    # A query with no searchable words matches nothing rather than the whole catalogue
+    assert client.get('/listings?q=%25%25%25').get_json() == []
+    assert client.get('/listings?q=--').get_json() == []
+
+    client.delete(f'/listings/{mention_id}', json={"user_id": user_id})
+    r = client.get('/listings?q=cassava')
+    assert r.get_json() == []
+
+
+def test_listing_facets(client):
+    """Test facet counts stay in step with listing writes and honour filters"""
+    user_data = {
+        "full_name": "Fiona Facets",
+        "email": "fiona.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+
+    def create(listing_type, state, price, title="Plot"):
+        r = client.post('/listings/create', json={
+            "owner_id": user_id,
+            "listing_type": listing_type,
+            "category": listing_type,
+            "title": title,
+            "location_state": state,
+            "price": price,
+            "price_type": "sale"
+        })
+        return r.get_json()['id']
+
+    create("land_sale", "Lagos", 50000)
+    create("land_sale", "Lagos", 250000)
+    rent_id = create("land_rent", "Kaduna", 250000, title="Irrigated plot")
+
+    r = client.get('/listings/facets')
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data['total'] == 3
+    assert data['listing_type'] == {'land_sale': 2, 'land_rent': 1}
+    assert data['location_state'] == {'Lagos': 2, 'Kaduna': 1}
+    assert data['price_type'] == {'sale': 3}
+    assert data['price'][0] == {'min': 0, 'max': 100000, 'count': 1}
+    assert data['price'][1] == {'min': 100000, 'max': 500000, 'count': 2}
+
+    # Filters narrow every facet
+    data = client.get('/listings/facets?location_state=Lagos').get_json()
+    assert data['total'] == 2
+    assert data['listing_type'] == {'land_sale': 2}
+
+    # Updates move a listing between buckets
+    client.put(f'/listings/{rent_id}/update', json={"price": 750000, "location_state": "Lagos"})
+    data = client.get('/listings/facets').get_json()
+    assert data['location_state'] == {'Lagos': 3}
+    assert data['price'][2]['count'] == 1
+
+    # Deleted listings drop out
+    client.delete(f'/listings/{rent_id}', json={"user_id": user_id})
+    data = client.get('/listings/facets').get_json()
+    assert data['total'] == 2
+    assert data['listing_type'] == {'land_sale': 2}
+
+    # Search and price filters fall back to a live count with the same semantics
+    data = client.get('/listings/facets?min_price=100000').get_json()
+    assert data['total'] == 1
+    create("land_rent", "Ogun", 90000, title="Irrigated farmland")
+    data = client.get('/listings/facets?q=irrigated').get_json()
+    assert data['total'] == 1
+    assert data['location_state'] == {'Ogun': 1}
+
+
+def test_listing_price_stats(client):
+    """Test price percentiles and price per hectare follow listing writes"""
+    user_data = {
+        "full_name": "Priya Prices",
+        "email": "priya.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+
+    def create(price, size_value, size_unit, state="Kaduna"):
+        r = client.post('/listings/create', json={
+            "owner_id": user_id,
+            "listing_type": "land_sale",
+            "category": "land_sale",
+            "title": "Farmland",
+            "location_state": state,
+            "size_value": size_value,
+            "size_unit": size_unit,
+            "price": price,
+            "price_type": "sale"
+        })
+        return r.get_json()['id']
+
+    ids = [create(price, 2, "hectares") for price in (100000, 200000, 300000, 400000, 500000)]
+    create(900000, 10, "acres", state="Lagos")
+
+    r = client.get('/listings/price-stats?listing_type=land_sale&location_state=Kaduna')
+    assert r.status_code == 200
+    data = r.get_json()
+    assert data['count'] == 5
+    assert data['min'] == 100000
+    assert data['max'] == 500000
+    assert data['mean'] == 300000
+    assert data['p50'] == 300000
+    assert data['p10'] == 100000
+    assert data['p90'] == 400000
+    assert data['price_per_unit']['hectare']['p50'] == 150000
+
+    # Acres are normalised to hectares
+    data = client.get('/listings/price-stats?location_state=Lagos').get_json()
+    assert data['price_per_unit']['hectare']['count'] == 1
+    assert abs(data['price_per_unit']['hectare']['max'] - 222394.7) < 1
+
+    # Edits and deletes move listings out of the old bins
+    client.put(f'/listings/{ids[0]}/update', json={"price": 1000000})
+    client.delete(f'/listings/{ids[1]}', json={"user_id": user_id})
+    data = client.get('/listings/price-stats?location_state=Kaduna').get_json()
+    assert data['count'] == 4
+    assert data['min'] == 300000
+    assert data['max'] == 1000000
+
+    data = client.get('/listings/price-stats?location_state=Nowhere').get_json()
+    assert data['count'] == 0
+    assert data['p50'] is None
+
+
+def test_price_sketches_fall_back_without_math_functions(tmp_path):
+    """Test no sketch triggers are installed when SQLite lacks ln()/ceil(), so listing writes still work"""
+    import sqlite3
+    from sqlalchemy import create_engine, event, text
+    from models import Base
+    from price_stats import ensure_price_sketches
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'nomath.db'}")
+    Base.metadata.create_all(bind=engine)
+    assert ensure_price_sketches(engine)
+
+    # Stand in for an SQLite build compiled without the math functions
+    @event.listens_for(engine, 'before_cursor_execute')
+    def no_math(conn, cursor, statement, *args):
+        if statement.startswith('SELECT ln('):
+            raise sqlite3.OperationalError('no such function: ln')
+
+    assert ensure_price_sketches(engine) is False
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' "
+                                 "AND sql LIKE '%ln(%'")).scalar() == 0
+    engine.dispose()
+
+
+def test_listing_views_are_written_behind(app, client):
+    """Test that listing views are buffered in memory and flushed in one batch"""
+    user_data = {
+        "full_name": "Victor Views",
+        "email": "victor.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+    r = client.post('/listings/create', json={
+        "owner_id": user_id,
+        "listing_type": "land_sale",
+        "category": "land_sale",
+        "title": "Popular plot",
+        "price": 1000
+    })
+    listing = r.get_json()
+
+    for expected in (1, 2, 3):
+        r = client.get(f"/listings/{listing['id']}")
+        assert r.get_json()['views'] == expected
+
+    # Nothing has been written yet; a flush folds all three views into one update
+    assert app.view_counter.pending('listing', listing['id']) == 3
+    assert app.view_counter.flush() == 1
+    assert app.view_counter.pending('listing', listing['id']) == 0
+
+    r = client.get('/listings')
+    stored = r.get_json()[0]
+    assert stored['views'] == 3
+    # A view is not an edit
+    assert stored['updated_at'] == listing['updated_at']
+
+
+def test_listing_card_cache_invalidation(app, client):
+    """Test cached listing payloads are reused and invalidated on listing and owner changes"""
+    user_data = {
+        "full_name": "Carla Cache",
+        "email": "carla.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+    r = client.post('/listings/create', json={
+        "owner_id": user_id,
+        "listing_type": "land_sale",
+        "category": "land_sale",
+        "title": "Cached plot",
+        "price": 1000,
+        "images": ["a.jpg"]
+    })
+    listing_id = r.get_json()['id']
+    cache = app.listing_cache
+
+    client.get('/listings')
+    hits = cache.hits
+    r = client.get(f'/listings/user/{user_id}')
+    assert cache.hits == hits + 1
+    assert r.get_json()[0]['images'] == ["a.jpg"]
+
+    # Editing the listing bumps updated_at, so the stale payload is not served
+    client.put(f'/listings/{listing_id}/update', json={"title": "Renamed plot"})
+    assert client.get('/listings').get_json()[0]['title'] == "Renamed plot"
+
+    # Owner renames are invalidated explicitly
+    client.put(f'/users/{user_id}', json={"full_name": "Carla Renamed"})
+    assert client.get(f'/listings/{listing_id}').get_json()['owner_name'] == "Carla Renamed"
+
+    client.delete(f'/listings/{listing_id}', json={"user_id": user_id})
+    assert len(cache) == 0
+
+
+def test_payload_cache_lru_memory_cap():
+    """Test the payload cache evicts least recently used fragments to stay under its cap"""
+    from payload_cache import PayloadCache
+
+    cache = PayloadCache(max_bytes=25)
+    cache.put(1, 'v1', 'a' * 10, owner_id=7)
+    cache.put(2, 'v1', 'b' * 10, owner_id=7)
+    assert cache.get(1, 'v1') == 'a' * 10   # 1 is now most recently used
+    cache.put(3, 'v1', 'c' * 10, owner_id=8)
+    assert cache.get(2, 'v1') is None       # evicted
+    assert cache.get(1, 'v2') is None       # version mismatch
+    assert cache.size <= 25
+
+    cache.invalidate_owner(7)
+    assert cache.get(1, 'v1') is None
+    assert cache.get(3, 'v1') == 'c' * 10
+
+
+def test_listings_near_me(client):
+    """Test radius search returns nearby listings sorted by distance"""
+    user_data = {
+        "full_name": "Gina Geo",
+        "email": "gina.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+
+    def create(title, lat, lon):
+        r = client.post('/listings/create', json={
+            "owner_id": user_id,
+            "listing_type": "land_sale",
+            "category": "land_sale",
+            "title": title,
+            "price": 1000,
+            "latitude": lat,
+            "longitude": lon
+        })
+        assert r.status_code == 201
+        return r.get_json()['id']
+
+    # Around Ibadan (7.3775, 3.9470)
+    near_id = create("Akinyele farmland", 7.4700, 3.9100)   # ~11 km
+    mid_id = create("Moniya plot", 7.5300, 3.9000)          # ~18 km
+    create("Lagos plot", 6.5244, 3.3792)                    # ~113 km
+    client.post('/listings/create', json={
+        "owner_id": user_id, "listing_type": "land_sale", "category": "land_sale",
+        "title": "No coordinates", "price": 1000
+    })
+
+    r = client.get('/listings?near=7.3775,3.9470&radius_km=30')
+    assert r.status_code == 200
+    data = r.get_json()
+    assert [l['id'] for l in data] == [near_id, mid_id]
+    assert 10 < data[0]['distance_km'] < 12
+    assert data[0]['latitude'] == 7.47
+
+    r = client.get('/listings?near=7.3775,3.9470&radius_km=150')
+    assert len(r.get_json()) == 3
+
+    # Moving a listing updates its geohash
+    client.put(f'/listings/{mid_id}/update', json={"latitude": 6.6, "longitude": 3.4})
+    r = client.get('/listings?near=7.3775,3.9470&radius_km=30')
+    assert [l['id'] for l in r.get_json()] == [near_id]
+
+    # Half a point is rejected and leaves the location alone; both null clear it
+    assert client.put(f'/listings/{near_id}/update', json={"latitude": 7.5}).status_code == 400
+    assert client.put(f'/listings/{near_id}/update', json={"latitude": 7.5, "longitude": None}).status_code == 400
+    assert client.get(f'/listings/{near_id}').get_json()['latitude'] == 7.47
+    assert client.put(f'/listings/{near_id}/update', json={"latitude": None, "longitude": None}).status_code == 200
+    assert client.get(f'/listings/{near_id}').get_json()['latitude'] is None
+
+    assert client.get('/listings?near=abc').status_code == 400
+    assert client.get('/listings?near=95,3').status_code == 400
+    r = client.post('/listings/create', json={
+        "owner_id": user_id, "listing_type": "land_sale", "category": "land_sale",
+        "title": "Bad", "price": 1000, "latitude": 200, "longitude": 3
+    })
+    assert r.status_code == 400
+
+
+def test_listings_conditional_get(client):
+    """Test ETag/Last-Modified revalidation on the listing list and detail endpoints"""
+    user_data = {
+        "full_name": "Ethan Etag",
+        "email": "ethan.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+    r = client.post('/listings/create', json={
+        "owner_id": user_id, "listing_type": "land_sale", "category": "land_sale",
+        "title": "Cached plot", "price": 100000
+    })
+    listing_id = r.get_json()['id']
+
+    r = client.get('/listings?listing_type=land_sale')
+    assert r.status_code == 200
+    etag = r.headers['ETag']
+    assert etag.startswith('W/')
+    assert r.headers['Last-Modified']
+    assert 'no-cache' in r.headers['Cache-Control']
+
+    r = client.get('/listings?listing_type=land_sale', headers={'If-None-Match': etag})
+    assert r.status_code == 304
+    assert r.data == b''
+
+    # Different query strings have different validators
+    r = client.get('/listings?listing_type=land_rent', headers={'If-None-Match': etag})
+    assert r.status_code == 200
+
+    # Views are written behind and don't invalidate the list
+    client.get(f'/listings/{listing_id}')
+    client.application.view_counter.flush()
+    r = client.get('/listings?listing_type=land_sale', headers={'If-None-Match': etag})
+    assert r.status_code == 304
+
+    r = client.get(f'/listings/{listing_id}')
+    detail_etag = r.headers['ETag']
+    r = client.get(f'/listings/{listing_id}', headers={'If-None-Match': detail_etag})
+    assert r.status_code == 304
+
+    # Edits change both validators
+    client.put(f'/listings/{listing_id}/update', json={"price": 120000})
+    r = client.get('/listings?listing_type=land_sale', headers={'If-None-Match': etag})
+    assert r.status_code == 200
+    assert r.get_json()[0]['price'] == 120000
+    r = client.get(f'/listings/{listing_id}', headers={'If-None-Match': detail_etag})
+    assert r.status_code == 200
+
+    # So does a change to the owner's name embedded in the cards
+    etag = r.headers['ETag']
+    client.put(f'/users/{user_id}', json={"full_name": "Ethan Renamed"})
+    r = client.get(f'/listings/{listing_id}', headers={'If-None-Match': etag})
+    assert r.status_code == 200
+    assert r.get_json()['owner_name'] == 'Ethan Renamed'
+
+
+def test_listings_sparse_fieldsets(client):
+    """Test ?fields= projections return only the requested fields with full-payload values"""
+    user_data = {
+        "full_name": "Sally Sparse",
+        "email": "sally.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    }
+    r = client.post('/register', json=user_data)
+    user_id = r.get_json()['id']
+    for i in range(3):
+        client.post('/listings/create', json={
+            "owner_id": user_id, "listing_type": "land_sale", "category": "land_sale",
+            "title": f"Sparse plot {i}", "description": "Long description " * 50,
+            "price": 1000 * (i + 1), "images": [f"cover{i}.jpg", "second.jpg"]
+        })
+
+    full = client.get('/listings?sort_by=price_low').get_json()
+
+    r = client.get('/listings?sort_by=price_low&fields=title,price')
+    assert r.status_code == 200
+    data = r.get_json()
+    assert [set(item) for item in data] == [{'id', 'title', 'price'}] * 3
+    assert [(item['id'], item['title'], item['price']) for item in data] == \
+        [(item['id'], item['title'], item['price']) for item in full]
+
+    card = client.get('/listings?sort_by=price_low&fields=card').get_json()[0]
+    assert 'description' not in card and 'images' not in card
+    assert card['cover_image'] == 'cover0.jpg'
+    assert len(card['summary']) == 160
+    assert card['owner_name'] == 'Sally Sparse'
+    for key in ('listing_type', 'price', 'created_at', 'owner_verified'):
+        assert card[key] == full[0][key]
+
+    # Keyset pagination works on projected rows
+    r = client.get('/listings?sort_by=price_low&fields=card&limit=2')
+    assert len(r.get_json()) == 2
+    r = client.get(f"/listings?sort_by=price_low&fields=card&limit=2&cursor={r.headers['X-Next-Cursor']}")
+    assert [item['title'] for item in r.get_json()] == ['Sparse plot 2']
+
+    assert client.get('/listings?fields=full').get_json() == client.get('/listings').get_json()
+    assert client.get('/listings?fields=title,password').status_code == 400
+
+
+def test_bulk_import_listings(client):
+    """Test CSV and NDJSON bulk imports report per-row errors and insert valid rows"""
+    import io
+    import json
+    import time
+
+    r = client.post('/register', json={
+        "full_name": "Bola Bulk",
+        "email": "bola.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    })
+    user_id = r.get_json()['id']
+
+    def wait(job):
+        for _ in range(100):
+            if job['status'] in ('completed', 'failed'):
+                return job
+            time.sleep(0.05)
+            job = client.get(job['status_url']).get_json()
+        raise AssertionError('import did not finish')
+
+    csv_body = (
+        "title,listing_type,price,location_state,size_value,size_unit,images,latitude,longitude\n"
+        "Plot A,land_sale,100000,Kaduna,2,hectares,a.jpg|b.jpg,10.52,7.44\n"
+        ",land_sale,5000,Kaduna,,,,,\n"
+        "Plot C,spaceship,5000,Kaduna,,,,,\n"
+        "Plot D,land_rent,abc,Kaduna,,,,,\n"
+        "Plot E,land_rent,25000,Lagos,,,,,\n"
+    )
+    r = client.post('/listings/bulk-import', data={
+        'owner_id': str(user_id),
+        'file': (io.BytesIO(csv_body.encode()), 'plots.csv')
+    }, content_type='multipart/form-data')
+    assert r.status_code == 202
+    job = wait(r.get_json())
+    assert job['status'] == 'completed'
+    assert (job['total_rows'], job['inserted_rows'], job['failed_rows']) == (5, 2, 3)
+    assert [e['row'] for e in job['errors']] == [2, 3, 4]
+    assert 'title' in job['errors'][0]['error']
+
+    listings = client.get('/listings?location_state=Kaduna').get_json()
+    assert [l['title'] for l in listings] == ['Plot A']
+    assert listings[0]['images'] == ['a.jpg', 'b.jpg']
+    assert listings[0]['owner_id'] == user_id
+    # Imported rows are searchable and located like regular listings
+    assert client.get('/listings?near=10.52,7.44&radius_km=1').get_json()[0]['title'] == 'Plot A'
+    assert client.get('/listings?q=plot').status_code == 200
+
+    ndjson_body = "\n".join([
+        json.dumps({"title": "Bulk farm", "category": "land_sale", "price": 900000, "images": ["x.jpg"]}),
+        "{not json",
+        json.dumps({"title": "Bulk farm 2", "listing_type": "land_sale", "price": 1, "latitude": 95, "longitude": 3}),
+    ])
+    r = client.post(f'/listings/bulk-import?owner_id={user_id}', data=ndjson_body,
+                    content_type='application/x-ndjson')
+    job = wait(r.get_json())
+    assert (job['inserted_rows'], job['failed_rows']) == (1, 2)
+    assert 'invalid JSON' in job['errors'][0]['error']
+
+    assert client.post('/listings/bulk-import?owner_id=999999', data=ndjson_body,
+                       content_type='application/x-ndjson').status_code == 404
+    assert client.post(f'/listings/bulk-import?owner_id={user_id}', data='x',
+                       content_type='text/plain').status_code == 400
+    assert client.get('/listings/bulk-import/nope').status_code == 404
+
+
+def test_listing_media_content_addressed(app, client):
+    """Test identical uploads are stored once, reference counted and served as thumbnails"""
+    import io
+    import os
+    PIL = pytest.importorskip('PIL.Image')
+
+    r = client.post('/register', json={
+        "full_name": "Mina Media",
+        "email": "mina.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    })
+    user_id = r.get_json()['id']
+
+    buffer = io.BytesIO()
+    PIL.new('RGB', (1600, 900), (30, 120, 60)).save(buffer, 'PNG')
+    png = buffer.getvalue()
+
+    def create(title):
+        r = client.post('/listings/create', data={
+            'owner_id': str(user_id), 'listing_type': 'land_sale', 'category': 'land_sale',
+            'title': title, 'price': '1000',
+            'images': [(io.BytesIO(png), 'farm.png'), (io.BytesIO(png), 'copy.png')],
+        }, content_type='multipart/form-data')
+        assert r.status_code == 201
+        return r.get_json()
+
+    first, second = create('Farm one'), create('Farm two')
+    url = first['images'][0]
+    assert url.startswith('/static/uploads/media/')
+    assert first['images'] == [url, url] == second['images']
+
+    store = app.media_store
+    sha256 = url.rsplit('/', 1)[-1].split('.')[0]
+    original = store.path(sha256, 'png')
+    assert os.path.exists(original)
+    assert len(os.listdir(os.path.dirname(original))) == 1
+    r = client.get(url)
+    assert r.status_code == 200 and r.data == png
+    assert 'immutable' in r.headers['Cache-Control']
+    r.close()
+
+    # Derivatives (rendered in the background; process() is idempotent)
+    app.media_pipeline.process(sha256)
+    thumb = PIL.open(store.path(sha256, None, 'thumb'))
+    assert max(thumb.size) == 320
+    card = client.get('/listings?fields=card').get_json()[0]
+    assert card['cover_image'].endswith(f'{sha256}.thumb.jpg')
+    detail = client.get(f"/listings/{first['id']}?image_variant=medium").get_json()
+    assert detail['images'][0].endswith(f'{sha256}.medium.jpg')
+    assert client.get(f"/listings/{first['id']}").get_json()['images'][0] == url
+    assert client.get(f"/listings/{first['id']}?image_variant=huge").status_code == 400
+
+    # Content survives until the last listing referencing it lets go
+    r = client.put(f"/listings/{first['id']}/update", json={'remove_images': [url]})
+    assert r.status_code == 200 and r.get_json()['images'] == []
+    assert os.path.exists(original)
+    assert client.delete(f"/listings/{second['id']}", json={'user_id': user_id}).status_code == 200
+    assert not os.path.exists(original)
+    assert not os.path.exists(store.path(sha256, None, 'thumb'))
+
+
+def test_listing_video_chunked_upload(app, client):
+    """Test a video uploaded in chunks can resume after a failed chunk and attaches to a listing"""
+    import os
+
+    app.chunked_uploads.chunk_size = 1000
+    r = client.post('/register', json={
+        "full_name": "Chidi Chunks",
+        "email": "chidi.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    })
+    user_id = r.get_json()['id']
+    listing_id = client.post('/listings/create', json={
+        'owner_id': user_id, 'listing_type': 'land_sale', 'category': 'land_sale',
+        'title': 'Video farm', 'price': 1000
+    }).get_json()['id']
+
+    video = os.urandom(2500)
+    r = client.post('/uploads', json={'owner_id': user_id, 'purpose': 'listing_video',
+                                      'filename': 'walkthrough.mp4', 'size': len(video),
+                                      'content_type': 'video/mp4'})
+    assert r.status_code == 201
+    upload = r.get_json()
+    assert (upload['chunk_size'], upload['total_chunks'], upload['next_chunk']) == (1000, 3, 0)
+    chunk_url = upload['chunk_url']
+
+    def put(index, body):
+        return client.put(chunk_url.format(index=index), data=body, content_type='application/octet-stream')
+
+    assert put(0, video[:1000]).get_json()['next_chunk'] == 1
+    # Out of order and short chunks are rejected without losing progress
+    r = put(2, video[2000:])
+    assert r.status_code == 409 and r.get_json()['next_chunk'] == 1
+    assert put(1, video[1000:1500]).status_code == 400
+    assert client.get(f"/uploads/{upload['id']}").get_json()['next_chunk'] == 1
+    # Re-sending a received chunk is harmless
+    assert put(0, video[:1000]).status_code == 200
+    assert client.post(upload['complete_url'], json={'listing_id': listing_id}).status_code == 409
+    put(1, video[1000:2000])
+    status = put(2, video[2000:]).get_json()
+    assert status['received_bytes'] == len(video) and status['next_chunk'] is None
+
+    r = client.post(upload['complete_url'], json={'listing_id': listing_id})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body['upload']['status'] == 'completed'
+    url = body['listing']['videos'][0]
+    assert url == body['upload']['result_url']
+    sha256 = url.rsplit('/', 1)[-1].split('.')[0]
+    with open(app.media_store.path(sha256, 'mp4'), 'rb') as f:
+        assert f.read() == video
+    assert client.post(upload['complete_url'], json={'listing_id': listing_id}).status_code == 409
+
+    too_big = client.post('/uploads', json={'owner_id': user_id, 'purpose': 'listing_image',
+                                            'filename': 'x.png', 'size': 10 ** 12})
+    assert too_big.status_code == 413
+
+
+def test_media_range_requests_and_transfer_cap(app, client):
+    """Test uploaded media supports byte ranges, immutable caching and a cap on large transfers"""
+    import io
+    import threading
+
+    r = client.post('/register', json={
+        "full_name": "Rita Range",
+        "email": "rita.listing@test.com",
+        "password": "Password123!",
+        "account_type": "realtor"
+    })
+    user_id = r.get_json()['id']
+    video = bytes(range(256)) * 40
+    r = client.post('/listings/create', data={
+        'owner_id': str(user_id), 'listing_type': 'land_sale', 'category': 'land_sale',
+        'title': 'Range farm', 'price': '1000', 'videos': [(io.BytesIO(video), 'tour.mp4')],
+    }, content_type='multipart/form-data')
+    url = r.get_json()['videos'][0]
+
+    r = client.get(url, headers={'Range': 'bytes=100-199'})
+    assert r.status_code == 206
+    assert r.headers['Content-Range'] == f'bytes 100-199/{len(video)}'
+    assert r.data == video[100:200]
+    assert 'immutable' in r.headers['Cache-Control']
+    assert client.get(url, headers={'Range': f'bytes={len(video)}-'}).status_code == 416
+    r.close()
+
+    limiter = app.transfer_limiter
+    limiter.large_bytes = 1000
+    limiter._slots = threading.BoundedSemaphore(1)
+    streaming = client.get(url, buffered=False)
+    assert streaming.status_code == 200 and limiter.active == 1
+    busy = client.get(url)
+    assert busy.status_code == 503 and busy.headers['Retry-After']
+    # Small responses and HEAD requests don't need a slot
+    assert client.get(url, headers={'Range': 'bytes=0-9'}).status_code == 206
+    assert client.head(url).status_code == 200
+    streaming.close()
+    assert limiter.active == 0
+    assert client.get(url).status_code == 200
+
+
+def test_saved_search_notifications(client):
+    """Test saved searches are notified of new and edited listings that match them, once"""
+    def register(name, email):
+        return client.post('/register', json={
+            "full_name": name, "email": email, "password": "Password123!", "account_type": "farmer"
+        }).get_json()['id']
+
+    farmer = register("Sani Search", "sani.listing@test.com")
+    realtor = register("Rukky Realtor", "rukky.listing@test.com")
+
+    r = client.post('/saved-searches', json={
+        'user_id': farmer, 'name': 'Cheap Kaduna rentals', 'listing_type': 'land_rent',
+        'location_state': 'Kaduna', 'max_price': 300000, 'q': 'irrigated'
+    })
+    assert r.status_code == 201
+    search_id = r.get_json()['id']
+    client.post('/saved-searches', json={'user_id': farmer, 'location_state': 'Lagos'})
+    assert client.post('/saved-searches', json={'user_id': farmer, 'min_price': 5, 'max_price': 1}).status_code == 400
+
+    def create(**fields):
+        listing = {'owner_id': realtor, 'listing_type': 'land_rent', 'category': 'land_rent',
+                   'location_state': 'Kaduna', 'description': 'Irrigated plot near the river'}
+        listing.update(fields)
+        return client.post('/listings/create', json=listing).get_json()['id']
+
+    match_id = create(title='Plot by the dam', price=250000)
+    create(title='Too expensive', price=300001)
+    create(title='Wrong type', price=1000, listing_type='land_sale')
+    create(title='Dry plot', price=1000, description='No water')
+    edited_id = create(title='Later edit', price=900000)
+    # Users aren't notified about their own listings
+    client.post('/listings/create', json={'owner_id': farmer, 'listing_type': 'land_rent', 'category': 'land_rent',
+                                          'location_state': 'Kaduna', 'title': 'Mine, irrigated', 'price': 1})
+
+    notifications = client.get(f'/saved-searches/notifications/{farmer}').get_json()
+    assert [n['listing_id'] for n in notifications] == [match_id]
+    assert notifications[0]['saved_search_id'] == search_id
+    assert notifications[0]['listing']['title'] == 'Plot by the dam'
+
+    # An edit that brings a listing into range notifies; repeating it does not
+    client.put(f'/listings/{edited_id}/update', json={'price': 200000})
+    client.put(f'/listings/{edited_id}/update', json={'price': 210000})
+    notifications = client.get(f'/saved-searches/notifications/{farmer}?unread=1').get_json()
+    assert [n['listing_id'] for n in notifications] == [edited_id, match_id]
+
+    assert client.post(f'/saved-searches/notifications/{farmer}/read',
+                       json={'ids': [notifications[1]['id']]}).get_json()['updated'] == 1
+    unread = client.get(f'/saved-searches/notifications/{farmer}?unread=1&limit=1')
+    assert [n['listing_id'] for n in unread.get_json()] == [edited_id]
+    assert 'X-Next-Cursor' not in unread.headers
+
+    # Open-ended searches match on their other constraints
+    lagos = create(title='Lagos lot', location_state='Lagos', price=10 ** 9)
+    assert client.get(f'/saved-searches/notifications/{farmer}').get_json()[0]['listing_id'] == lagos
+
+    # A description with more distinct words than SQLite allows bound parameters is matched in batches
+    import itertools
+    import sqlite3
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    def old_sqlite_limit(dbapi_connection, connection_record):
+        if hasattr(dbapi_connection, 'setlimit'):
+            dbapi_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    event.listen(Engine, 'connect', old_sqlite_limit)
+    try:
+        words = (''.join(letters) for letters in itertools.product('abcdefghij', repeat=3))
+        long_id = create(title='Long read', price=1000, description=' '.join(words) + ' irrigated')
+    finally:
+        event.remove(Engine, 'connect', old_sqlite_limit)
+    assert client.get(f'/saved-searches/notifications/{farmer}').get_json()[0]['listing_id'] == long_id
+
+    # Bulk-imported rows are matched batch by batch
+    import json
+    import time
+    rows = [{'title': 'Imported dam plot', 'listing_type': 'land_rent', 'price': 1000, 'location_state': 'Kaduna',
+             'description': 'Irrigated all year'},
+            {'title': 'Imported dry plot', 'listing_type': 'land_rent', 'price': 1000, 'location_state': 'Kaduna'}]
+    job = client.post(f'/listings/bulk-import?owner_id={realtor}', data='\n'.join(map(json.dumps, rows)),
+                      content_type='application/x-ndjson').get_json()
+    for _ in range(100):
+        if job['status'] in ('completed', 'failed'):
+            break
+        time.sleep(0.05)
+        job = client.get(job['status_url']).get_json()
+    assert job['inserted_rows'] == 2
+    latest = client.get(f'/saved-searches/notifications/{farmer}').get_json()
+    assert latest[0]['listing']['title'] == 'Imported dam plot'
+    assert latest[1]['listing_id'] == long_id
+
+    assert client.delete(f'/saved-searches/{search_id}', json={'user_id': realtor}).status_code == 403
+    assert client.delete(f'/saved-searches/{search_id}', json={'user_id': farmer}).status_code == 200
+    assert len(client.get(f'/saved-searches/user/{farmer}').get_json()) == 1
+    assert [n['listing_id'] for n in client.get(f'/saved-searches/notifications/{farmer}').get_json()] == [lagos]
+
+
+def test_saved_search_matches_like_listing_search(client):
+    """Test saved-search keywords match listings as word prefixes, like /listings?q="""
+    def register(name, email):
+        return client.post('/register', json={
+            "full_name": name, "email": email, "password": "Password123!", "account_type": "farmer"
+        }).get_json()['id']
+
+    farmer = register("Pita Prefix", "pita.listing@test.com")
+    realtor = register("Remi Prefix", "remi.listing@test.com")
+    searches = {q: client.post('/saved-searches', json={'user_id': farmer, 'q': q}).get_json()['id']
+                for q in ('irrig kadu', 'irrigation')}
+
+    def create(title, description, state):
+        return client.post('/listings/create', json={
+            'owner_id': realtor, 'listing_type': 'land_sale', 'category': 'land_sale', 'title': title,
+            'description': description, 'location_state': state, 'price': 1000
+        }).get_json()['id']
+
+    create('Irrigated plot', 'Year-round water', 'Kaduna')
+    create('Dry plot', 'Irrigable soon', 'Kano')
+    create('Irrigated plot with a Kádunà view', 'Accents are folded', 'Plateau')
+
+    notifications = client.get(f'/saved-searches/notifications/{farmer}').get_json()
+    assert len(notifications) == 2
+    for q, search_id in searches.items():
+        searched = {l['id'] for l in client.get('/listings', query_string={'q': q}).get_json()}
+        assert searched == {n['listing_id'] for n in notifications if n['saved_search_id'] == search_id}
+
+
+def test_similar_listings(app, client):
+    """Test /listings/<id>/similar ranks same-type neighbours and follows listing changes"""
+    owner = client.post('/register', json={
+        "full_name": "Tayo Similar", "email": "tayo.similar@test.com", "password": "Password123!",
+        "account_type": "realtor"
+    }).get_json()['id']
+
+    def create(title, description, listing_type='land_sale', state='Oyo', price=2000000):
+        return client.post('/listings/create', json={
+            'owner_id': owner, 'listing_type': listing_type, 'category': listing_type, 'title': title,
+            'description': description, 'location_state': state, 'price': price
+        }).get_json()['id']
+
+    cassava = create('Cassava farmland', 'Fertile loam soil, cassava and maize ready')
+    maize = create('Maize farmland', 'Loam soil with a borehole, maize and cassava grown before', price=2500000)
+    create('Cassava farmland for rent', 'Fertile loam soil for cassava', listing_type='land_rent')
+    create('Duplex in Ikeja', 'Four bedroom house with a garden', state='Lagos', price=90000000)
+    index = app.similar_listings
+    index.refresh()
+
+    r = client.get(f'/listings/{cassava}/similar')
+    assert r.status_code == 200
+    similar = r.get_json()['similar']
+    # Only same-type listings, best first
+    assert similar[0]['id'] == maize
+    assert all(item['listing_type'] == 'land_sale' for item in similar)
+    assert similar == sorted(similar, key=lambda item: -item['score'])
+    assert client.get('/listings/999999/similar').status_code == 404
+
+    # A new listing shows up in its neighbours' lists after a refresh
+    closer = create('Cassava farmland, fertile', 'Fertile loam soil, cassava and maize ready to plant')
+    assert index.refresh() == 'updated'
+    assert client.get(f'/listings/{cassava}/similar?limit=1').get_json()['similar'][0]['id'] == closer
+    assert client.get(f'/listings/{closer}/similar').get_json()['similar'][0]['id'] == cassava
+
+    # Edits and deletions are picked up too
+    client.put(f'/listings/{closer}/update', json={'owner_id': owner, 'title': 'Fish pond', 'description': 'Concrete ponds'})
+    index.refresh()
+    assert client.get(f'/listings/{cassava}/similar').get_json()['similar'][0]['id'] == maize
+    assert client.delete(f'/listings/{maize}', json={'user_id': owner}).status_code == 200
+    assert index.refresh() == 'updated'
+    assert maize not in [item['id'] for item in client.get(f'/listings/{cassava}/similar').get_json()['similar']]
+    assert client.get(f'/listings/{maize}/similar').status_code == 404
+    assert index.refresh() == 'unchanged'
+
+
+def test_search_suggest(app, client):
+    """Test /search/suggest completes prefixes per scope, most popular first, and follows writes"""
+    app.search_suggester.rebuild()
+    owner = client.post('/register', json={
+        "full_name": "Kemi Suggest", "email": "kemi.suggest@test.com", "password": "Password123!",
+        "account_type": "realtor"
+    }).get_json()['id']
+
+    def create(title, state, area=None):
+        return client.post('/listings/create', json={
+            'owner_id': owner, 'listing_type': 'land_sale', 'category': 'land_sale', 'title': title,
+            'description': title, 'location_state': state, 'location_area': area, 'price': 1000000
+        }).get_json()['id']
+
+    def suggest(q, scope='listings'):
+        r = client.get(f'/search/suggest?scope={scope}&q={q}')
+        assert r.status_code == 200
+        return [(s['text'], s['kind']) for s in r.get_json()['suggestions']]
+
+    create('Kano farmland', 'Kano', 'Dala')
+    create('Cassava plot', 'Kano')
+    plot = create('Kaduna orchard', 'Kaduna', 'Kaduna North')
+
+    # Two listings in Kano outrank one in Kaduna; titles match from any word
+    assert suggest('ka')[0] == ('Kano', 'state')
+    assert ('Kaduna North', 'area') in suggest('nor')
+    assert suggest('cass') == [('Cassava plot', 'title')]
+    assert suggest('KANO fa') == [('Kano farmland', 'title')]
+    assert suggest('zz') == []
+
+    client.put(f'/listings/{plot}/update', json={'owner_id': owner, 'title': 'Kaduna mango orchard'})
+    assert suggest('mango') == [('Kaduna mango orchard', 'title')]
+    assert suggest('kaduna o') == []
+    assert client.delete(f'/listings/{plot}', json={'user_id': owner}).status_code == 200
+    assert suggest('kaduna') == []
+
+    # Bulk-imported rows are suggested once their batch commits
+    import json
+    import time
+    job = client.post(f'/listings/bulk-import?owner_id={owner}', data=json.dumps(
+        {'title': 'Sokoto rice farm', 'listing_type': 'land_sale', 'price': 1000, 'location_state': 'Sokoto'}),
+        content_type='application/x-ndjson').get_json()
+    for _ in range(100):
+        if job['status'] in ('completed', 'failed'):
+            break
+        time.sleep(0.05)
+        job = client.get(job['status_url']).get_json()
+    assert suggest('sok') == [('Sokoto', 'state'), ('Sokoto rice farm', 'title')]
+
+    # Worker names, specializations and locations; name changes are followed
+    user_id = client.post('/register', json={
+        "full_name": "Ngozi Okafor", "email": "ngozi.suggest@test.com", "password": "Password123!",
+        "account_type": "worker"
+    }).get_json()['id']
+    worker_id = client.get(f'/workers/user/{user_id}').get_json()['id']
+    client.put(f'/workers/{worker_id}', json={'user_id': user_id, 'specialization': 'Irrigation', 'location_state': 'Kano'})
+    assert suggest('oka', 'workers') == [('Ngozi Okafor', 'name')]
+    assert suggest('irr', 'workers') == [('Irrigation', 'specialization')]
+    assert suggest('ka', 'workers') == [('Kano', 'state')]
+    client.put(f'/users/{user_id}', json={'full_name': 'Ngozi Adeyemi'})
+    assert suggest('ngozi', 'workers') == [('Ngozi Adeyemi', 'name')]
+
+    client.post('/api/jobs', json={'user_id': owner, 'title': 'Harvest hands', 'description': 'Maize', 'location': 'Zaria'})
+    assert suggest('har', 'jobs') == [('Harvest hands', 'title')]
+    assert suggest('zar', 'jobs') == [('Zaria', 'location')]
+
+    assert client.get('/search/suggest?scope=forum&q=a').status_code == 400
@@ -0,0 +1,67 @@
+import random
+
+from search_suggest import PrefixTrie, normalize
+
+
+def _prefixes(trie):
+    """Every prefix of every indexed key, plus a few that match nothing"""
+    prefixes = {'', 'zz', 'q'}
+    for text, kind, weight, key in trie._phrases.values():
+        for start in range(len(key)):
+            if start == 0 or key[start - 1] == ' ':
+                prefixes.update(key[start:end] for end in range(start + 1, len(key) + 1))
+    return prefixes
+
+
+def _assert_matches_load(trie, weights):
+    loaded = PrefixTrie(trie.k)
+    loaded.load(weights)
+    assert trie.nodes == loaded.nodes
+    for prefix in _prefixes(loaded) | _prefixes(trie):
+        assert trie.suggest(prefix) == loaded.suggest(prefix), prefix
+
+
+def test_weight_drop_reranks_shared_ancestors():
+    """Test a phrase losing weight re-ranks nodes its key paths share"""
+    trie = PrefixTrie(5)
+    weights = {}
+    for kind, text, weight in [('y', 'abuja', 832419), ('y', 'ab kano', 701741), ('y', 'kad ab', 312751),
+                               ('y', 'a ab okeke', 578259), ('x', 'a kan', 242193), ('y', 'kano abuja', 661325),
+                               ('y', 'ab kad kad', 415370), ('y', 'a ab okeke', 43383)]:
+        trie.set(kind, text, weight)
+        weights[(kind, text)] = weight
+
+    assert [text for text, _, _ in trie.suggest('a')] == ['abuja', 'ab kano', 'kano abuja', 'ab kad kad', 'kad ab']
+    _assert_matches_load(trie, weights)
+
+
+def test_incremental_updates_match_bulk_load():
+    """Test random adds, weight changes and removals leave the same top-k as loading the final weights"""
+    words = ['ab', 'abuja', 'a', 'kano', 'kan', 'kad', 'kaduna', 'oke', 'okeke', 'ada', 'b']
+    for seed in range(40):
+        rng = random.Random(seed)
+        trie = PrefixTrie(rng.choice([1, 2, 3, 5]))
+        weights = {}
+        for _ in range(60):
+            kind = rng.choice('xy')
+            text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+            known = [phrase for phrase, weight in weights.items() if weight > 0]
+            if known and rng.random() < 0.5:
+                kind, text = rng.choice(known)
+            weight = 0 if rng.random() < 0.25 else rng.randint(1, 1000)
+            trie.set(kind, text, weight)
+            weights[(kind, normalize(text))] = weight
+        _assert_matches_load(trie, {phrase: weight for phrase, weight in weights.items() if weight > 0})
+
+
+def test_removing_every_phrase_empties_the_trie():
+    """Test removals prune and merge nodes back to an empty root"""
+    trie = PrefixTrie(3)
+    phrases = [('y', 'kano abuja'), ('y', 'kano'), ('x', 'kaduna north'), ('y', 'ab kad')]
+    for weight, (kind, text) in enumerate(phrases, 1):
+        trie.set(kind, text, weight)
+    for kind, text in phrases:
+        trie.set(kind, text, 0)
+    assert len(trie) == 0
+    assert trie.nodes == 1
+    assert trie.suggest('k') == []
@@ -177,3 +177,40 @@ def test_non_admin_cannot_verify(client):
     rv = client.post(f'/documents/verify/{doc_id}', data=json.dumps(verify_payload), content_type='application/json')
     assert rv.status_code == 403
     assert 'unauthorized' in rv.get_json()['error']
+
+
+def test_upload_document_chunked(app, client):
+    """Test a verification scan can be uploaded in chunks and attached to a document"""
+    import os
+    import config
+
+    app.chunked_uploads.chunk_size = 1024
+    rv = client.post('/register', json={
+        'full_name': 'Chunk Doc', 'email': 'chunkdoc@example.com',
+        'password': 'Password123!', 'account_type': 'farmer'
+    })
+    user_id = rv.get_json()['id']
+    doc_id = client.post('/documents/upload', json={
+        'user_id': user_id, 'document_type': 'passport', 'document_number': 'A1234567'
+    }).get_json()['id']
+
+    scan = os.urandom(3000)
+    upload = client.post('/uploads', json={'owner_id': user_id, 'purpose': 'verification_document',
+                                           'filename': 'passport.pdf', 'size': len(scan)}).get_json()
+    for index in range(upload['total_chunks']):
+        rv = client.put(upload['chunk_url'].format(index=index), data=scan[index * 1024:(index + 1) * 1024],
+                        content_type='application/octet-stream')
+        assert rv.status_code == 200
+
+    rv = client.post(upload['complete_url'], json={'document_id': doc_id + 1000})
+    assert rv.status_code == 404
+    rv = client.post(upload['complete_url'], json={'document_id': doc_id})
+    assert rv.status_code == 200
+    path = rv.get_json()['document']['document_path']
+    assert path.endswith('_passport.pdf')
+    stored = os.path.join(config.BASE_DIR, path.lstrip('/'))
+    try:
+        with open(stored, 'rb') as f:
+            assert f.read() == scan
+    finally:
+        os.unlink(stored)
@@ -351,3 +351,511 @@ def test_get_worker_by_nonexistent_user(client):
     r = client.get('/workers/user/9999')
     assert r.status_code == 404
     assert 'not found' in r.get_json()['error']
+
+
+def test_get_workers_sparse_fieldsets(client):
+    """Test ?fields= on the worker directory skips the user join unless a user field is requested"""
+    r = client.post('/register', json={
+        "full_name": "Fiona Fields",
+        "email": "fiona.fields@test.com",
+        "password": "Password123!",
+        "account_type": "worker"
+    })
+    user_id = r.get_json()['id']
+    worker_id = client.get(f'/workers/user/{user_id}').get_json()['id']
+    client.put(f'/workers/{worker_id}', json={
+        "user_id": user_id,
+        "specialization": "labor",
+        "skills": ["planting", "irrigation"],
+        "bio": "Harvest hand " * 30
+    })
+
+    r = client.get('/workers?fields=specialization,skills')
+    assert r.status_code == 200
+    assert r.get_json() == [{'id': worker_id, 'specialization': 'labor', 'skills': ['planting', 'irrigation']}]
+
+    card = client.get('/workers?fields=card').get_json()[0]
+    assert card['name'] == 'Fiona Fields'
+    assert 'bio' not in card and len(card['summary']) == 160
+
+    assert client.get('/workers?fields=nope').status_code == 400
+
+
+def test_worker_directory_pagination(client):
+    """Test /workers and /api/workers/list share filters and page with cursors, boosted profiles first"""
+    import datetime
+    import config
+    from sqlalchemy import create_engine
+    from models import WorkerProfile
+
+    ids = []
+    for i in range(7):
+        user_id = client.post('/register', json={
+            "full_name": f"Directory Worker {i}", "email": f"directory{i}@test.com",
+            "password": "Password123!", "account_type": "worker"
+        }).get_json()['id']
+        worker_id = client.get(f'/workers/user/{user_id}').get_json()['id']
+        client.put(f'/workers/{worker_id}', json={
+            "user_id": user_id, "specialization": "labor" if i < 5 else "fumigation",
+            "location_state": "Kano", "available": i != 3,
+            # Two workers never set a daily rate
+            "hourly_rate": 100 * (i + 1), "daily_rate": None if i in (1, 4) else 1000 * (7 - i),
+            "experience_years": i
+        })
+        ids.append(worker_id)
+
+    engine = create_engine(config.SQLALCHEMY_DATABASE_URI)
+    with engine.begin() as conn:
+        table = WorkerProfile.__table__
+        for i, worker_id in enumerate(ids):
+            conn.execute(table.update().where(table.c.id == worker_id).values(rating=i % 3, total_jobs=i))
+        conn.execute(table.update().where(table.c.id == ids[0]).values(
+            is_boosted=True, boost_expiry=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)))
+    engine.dispose()
+
+    def walk(url):
+        seen, cursor = [], None
+        while True:
+            r = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+            assert r.status_code == 200
+            seen += [w['id'] for w in r.get_json()]
+            cursor = r.headers.get('X-Next-Cursor')
+            if not cursor:
+                return seen
+
+    # Boosted first, then rating and jobs completed
+    order = walk('/workers?limit=2')
+    assert order == [ids[0], ids[5], ids[2], ids[4], ids[1], ids[6], ids[3]]
+    assert walk('/api/workers/list?limit=3') == order
+
+    # Rate sorts keep workers without that rate (NULLs first ascending, last descending)
+    assert walk('/api/workers/list?sort_by=rate_low&limit=2') == [ids[0], ids[1], ids[4], ids[6], ids[5], ids[3], ids[2]]
+    assert walk('/api/workers/list?sort_by=rate_high&limit=2') == [ids[0], ids[2], ids[3], ids[5], ids[6], ids[4], ids[1]]
+    assert walk('/workers?sort_by=rate_low&limit=2') == ids
+
+    # Same filters on both routes
+    query = 'specialization=labor&available=true&min_hourly_rate=200&max_daily_rate=5000&min_experience=1&limit=1'
+    assert walk(f'/workers?{query}') == walk(f'/api/workers/list?{query}') == [ids[2]]
+    assert walk('/workers?available=false&limit=5') == [ids[3]]
+
+    assert client.get('/workers?cursor=garbage').status_code == 400
+    assert client.get('/api/workers/list?rate=weekly').status_code == 400
+
+
+def test_worker_directory_skill_filters(client):
+    """Test ?skills= / ?certifications= filter from the tag index with AND/OR semantics"""
+    profiles = {
+        'both': (["Irrigation", "Pesticide  Application"], ["NIN verified"]),
+        'irrigation': (["irrigation", "planting"], []),
+        'pesticide': (["pesticide application"], ["Spraying licence"]),
+    }
+    ids, users = {}, {}
+    for name, (skills, certifications) in profiles.items():
+        r = client.post('/register', json={
+            "full_name": f"Skilled {name}", "email": f"skilled.{name}@test.com",
+            "password": "Password123!", "account_type": "worker"
+        })
+        users[name] = user_id = r.get_json()['id']
+        ids[name] = client.get(f'/workers/user/{user_id}').get_json()['id']
+        client.put(f'/workers/{ids[name]}', json={
+            "user_id": user_id, "specialization": "labor", "skills": skills, "certifications": certifications
+        })
+
+    def found(query):
+        r = client.get(f'/workers?{query}')
+        assert r.status_code == 200
+        return sorted(w['id'] for w in r.get_json())
+
+    assert found('skills=irrigation,pesticide application') == [ids['both']]
+    assert found('skills=IRRIGATION, Pesticide Application') == [ids['both']]
+    assert found('skills=irrigation,pesticide application&skills_match=any') == sorted(ids.values())
+    assert found('skills=irrigation&certifications=spraying licence,nin verified&certifications_match=any') == [ids['both']]
+    assert found('skills=harvesting') == []
+    assert client.get('/workers?skills=irrigation&skills_match=some').status_code == 400
+
+    # Editing a profile's skills re-indexes it
+    client.put(f'/workers/{ids["irrigation"]}', json={"user_id": users['irrigation'], "skills": ["Pesticide application", "irrigation"]})
+    assert found('skills=irrigation,pesticide application') == [ids['both'], ids['irrigation']]
+    assert found('skills=planting') == []
+    assert client.get('/api/workers/list?skills=pesticide application,planting&skills_match=any').status_code == 200
+
+
+def test_job_worker_matches(app, client):
+    """Test /api/jobs/<id>/matches ranks available workers with per-feature breakdowns"""
+    def worker(name, **profile):
+        user_id = client.post('/register', json={
+            "full_name": name, "email": f"{name.split()[0].lower()}.match@test.com",
+            "password": "Password123!", "account_type": "worker"
+        }).get_json()['id']
+        worker_id = client.get(f'/workers/user/{user_id}').get_json()['id']
+        client.put(f'/workers/{worker_id}', json=dict({"user_id": user_id, "specialization": "labor"}, **profile))
+        return worker_id
+
+    best = worker("Ada Irrigator", location_state="Kano", location_area="Dala", daily_rate=4000,
+                  skills=["Irrigation", "Pesticide application"])
+    partial = worker("Bello Planter", location_state="Kano", daily_rate=9000, skills=["irrigation"])
+    traveller = worker("Chidi Traveller", location_state="Lagos", willing_to_travel=True, skills=["irrigation"])
+    worker("Dayo Away", location_state="Kano", available=False, skills=["irrigation", "pesticide application"])
+
+    employer = client.post('/register', json={
+        "full_name": "Farm Owner", "email": "farm.owner@test.com", "password": "Password123!", "account_type": "farmer"
+    }).get_json()['id']
+    job_id = client.post('/api/jobs', json={
+        'user_id': employer, 'title': 'Irrigation hand needed',
+        'description': 'Set up drip irrigation and handle pesticide application on 5 hectares',
+        'location': 'Dala, Kano', 'salary_range': '₦3,000 - ₦6,000 per day'
+    }).get_json()['id']
+
+    app.worker_matcher.refresh()
+    r = client.get(f'/api/jobs/{job_id}/matches')
+    assert r.status_code == 200
+    data = r.get_json()
+    assert sorted(data['skills']) == ['irrigation', 'pesticide application']
+    ranked = [m['worker']['id'] for m in data['matches']]
+    assert ranked[:3] == [best, partial, traveller]
+    top = data['matches'][0]
+    assert top['breakdown']['location'] == 0.3 and top['breakdown']['skills'] == 0.3
+    assert top['breakdown']['rate'] == 0.15
+    assert top['score'] == pytest.approx(sum(top['breakdown'].values()), abs=1e-3)
+    # Over budget: 6000 / 9000 of the rate weight
+    assert data['matches'][1]['breakdown']['rate'] == pytest.approx(0.1, abs=1e-3)
+    assert data['matches'][1]['breakdown']['skills'] == 0.15
+
+    # Profile edits are picked up incrementally
+    client.put(f'/workers/{partial}', json={"user_id": data['matches'][1]['worker']['user_id'],
+                                             "skills": ["irrigation", "pesticide application"], "daily_rate": 3000,
+                                             "location_area": "Dala"})
+    app.worker_matcher.refresh()
+    ranked = [m['worker']['id'] for m in client.get(f'/api/jobs/{job_id}/matches?limit=2').get_json()['matches']]
+    assert sorted(ranked) == sorted([best, partial])
+
+    assert client.get(f'/api/jobs/{job_id}/matches?skills=harvesting').get_json()['skills'] == []
+    assert client.get('/api/jobs/999999/matches').status_code == 404
+
+
+def test_worker_availability_window(client):
+    """Test ?available_from=&available_to= drops workers booked by accepted applications or signed contracts"""
+    import datetime
+
+    def register(name, account_type='worker'):
+        return client.post('/register', json={
+            "full_name": name, "email": f"{name.split()[0].lower()}.calendar@test.com",
+            "password": "Password123!", "account_type": account_type
+        }).get_json()['id']
+
+    users = {name: register(f"{name} Worker") for name in ('Free', 'Hired', 'Signed', 'Later')}
+    workers = {name: client.get(f'/workers/user/{user_id}').get_json()['id'] for name, user_id in users.items()}
+    employer = register("Calendar Employer", 'farmer')
+    job_id = client.post('/api/jobs', json={'user_id': employer, 'title': 'Harvest', 'description': 'Maize harvest'}
+                         ).get_json()['id']
+
+    def accept(name, **dates):
+        application = client.post(f'/api/jobs/{job_id}/apply', json={'user_id': users[name]}).get_json()['application']
+        r = client.post(f"/api/job-applications/{application['id']}/accept", json=dict({'employer_id': employer}, **dates))
+        assert r.status_code == 200
+        return application['id']
+
+    hired = accept('Hired', start_date='2030-03-01', end_date='2030-03-10')
+    accept('Later', start_date='2030-03-11', end_date='2030-03-20')
+    contract = client.post('/contracts/create', json={
+        'title': 'Season', 'terms': 'Labour', 'party_a_id': employer, 'party_b_id': users['Signed']
+    }).get_json()['id']
+    for user_id in (employer, users['Signed']):
+        assert client.post(f'/contracts/{contract}/sign', json={'user_id': user_id, 'signature': 'x'}).status_code == 200
+
+    def free(query):
+        r = client.get(f'/workers?{query}')
+        assert r.status_code == 200
+        return sorted(w['id'] for w in r.get_json() if w['id'] in workers.values())
+
+    assert free('available_from=2030-03-05&available_to=2030-03-08') == sorted(
+        [workers['Free'], workers['Signed'], workers['Later']])
+    # End dates are inclusive: the 10th is still taken, the 11th starts the next booking
+    assert free('available_from=2030-03-10') == sorted([workers['Free'], workers['Signed'], workers['Later']])
+    assert free('available_from=2030-03-10&available_to=2030-03-11') == sorted([workers['Free'], workers['Signed']])
+    assert free('available_from=2030-03-21&available_to=2030-03-25') == sorted(workers.values())
+    today = datetime.date.today().isoformat()
+    assert workers['Signed'] not in free(f'available_to={today}')
+
+    # A contract's own work period books its worker, given at creation or when signing
+    season = client.post('/contracts/create', json={
+        'title': 'April', 'terms': 'Labour', 'party_a_id': employer, 'party_b_id': users['Later'],
+        'start_date': '2030-04-01'
+    }).get_json()['id']
+    client.post(f'/contracts/{season}/sign', json={'user_id': employer, 'signature': 'x', 'end_date': '2030-04-30'})
+    signed = client.post(f'/contracts/{season}/sign', json={'user_id': users['Later'], 'signature': 'x'}).get_json()
+    assert (signed['status'], signed['work_ends_at']) == ('signed', '2030-05-01T00:00:00')
+    assert workers['Later'] not in free('available_from=2030-04-10')
+    assert workers['Later'] in free('available_from=2030-05-01')
+
+    # Ending a signed contract frees its workers; only parties may, and only once
+    assert client.post(f'/contracts/{contract}/status', json={'user_id': workers['Free'] + 10 ** 6,
+                                                             'status': 'cancelled'}).status_code == 403
+    r = client.post(f'/contracts/{contract}/status', json={'user_id': employer, 'status': 'cancelled'})
+    assert r.get_json()['status'] == 'cancelled'
+    assert workers['Signed'] in free(f'available_to={today}')
+    assert client.post(f'/contracts/{contract}/status', json={'user_id': employer, 'status': 'breached'}).status_code == 400
+    assert client.post(f'/contracts/{contract}/sign', json={'user_id': employer, 'signature': 'x'}).status_code == 400
+    assert client.post(f'/contracts/{season}/status', json={'user_id': employer, 'status': 'breached'}).status_code == 200
+    assert workers['Later'] in free('available_from=2030-04-10')
+    assert client.post('/contracts/create', json={
+        'title': 'Bad', 'terms': 'x', 'party_a_id': employer, 'party_b_id': users['Free'],
+        'start_date': '2030-04-02', 'end_date': '2030-04-01'
+    }).status_code == 400
+
+    bookings = client.get(f"/api/workers/{workers['Hired']}/bookings?from=2030-03-01&to=2030-03-31").get_json()
+    assert [(b['source'], b['source_id']) for b in bookings['bookings']] == [('application', hired)]
+
+    # Declining after accepting frees the worker again
+    client.post(f'/api/job-applications/{hired}/decline', json={'employer_id': employer})
+    assert workers['Hired'] in free('available_from=2030-03-05')
+
+    assert client.get('/workers?available_from=2030-03-05&available_to=2030-03-01').status_code == 400
+    assert client.get('/workers?available_from=soon').status_code == 400
+    assert client.post(f'/api/job-applications/{hired}/accept',
+                       json={'employer_id': employer, 'start_date': 'tomorrow'}).status_code == 400
+
+
+def test_job_list_filters_and_pagination(client):
+    """Test /api/jobs/list salary, location, status and boost filters, salary sorts and cursor pages"""
+    employer = client.post('/register', json={
+        "full_name": "Jobs Employer", "email": "jobs.filters@test.com", "password": "Password123!",
+        "account_type": "farmer"
+    }).get_json()['id']
+
+    def post(title, salary_range, location):
+        return client.post('/api/jobs', json={'user_id': employer, 'title': title, 'description': title,
+                                              'salary_range': salary_range, 'location': location}).get_json()['id']
+
+    manager = post('Farm Manager', '₦150k - ₦200k', 'Ikeja, Lagos State')
+    operator = post('Tractor Operator', '₦80,000 - ₦120,000 per month', 'Ogun')
+    harvester = post('Harvester', 'Daily Pay', 'Dala, Kano')
+    hand = post('Farm Hand', '₦5,000/day', 'Kano')
+
+    detail = client.get(f'/api/jobs/{manager}').get_json()
+    assert (detail['salary_min'], detail['salary_max']) == (150000, 200000)
+
+    def ids(query):
+        r = client.get(f'/api/jobs/list?{query}')
+        assert r.status_code == 200
+        return [job['id'] for job in r.get_json()]
+
+    assert ids('') == [hand, harvester, operator, manager]
+    assert ids('location=kano') == [hand, harvester]
+    assert ids('location=Lagos') == [manager]
+    assert ids('min_salary=100000') == [operator, manager]
+    assert ids('max_salary=100000') == [hand, operator]
+    assert ids('min_salary=100000&max_salary=160000') == [operator, manager]
+    assert ids('status=open') == ids('')
+    assert ids('status=closed') == []
+    assert ids('boosted=true') == []
+    assert ids('boosted=false') == ids('')
+    # Jobs without amounts come last in both salary sorts
+    assert ids('sort_by=salary_high') == [manager, operator, hand, harvester]
+    assert ids('sort_by=salary_low') == [hand, operator, manager, harvester]
+    assert ids('sort_by=salary_low&fields=card') == [hand, operator, manager, harvester]
+
+    for sort_by in ('recent', 'salary_high', 'salary_low'):
+        seen, url = [], f'/api/jobs/list?sort_by={sort_by}&limit=1&fields=id,title'
+        while url:
+            r = client.get(url)
+            seen.extend(job['id'] for job in r.get_json())
+            cursor = r.headers.get('X-Next-Cursor')
+            url = f'/api/jobs/list?sort_by={sort_by}&limit=1&fields=id,title&cursor={cursor}' if cursor else None
+        assert seen == ids(f'sort_by={sort_by}')
+
+    assert client.get('/api/jobs/list?cursor=garbage').status_code == 400
+
+
+def test_job_application_counts_and_review(client):
+    """Test applications_count/pending_count follow apply/accept/decline and the applicant list pages by status"""
+    def register(name, account_type='worker'):
+        return client.post('/register', json={
+            "full_name": name, "email": f"{name.split()[0].lower()}.review@test.com",
+            "password": "Password123!", "account_type": account_type
+        }).get_json()['id']
+
+    employer = register("Review Employer", 'farmer')
+    job_id = client.post('/api/jobs', json={'user_id': employer, 'title': 'Weeding', 'description': 'Cassava farm'}
+                         ).get_json()['id']
+    applicants = [register(f"Applicant{i} Worker") for i in range(5)]
+    applications = [client.post(f'/api/jobs/{job_id}/apply', json={'user_id': user_id}).get_json()['application']['id']
+                    for user_id in applicants]
+    # Re-applying doesn't count twice
+    assert client.post(f'/api/jobs/{job_id}/apply', json={'user_id': applicants[0]}).status_code == 200
+
+    def counts():
+        job = client.get(f'/api/jobs/{job_id}').get_json()
+        return job['applications_count'], job['pending_count']
+
+    assert counts() == (5, 5)
+    client.post(f'/api/job-applications/{applications[0]}/accept', json={'employer_id': employer})
+    client.post(f'/api/job-applications/{applications[0]}/accept', json={'employer_id': employer})
+    client.post(f'/api/job-applications/{applications[1]}/decline', json={'employer_id': employer})
+    assert counts() == (5, 3)
+    client.post(f'/api/job-applications/{applications[0]}/decline', json={'employer_id': employer})
+    assert counts() == (5, 3)
+
+    url = f'/api/jobs/{job_id}/applications?employer_id={employer}'
+    seen, cursor = [], None
+    while True:
+        r = client.get(url + '&limit=2' + (f'&cursor={cursor}' if cursor else ''))
+        assert r.status_code == 200
+        page = r.get_json()
+        assert len(page) <= 2
+        seen += [a['id'] for a in page]
+        cursor = r.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        assert f'/api/jobs/{job_id}/applications?' in r.headers['Link']
+    assert seen == sorted(applications, reverse=True)
+    assert client.get(url).get_json()[0]['applicant_name'] == 'Applicant4 Worker'
+
+    pending = client.get(url + '&status=pending').get_json()
+    assert sorted(a['id'] for a in pending) == sorted(applications[2:])
+    assert client.get(url + '&cursor=bogus').status_code == 400
+    assert client.get(f'/api/jobs/{job_id}/applications?employer_id={applicants[0]}').status_code == 403
+
+
+def test_worker_dashboard_stats_single_query_and_cache(client):
+    """Test /api/worker-dashboard-stats reads in one query, caches, and is refreshed by application and rating writes"""
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    def register(name, account_type='worker'):
+        return client.post('/register', json={
+            "full_name": name, "email": f"{name.split()[-1].lower()}.dashboard@test.com",
+            "password": "Password123!", "account_type": account_type
+        }).get_json()['id']
+
+    worker = register("Dash Worker")
+    employer = register("Dash Employer", 'farmer')
+    jobs = [client.post('/api/jobs', json={'user_id': employer, 'title': f'Job {i}', 'description': 'Farm work',
+                                           'location': f'Town {i}'}).get_json()['id'] for i in range(7)]
+    for job_id in jobs[:6]:
+        client.post(f'/api/jobs/{job_id}/apply', json={'user_id': worker})
+
+    import threading
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        # Background refreshers and sweepers share the engine; count only this request's queries
+        if threading.current_thread() is threading.main_thread():
+            statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        stats = client.get(f'/api/worker-dashboard-stats?user_id={worker}').get_json()
+        assert len(statements) == 1
+        assert client.get(f'/api/worker-dashboard-stats?user_id={worker}').get_json() == stats
+        assert len(statements) == 1
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+
+    assert [a['job_title'] for a in stats['recentApplications']] == ['Job 5', 'Job 4', 'Job 3', 'Job 2', 'Job 1']
+    assert stats['recentApplications'][0]['location'] == 'Town 5'
+    assert stats['recentApplications'][0]['status'] == 'pending'
+
+    # Applying, an employer decision and a rating each drop the cached payload
+    client.post(f'/api/jobs/{jobs[6]}/apply', json={'user_id': worker})
+    stats = client.get(f'/api/worker-dashboard-stats?user_id={worker}').get_json()
+    assert stats['recentApplications'][0]['job_title'] == 'Job 6'
+    client.post(f"/api/job-applications/{stats['recentApplications'][0]['id']}/accept", json={'employer_id': employer})
+    stats = client.get(f'/api/worker-dashboard-stats?user_id={worker}').get_json()
+    assert stats['recentApplications'][0]['status'] == 'accepted'
+    assert client.post('/ratings', json={'rater_id': employer, 'rated_user_id': worker, 'rating_value': 4}
+                       ).status_code == 201
+    assert client.get(f'/api/worker-dashboard-stats?user_id={worker}').get_json()['rating'] == 40
+
+    empty = client.get(f'/api/worker-dashboard-stats?user_id={employer}').get_json()
+    assert empty == {'jobsCompleted': 0, 'totalEarnings': 0.0, 'rating': 0.0, 'recentApplications': []}
+    assert client.get('/api/worker-dashboard-stats?user_id=abc').status_code == 400
+
+
+def test_bulk_accept_decline_applications(client):
+    """Test /api/jobs/<id>/applications/bulk updates statuses, counts, bookings and messages in one request"""
+    def register(name, account_type='worker'):
+        return client.post('/register', json={
+            "full_name": name, "email": f"{name.split()[0].lower()}.bulk@test.com",
+            "password": "Password123!", "account_type": account_type
+        }).get_json()['id']
+
+    employer = register("Bulk Employer", 'farmer')
+    job_id = client.post('/api/jobs', json={'user_id': employer, 'title': 'Harvest', 'description': 'Rice'}
+                         ).get_json()['id']
+    applicants = [register(f"Harvester{i} Worker") for i in range(6)]
+    applications = [client.post(f'/api/jobs/{job_id}/apply', json={'user_id': user_id}).get_json()['application']['id']
+                    for user_id in applicants]
+    client.post(f'/api/job-applications/{applications[5]}/decline', json={'employer_id': employer})
+
+    url = f'/api/jobs/{job_id}/applications/bulk'
+    r = client.post(url, json={
+        'employer_id': employer, 'accept': applications[:3], 'decline': applications[3:],
+        'start_date': '2031-05-01', 'end_date': '2031-05-07',
+        'accept_message': 'Hi {name}, you are hired for {job_title}.', 'decline_message': 'Thanks {name}.'
+    })
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body['accepted'] == sorted(applications[:3])
+    assert body['declined'] == sorted(applications[3:5])
+    assert body['unchanged'] == [applications[5]]
+    assert body['messages_sent'] == 5
+    assert (body['applications_count'], body['pending_count']) == (6, 0)
+
+    statuses = {a['id']: a['status'] for a in client.get(
+        f'/api/jobs/{job_id}/applications?employer_id={employer}').get_json()}
+    assert statuses == dict([(i, 'accepted') for i in applications[:3]] + [(i, 'rejected') for i in applications[3:]])
+
+    inbox = client.get(f'/messages/{applicants[0]}').get_json()['received']
+    assert any(m['content'] == 'Hi Harvester0 Worker, you are hired for Harvest.' for m in inbox)
+
+    hired = client.get(f'/workers/user/{applicants[0]}').get_json()['id']
+    bookings = client.get(f'/api/workers/{hired}/bookings?from=2031-05-01&to=2031-05-31').get_json()['bookings']
+    assert [b['source_id'] for b in bookings] == [applications[0]]
+
+    # Reversing a decision moves the booking with it; repeating one changes nothing
+    r = client.post(url, json={'employer_id': employer, 'accept': applications[1:2], 'decline': applications[:1]})
+    assert (r.get_json()['accepted'], r.get_json()['declined']) == ([], [applications[0]])
+    assert client.get(f'/api/workers/{hired}/bookings?from=2031-05-01&to=2031-05-31').get_json()['bookings'] == []
+
+    assert client.post(url, json={'employer_id': applicants[0], 'accept': applications[:1]}).status_code == 403
+    assert client.post(url, json={'employer_id': employer, 'accept': [999999]}).get_json()['missing'] == [999999]
+    assert client.post(url, json={'employer_id': employer, 'accept': applications[:1],
+                                  'decline': applications[:1]}).status_code == 400
+    assert client.post(url, json={'employer_id': employer}).status_code == 400
+    assert client.post(url, json={'employer_id': employer, 'accept': 'all'}).status_code == 400
+
+
+def test_job_worker_matches_rating_scale(app, client):
+    """Test match scores read worker ratings on their stored 0-50 scale"""
+    def register(name, account_type='worker'):
+        return client.post('/register', json={
+            "full_name": name, "email": f"{name.split()[0].lower()}.stars@test.com",
+            "password": "Password123!", "account_type": account_type
+        }).get_json()['id']
+
+    def worker(name):
+        user_id = register(name)
+        worker_id = client.get(f'/workers/user/{user_id}').get_json()['id']
+        client.put(f'/workers/{worker_id}', json={"user_id": user_id, "specialization": "labor",
+                                                  "location_state": "Kano", "daily_rate": 4000})
+        return user_id, worker_id
+
+    (strong_user, strong), (weak_user, weak) = worker("Strong Worker"), worker("Weak Worker")
+    raters = [register(f"Rater{i} Farmer", 'farmer') for i in range(2)]
+    for rater, stars in zip(raters, (4, 5)):
+        assert client.post('/ratings', json={'rater_id': rater, 'rated_user_id': strong_user,
+                                             'rating_value': stars}).status_code == 201
+    assert client.post('/ratings', json={'rater_id': raters[0], 'rated_user_id': weak_user,
+                                         'rating_value': 2}).status_code == 201
+
+    job_id = client.post('/api/jobs', json={'user_id': raters[0], 'title': 'Farm hand', 'description': 'General work',
+                                            'location': 'Kano', 'salary_range': '₦3,000 - ₦6,000 per day'}
+                         ).get_json()['id']
+    app.worker_matcher.refresh()
+    matches = client.get(f'/api/jobs/{job_id}/matches').get_json()['matches']
+    ranked = [m['worker']['id'] for m in matches if m['worker']['id'] in (strong, weak)]
+    assert ranked == [strong, weak]
+    rating = {m['worker']['id']: m['breakdown']['rating'] for m in matches}
+    assert rating[strong] == pytest.approx(0.1 * 0.9, abs=1e-3)
+    assert rating[weak] == pytest.approx(0.1 * 0.4, abs=1e-3)
@@ -0,0 +1,113 @@
+"""
+Write-behind view counters
+GET endpoints record views in memory instead of committing a write per
+request. A background thread periodically folds the accumulated increments
+into `UPDATE ... SET views = views + n` statements (one per distinct n), and
+anything still pending is flushed at interpreter shutdown.
+"""
+import atexit
+import logging
+import threading
+from collections import defaultdict
+
+from sqlalchemy import bindparam
+
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Accumulates per-entity view increments and flushes them in batches.
+
+    Counters are registered by name with the table and column they update:
+
+        counter = ViewCounter(engine, flush_interval=5)
+        counter.register('listing', Listing.__table__, 'views')
+        counter.record('listing', listing_id)
+
+    Stored counts lag by at most flush_interval seconds (plus whatever a hard
+    crash drops); use pending() to add unflushed views to a response.
+    """
+
+    def __init__(self, engine, flush_interval=5.0):
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self._targets = {}
+        self._pending = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        atexit.register(self.close)
+
+    def register(self, name, table, column):
+        """Register a counter that increments table.column by primary key"""
+        self._targets[name] = (table, column)
+
+    def record(self, name, entity_id, n=1):
+        """Record n views of an entity; never touches the database"""
+        if name not in self._targets:
+            raise KeyError(f'unknown view counter: {name}')
+        with self._lock:
+            self._pending[(name, entity_id)] += n
+        self._ensure_thread()
+
+    def pending(self, name, entity_id):
+        """Views recorded for an entity that have not been flushed yet"""
+        with self._lock:
+            return self._pending.get((name, entity_id), 0)
+
+    def flush(self):
+        """
+        Write all pending increments to the database in one transaction.
+
+        Returns:
+            int: Number of entities updated
+        """
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, defaultdict(int)
+
+        # Group ids by (counter, increment) so each group is a single UPDATE
+        groups = defaultdict(list)
+        for (name, entity_id), n in batch.items():
+            groups[(name, n)].append(entity_id)
+
+        try:
+            with self.engine.begin() as conn:
+                for (name, n), ids in groups.items():
+                    table, column = self._targets[name]
+                    values = {column: table.c[column] + n}
+                    # Keep onupdate timestamps untouched: a view is not an edit
+                    for col in table.c:
+                        if col.onupdate is not None:
+                            values[col.name] = col
+                    stmt = table.update().where(table.c.id.in_(bindparam('ids', expanding=True))).values(values)
+                    conn.execute(stmt, {'ids': ids})
+        except Exception:
+            # Put the increments back so the next flush retries them
+            logger.exception('Failed to flush view counts')
+            with self._lock:
+                for key, n in batch.items():
+                    self._pending[key] += n
+            return 0
+        return len(batch)
+
+    def close(self):
+        """Stop the background thread and flush what is left"""
+        self._stop.set()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _ensure_thread(self):
+        if self._thread is not None or self.flush_interval <= 0:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
@@ -0,0 +1,136 @@
+"""
+Worker availability calendar
+Accepted job applications and signed contracts book their worker for a
+half-open period [starts_at, ends_at), stored as rows of `worker_bookings`.
+WorkerProfile.available stays the worker's own on/off switch; the
+directory's ?available_from=&available_to= window additionally drops
+workers with a booking overlapping it:
+
+    ?available_from=2024-06-03&available_to=2024-06-07   free for all five days
+
+Overlap is `starts_at < to AND ends_at > from`. The (ends_at, starts_at,
+worker_id) index answers it as one range scan over bookings that have not
+ended by the window start (past bookings, the bulk of the table, are never
+read) and covers the rest of the check, so "who is free" for thousands of
+workers is a single NOT IN subquery.
+"""
+import datetime
+
+from sqlalchemy import select
+
+
+SOURCES = ('application', 'contract')
+
+
+def utc_naive(value):
+    """Datetime as naive UTC, the form booking times are stored and compared in"""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def parse_time(raw, end=False):
+    """
+    Parse an ISO date or datetime query/body value.
+
+    A bare date means the start of that day, or with end=True the end of it
+    (midnight of the next day, as periods are half-open).
+
+    Raises:
+        ValueError: If the value is not an ISO date or datetime
+    """
+    if isinstance(raw, datetime.datetime):
+        return utc_naive(raw)
+    raw = str(raw).strip()
+    try:
+        day = datetime.date.fromisoformat(raw)
+    except ValueError:
+        return utc_naive(datetime.datetime.fromisoformat(raw))
+    start = datetime.datetime.combine(day, datetime.time())
+    return start + datetime.timedelta(days=1) if end else start
+
+
+def parse_window(start_raw, end_raw):
+    """
+    The (start, end) period named by an ?available_from= / ?available_to= pair.
+
+    Either bound may be omitted: a lone start means that one day, a lone end
+    means from now until then. Returns None when neither is given.
+
+    Raises:
+        ValueError: If a bound doesn't parse or the period is empty
+    """
+    if not start_raw and not end_raw:
+        return None
+    try:
+        start = parse_time(start_raw) if start_raw else utc_naive(datetime.datetime.now(datetime.timezone.utc))
+        end = parse_time(end_raw, end=True) if end_raw else parse_time(start_raw, end=True)
+    except ValueError:
+        raise ValueError('available_from and available_to must be ISO dates or datetimes')
+    if end <= start:
+        raise ValueError('available_to must be after available_from')
+    return start, end
+
+
+def booked_filter(worker_model, booking_model, start, end):
+    """SQL condition on worker_model for workers with no booking overlapping [start, end)"""
+    busy = select(booking_model.worker_id).where(booking_model.ends_at > start, booking_model.starts_at < end)
+    return worker_model.id.notin_(busy)
+
+
+def book(session, booking_model, worker_id, starts_at, ends_at, source, source_id):
+    """
+    Record (or move) the booking a source places on a worker.
+
+    Re-booking from the same source updates its period rather than adding a
+    second row. Changes are left in the session.
+    """
+    starts_at, ends_at = utc_naive(starts_at), utc_naive(ends_at)
+    if ends_at <= starts_at:
+        raise ValueError('booking must end after it starts')
+    booking = session.query(booking_model).filter_by(source=source, source_id=source_id, worker_id=worker_id).first()
+    if booking is None:
+        booking = booking_model(worker_id=worker_id, source=source, source_id=source_id)
+        session.add(booking)
+    booking.starts_at, booking.ends_at = starts_at, ends_at
+    return booking
+
+
+def release(session, booking_model, source, source_id):
+    """Drop the bookings a source placed (e.g. an accepted application later declined)"""
+    session.query(booking_model).filter_by(source=source, source_id=source_id).delete(synchronize_session=False)
+
+
+def book_many(session, booking_model, pairs, starts_at, ends_at, source):
+    """
+    book() for many (worker_id, source_id) pairs sharing one period: existing
+    bookings are moved with one UPDATE and the rest inserted in one batch.
+    Changes are left in the session.
+    """
+    starts_at, ends_at = utc_naive(starts_at), utc_naive(ends_at)
+    if ends_at <= starts_at:
+        raise ValueError('booking must end after it starts')
+    pairs = set(pairs)
+    if not pairs:
+        return
+    source_ids = {source_id for _, source_id in pairs}
+    existing = set(session.execute(
+        select(booking_model.worker_id, booking_model.source_id)
+        .where(booking_model.source == source, booking_model.source_id.in_(source_ids))
+    ).all())
+    session.query(booking_model).filter(
+        booking_model.source == source, booking_model.source_id.in_(source_ids)
+    ).update({booking_model.starts_at: starts_at, booking_model.ends_at: ends_at}, synchronize_session=False)
+    session.bulk_insert_mappings(booking_model, [
+        {'worker_id': worker_id, 'source': source, 'source_id': source_id, 'starts_at': starts_at, 'ends_at': ends_at}
+        for worker_id, source_id in pairs - existing
+    ])
+
+
+def release_many(session, booking_model, source, source_ids):
+    """release() for many sources of one kind in one DELETE"""
+    source_ids = list(source_ids)
+    if source_ids:
+        session.query(booking_model).filter(
+            booking_model.source == source, booking_model.source_id.in_(source_ids)
+        ).delete(synchronize_session=False)
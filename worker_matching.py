@@ -0,0 +1,279 @@
+"""
+Job -> worker matching
+Every worker profile is a row of an in-memory NumPy column store (state,
+area, travel, daily rate, rating, jobs completed, boost expiry,
+availability) plus a (row, tag) list of its skills and certifications. A
+job is scored against all workers at once with vectorised comparisons, so
+ranking 100k workers is a few array passes rather than a query per worker.
+
+Features (each in [0, 1], weighted by WEIGHTS):
+    location    job location names the worker's state (+ area); travellers get partial credit
+    skills      share of the job's skills the worker has
+    rate        1 when the daily rate fits the job's salary range, decaying above it
+    rating      rating / 50 (profiles store the average star rating x 10)
+    experience  jobs completed, log-scaled
+    boost       live boost
+
+The job's skills are the known worker tags that appear in its title,
+description or requirements (or ?skills= when given). The store follows
+worker_profiles.updated_at incrementally on a background thread, like the
+similar-listings index.
+"""
+import datetime
+import logging
+import math
+import re
+import threading
+
+import numpy as np
+from sqlalchemy import select
+
+from job_search import parse_salary_range
+
+
+logger = logging.getLogger(__name__)
+
+
+WEIGHTS = {
+    'location': 0.3,
+    'skills': 0.3,
+    'rate': 0.15,
+    'rating': 0.1,
+    'experience': 0.1,
+    'boost': 0.05,
+}
+
+# Jobs completed that count as full experience
+EXPERIENCE_JOBS = 100
+
+# How far behind the newest updated_at seen a refresh looks for changes
+SETTLE_SECONDS = 5
+
+# Above this many changed workers, tags are read in full rather than by id
+MAX_TAG_LOOKUP = 500
+
+
+def _phrase(text):
+    """Lowercased words joined by single spaces, padded for whole-phrase containment checks"""
+    return ' ' + ' '.join(re.findall(r'\w+', (text or '').lower(), flags=re.UNICODE)) + ' '
+
+
+def _epoch(value):
+    if value is None:
+        return np.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
+
+class _Codes:
+    """Dictionary encoding of normalised strings ('' is code 0)"""
+
+    def __init__(self):
+        self.codes = {'': 0}
+
+    def code(self, value):
+        value = _phrase(value).strip()
+        return self.codes.setdefault(value, len(self.codes))
+
+    def found_in(self, text):
+        """Codes of the values that appear as whole phrases in text"""
+        text = _phrase(text)
+        return [code for value, code in self.codes.items() if value and f' {value} ' in text]
+
+
+class WorkerMatcher:
+    """
+    In-memory worker feature store and job scorer.
+
+        matcher = WorkerMatcher(engine, WorkerProfile.__table__, WorkerTag.__table__, interval=30)
+        matcher.start()                        # or matcher.refresh() inline
+        matcher.match(job, k=20)               # [(worker_id, score, breakdown), ...]
+    """
+
+    COLUMNS = ('id', 'location_state', 'location_area', 'willing_to_travel', 'daily_rate', 'rating',
+               'total_jobs', 'boost_expiry', 'available', 'updated_at')
+
+    def __init__(self, engine, worker_table, tag_table, interval=30.0):
+        self.engine = engine
+        self.workers = worker_table
+        self.tags = tag_table
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.built = False
+
+        self._states = _Codes()
+        self._areas = _Codes()
+        self._tag_codes = _Codes()
+        self._position = {}
+        self._versions = {}
+        self._watermark = None
+        self._allocate(0)
+        self._tag_rows = np.zeros(0, dtype=np.int64)
+        self._tag_values = np.zeros(0, dtype=np.int64)
+
+    def _allocate(self, n):
+        self.ids = np.zeros(n, dtype=np.int64)
+        self.state = np.zeros(n, dtype=np.int32)
+        self.area = np.zeros(n, dtype=np.int32)
+        self.travel = np.zeros(n, dtype=bool)
+        self.daily_rate = np.full(n, np.nan)
+        self.rating = np.zeros(n)
+        self.total_jobs = np.zeros(n)
+        self.boost_expiry = np.full(n, np.nan)
+        self.available = np.zeros(n, dtype=bool)
+
+    def _grow(self, extra):
+        n = len(self.ids)
+        old = {name: getattr(self, name) for name in
+               ('ids', 'state', 'area', 'travel', 'daily_rate', 'rating', 'total_jobs', 'boost_expiry', 'available')}
+        self._allocate(n + extra)
+        for name, values in old.items():
+            getattr(self, name)[:n] = values
+
+    # ---------- loading ----------
+
+    def refresh(self):
+        """
+        Load workers changed since the last refresh (everything the first time).
+
+        Returns:
+            int: Number of workers loaded
+        """
+        with self._refreshing:
+            w, t = self.workers, self.tags
+            query = select(*[w.c[name] for name in self.COLUMNS])
+            if self._watermark is not None:
+                # updated_at is stamped before commit; look back for slow transactions
+                query = query.where(w.c.updated_at >= self._watermark - datetime.timedelta(seconds=SETTLE_SECONDS))
+            with self.engine.connect() as conn:
+                rows = [row for row in conn.execute(query) if self._versions.get(row.id, False) != row.updated_at]
+                if not rows:
+                    self.built = True
+                    return 0
+                ids = {row.id for row in rows}
+                tag_query = select(t.c.worker_id, t.c.tag)
+                if len(ids) <= MAX_TAG_LOOKUP:
+                    tag_query = tag_query.where(t.c.worker_id.in_(ids))
+                tags = [(worker_id, tag) for worker_id, tag in conn.execute(tag_query) if worker_id in ids]
+
+            with self._lock:
+                new = [row.id for row in rows if row.id not in self._position]
+                start = len(self.ids)
+                self._grow(len(new))
+                self._position.update((worker_id, start + offset) for offset, worker_id in enumerate(new))
+
+                positions = np.array([self._position[row.id] for row in rows], dtype=np.int64)
+                self.ids[positions] = [row.id for row in rows]
+                self.state[positions] = [self._states.code(row.location_state) for row in rows]
+                self.area[positions] = [self._areas.code(row.location_area) for row in rows]
+                self.travel[positions] = [bool(row.willing_to_travel) for row in rows]
+                self.daily_rate[positions] = [np.nan if row.daily_rate is None else row.daily_rate for row in rows]
+                self.rating[positions] = [row.rating or 0 for row in rows]
+                self.total_jobs[positions] = [row.total_jobs or 0 for row in rows]
+                self.boost_expiry[positions] = [_epoch(row.boost_expiry) for row in rows]
+                self.available[positions] = [bool(row.available) for row in rows]
+                for row in rows:
+                    self._versions[row.id] = row.updated_at
+                    if row.updated_at is not None and (self._watermark is None or row.updated_at > self._watermark):
+                        self._watermark = row.updated_at
+
+                # Replace the changed workers' tags
+                keep = ~np.isin(self._tag_rows, positions)
+                self._tag_rows = np.concatenate([self._tag_rows[keep], np.array(
+                    [self._position[worker_id] for worker_id, _ in tags], dtype=np.int64)])
+                self._tag_values = np.concatenate([self._tag_values[keep], np.array(
+                    [self._tag_codes.code(tag) for _, tag in tags], dtype=np.int64)])
+                self.built = True
+            return len(rows)
+
+    # ---------- scoring ----------
+
+    def match(self, job, k=20, skills=None, now=None):
+        """
+        Rank available workers for a job.
+
+        Args:
+            job: Object with title, description, requirements, location, salary_range
+                (salary_max is used when set)
+            skills (list|None): Skills to match instead of those found in the job text
+
+        Returns:
+            tuple: ([(worker_id, score, breakdown)], skills matched on), best first
+        """
+        now = (now or datetime.datetime.now(datetime.timezone.utc)).timestamp()
+        high = getattr(job, 'salary_max', None)
+        if high is None:
+            _, high = parse_salary_range(job.salary_range)
+        with self._lock:
+            n = len(self.ids)
+            if skills is None:
+                skill_codes = self._tag_codes.found_in(' '.join(filter(None, (job.title, job.description, job.requirements))))
+            else:
+                skill_codes = [self._tag_codes.codes[s] for s in (_phrase(s).strip() for s in skills)
+                               if s in self._tag_codes.codes]
+            names = {code: value for value, code in self._tag_codes.codes.items()}
+
+            features = {}
+            states = self._states.found_in(job.location)
+            if states:
+                in_state = np.isin(self.state, states)
+                in_area = np.isin(self.area, self._areas.found_in(job.location))
+                features['location'] = np.where(in_state, 0.7 + 0.3 * in_area, np.where(self.travel, 0.3, 0.0))
+            else:
+                features['location'] = np.zeros(n)
+
+            if skill_codes:
+                has = np.isin(self._tag_values, skill_codes)
+                features['skills'] = np.bincount(self._tag_rows[has], minlength=n) / len(skill_codes)
+            else:
+                features['skills'] = np.zeros(n)
+
+            if high is not None:
+                rate = self.daily_rate
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    fit = np.where(rate <= high, 1.0, high / rate)
+                features['rate'] = np.where(np.isnan(rate), 0.5, fit)
+            else:
+                features['rate'] = np.zeros(n)
+
+            features['rating'] = np.clip(self.rating / 50.0, 0, 1)
+            features['experience'] = np.clip(np.log1p(self.total_jobs) / math.log1p(EXPERIENCE_JOBS), 0, 1)
+            with np.errstate(invalid='ignore'):
+                features['boost'] = (self.boost_expiry > now).astype(float)
+
+            total = sum(WEIGHTS[name] * values for name, values in features.items())
+            total = np.where(self.available, total, -np.inf)
+            candidates = np.flatnonzero(self.available)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-total[candidates], k - 1)[:k]]
+            order = candidates[np.lexsort((self.ids[candidates], -total[candidates]))]
+
+            results = [(int(self.ids[i]), round(float(total[i]), 4),
+                        {name: round(WEIGHTS[name] * float(values[i]), 4) for name, values in features.items()})
+                       for i in order]
+            return results, [names[code] for code in skill_codes]
+
+    # ---------- background refresh ----------
+
+    def start(self):
+        """Load and keep refreshing on a background thread"""
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name='worker-matcher', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception('Worker matcher refresh failed')
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,81 @@
+"""
+Normalized worker skills and certifications
+WorkerProfile.skills and .certifications stay JSON arrays for display; each
+entry is also stored as a row of `worker_tags` (kind, tag, worker_id), whose
+primary key is the index the directory filters are answered from:
+
+    ?skills=irrigation,pesticide application             every skill (AND)
+    ?skills=irrigation,harvesting&skills_match=any       at least one (OR)
+
+Tags are compared case- and whitespace-insensitively.
+"""
+import json
+import re
+
+from sqlalchemy import func, select
+
+
+KINDS = ('skill', 'certification')
+
+# JSON field on WorkerProfile -> tag kind
+FIELDS = {'skills': 'skill', 'certifications': 'certification'}
+
+MAX_TAG_LENGTH = 100
+
+
+def normalize_tag(value):
+    """Lowercased, whitespace-collapsed tag, or None for blank or non-string entries"""
+    if not isinstance(value, str):
+        return None
+    tag = re.sub(r'\s+', ' ', value).strip().lower()
+    return tag[:MAX_TAG_LENGTH] or None
+
+
+def parse_tags(raw):
+    """Distinct normalized tags of a comma-separated query parameter"""
+    tags = []
+    for part in (raw or '').split(','):
+        tag = normalize_tag(part)
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+
+def profile_tags(profile):
+    """{(kind, tag)} described by a profile's JSON skills and certifications"""
+    tags = set()
+    for field, kind in FIELDS.items():
+        try:
+            values = json.loads(getattr(profile, field) or '[]')
+        except ValueError:
+            continue
+        if isinstance(values, list):
+            tags.update((kind, tag) for tag in map(normalize_tag, values) if tag)
+    return tags
+
+
+def sync_tags(session, tag_model, profile):
+    """
+    Make a profile's tag rows match its JSON fields (call after changing them).
+
+    The profile must be flushed so it has an id; changes are left in the session.
+    """
+    wanted = profile_tags(profile)
+    existing = {(row.kind, row.tag): row for row in session.query(tag_model).filter_by(worker_id=profile.id)}
+    for key, row in existing.items():
+        if key not in wanted:
+            session.delete(row)
+    session.add_all(tag_model(worker_id=profile.id, kind=kind, tag=tag)
+                    for kind, tag in wanted - set(existing))
+
+
+def tag_filter(worker_model, tag_model, kind, tags, match_all=True):
+    """
+    SQL condition on worker_model for workers having all (or any) of the tags.
+
+    Evaluated as an IN subquery on the (kind, tag, worker_id) primary key.
+    """
+    ids = select(tag_model.worker_id).where(tag_model.kind == kind, tag_model.tag.in_(tags))
+    if match_all and len(tags) > 1:
+        ids = ids.group_by(tag_model.worker_id).having(func.count() == len(tags))
+    return worker_model.id.in_(ids)